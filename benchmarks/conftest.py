@@ -0,0 +1,110 @@
+"""
+Benchmarks for the Python binding layer, run against
+nisyscfg.simulation.SimulatedLibrary so that no NI software is needed.
+
+    pytest benchmarks
+    pytest benchmarks --benchmark-autosave --benchmark-compare
+    pytest benchmarks --update-baselines
+
+Timings depend on the machine and are compared with pytest-benchmark's
+own storage. Native call counts and memory per resource do not, so they
+are checked against benchmarks/baselines.json, which is kept in the
+repository; run with --update-baselines after an intended change and
+commit the result.
+"""
+
+import json
+import pathlib
+
+import nisyscfg
+import nisyscfg.simulation
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+
+BASELINES_PATH = pathlib.Path(__file__).parent / "baselines.json"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        default=False,
+        help="Rewrite benchmarks/baselines.json with the measured values.",
+    )
+
+
+def topology(resources):
+    return {
+        "experts": [{"name": "nidaqmx", "display_name": "NI-DAQmx", "version": "23.0.0"}],
+        "resources": [
+            {
+                "count": resources,
+                "expert": "nidaqmx",
+                "name": "Dev{i}",
+                "alias": "Dev{i}",
+                "properties": {
+                    "IS_SIMULATED": False,
+                    "SLOT_NUMBER": "{i}",
+                    "VENDOR_ID": 4243,
+                    "CURRENT_TEMP": 40.5,
+                    "SERIAL_NUMBER": "S{i:05d}",
+                    "INTERNAL_CALIBRATION_LAST_TIME": 1577836800.5,
+                    "TEMPERATURE_NAME": ["Inlet", "Board", "Exhaust", "Fan"],
+                    "TEMPERATURE_READING": [31.0, 40.5, 38.25, 29.0],
+                },
+            }
+        ],
+        "software": {
+            "installed": [
+                {"id": "ni-component-{:03d}".format(i), "version": "23.0.0"} for i in range(100)
+            ]
+        },
+    }
+
+
+@pytest.fixture(scope="function")
+def session_factory():
+    sessions = []
+
+    def create(resources=1):
+        context = nisyscfg.simulation.simulate(topology(resources))
+        context.__enter__()
+        session = nisyscfg.Session()
+        sessions.append((context, session))
+        return session
+
+    yield create
+    for context, session in reversed(sessions):
+        session.close()
+        context.__exit__(None, None, None)
+
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    measured = {}
+    expected = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    update = request.config.getoption("--update-baselines")
+
+    def check(name, value, tolerance=0.0):
+        measured[name] = value
+        if update:
+            return
+        assert name in expected, "No baseline for {}; run with --update-baselines.".format(name)
+        if tolerance:
+            assert value <= expected[name] * (1 + tolerance), "{} regressed: {} > {}".format(
+                name, value, expected[name]
+            )
+        else:
+            assert value == expected[name], "{} changed: {} != {}".format(
+                name, value, expected[name]
+            )
+
+    yield check
+    if update and measured:
+        expected.update(measured)
+        BASELINES_PATH.write_text(json.dumps(expected, indent=4, sort_keys=True) + "\n")
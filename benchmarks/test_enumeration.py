@@ -0,0 +1,48 @@
+import nisyscfg.testing
+import pytest
+
+
+@pytest.mark.parametrize("resources", [10, 100, 1000])
+def test_find_hardware(benchmark, baselines, session_factory, resources):
+    session = session_factory(resources)
+
+    def enumerate_hardware():
+        found = list(session.find_hardware())
+        for resource in found:
+            resource.close()
+        return len(found)
+
+    assert benchmark(enumerate_hardware) == resources
+    with nisyscfg.testing.call_budget({}) as counter:
+        enumerate_hardware()
+    baselines("calls.find_hardware.{}".format(resources), counter.total)
+
+
+def test_find_hardware_with_filter(benchmark, baselines, session_factory):
+    session = session_factory(100)
+
+    def enumerate_hardware():
+        filter = session.create_filter()
+        filter.user_alias = "Dev50"
+        found = list(session.find_hardware(filter))
+        for resource in found:
+            resource.close()
+        filter.close()
+        return len(found)
+
+    assert benchmark(enumerate_hardware) == 1
+    with nisyscfg.testing.call_budget({}) as counter:
+        enumerate_hardware()
+    baselines("calls.find_hardware_with_filter", counter.total)
+
+
+def test_installed_components(benchmark, baselines, session_factory):
+    session = session_factory()
+
+    def enumerate_components():
+        return len(list(session.get_installed_software_components()))
+
+    assert benchmark(enumerate_components) == 100
+    with nisyscfg.testing.call_budget({}) as counter:
+        enumerate_components()
+    baselines("calls.installed_components", counter.total)
@@ -0,0 +1,63 @@
+import hightime
+import nisyscfg.errors
+import nisyscfg.testing
+import pytest
+
+
+PROPERTIES = [
+    ("is_simulated", False),
+    ("slot_number", 1),
+    ("vendor_id", 4243),
+    ("current_temp", 40.5),
+    ("serial_number", "S00001"),
+    ("internal_calibration_last_time", hightime.datetime(2020, 1, 1, 0, 0, 0, 500000)),
+]
+
+
+@pytest.fixture(scope="function")
+def resource(session_factory):
+    session = session_factory()
+    return next(session.find_hardware())
+
+
+@pytest.mark.parametrize("name, value", PROPERTIES)
+def test_get_property(benchmark, baselines, resource, name, value):
+    assert benchmark(getattr, resource, name) == value
+    with nisyscfg.testing.call_budget({}) as counter:
+        getattr(resource, name)
+    baselines("calls.get_property.{}".format(name), counter.total)
+
+
+@pytest.mark.parametrize("name, value", PROPERTIES)
+def test_set_property(benchmark, baselines, resource, name, value):
+    benchmark(setattr, resource, name, value)
+    with nisyscfg.testing.call_budget({}) as counter:
+        setattr(resource, name, value)
+    baselines("calls.set_property.{}".format(name), counter.total)
+
+
+def test_indexed_property_iteration(benchmark, baselines, resource):
+    def read():
+        return list(zip(resource.temperature_name, resource.temperature_reading))
+
+    assert benchmark(read)[1] == ("Board", 40.5)
+    with nisyscfg.testing.call_budget({}) as counter:
+        read()
+    baselines("calls.indexed_property_iteration", counter.total)
+
+
+def test_missing_property_error(benchmark, baselines, resource):
+    def read():
+        try:
+            resource.product_name
+        except nisyscfg.errors.LibraryError as err:
+            return err.code
+
+    assert benchmark(read) == nisyscfg.errors.Status.PROP_DOES_NOT_EXIST
+    with nisyscfg.testing.call_budget({}) as counter:
+        read()
+    baselines("calls.missing_property_error", counter.total)
+
+
+def test_get_property_default(benchmark, resource):
+    assert benchmark(resource.get_property, "product_name", None) is None
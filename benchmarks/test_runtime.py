@@ -0,0 +1,49 @@
+import gc
+import subprocess
+import sys
+import tracemalloc
+
+import hightime
+import nisyscfg.timestamp
+
+
+def test_timestamp_to_datetime(benchmark, session_factory):
+    session_factory()
+    timestamp = nisyscfg.timestamp._convert_datetime_to_ctype(hightime.datetime(2020, 1, 1))
+    result = benchmark(nisyscfg.timestamp._convert_ctype_to_datetime, timestamp)
+    assert result == hightime.datetime(2020, 1, 1)
+
+
+def test_datetime_to_timestamp(benchmark, session_factory):
+    session_factory()
+    value = hightime.datetime(2020, 1, 1, 0, 0, 0, 500000)
+    benchmark(nisyscfg.timestamp._convert_datetime_to_ctype, value)
+
+
+def test_import_time(benchmark):
+    def import_nisyscfg():
+        subprocess.check_call([sys.executable, "-c", "import nisyscfg"])
+
+    benchmark.pedantic(import_nisyscfg, rounds=5, iterations=1)
+
+
+def test_memory_per_resource(benchmark, baselines, session_factory):
+    resources = 1000
+    session = session_factory(resources)
+
+    def measure():
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            found = list(session.find_hardware())
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        for resource in found:
+            resource.close()
+        return (after - before) // resources
+
+    per_resource = benchmark.pedantic(measure, rounds=3, iterations=1)
+    benchmark.extra_info["bytes_per_resource"] = per_resource
+    baselines("memory.bytes_per_resource", per_resource, tolerance=0.25)
@@ -13,14 +13,19 @@ class PortNotFoundError(Exception):
 
 def nixnet_assign_port_name(serial_number, port_number, port_name):
     with nisyscfg.Session() as session:
-        # Search for the NI-XNET device with the specified serial number.
-        device_filter = session.create_filter()
-        device_filter.is_device = True
-        device_filter.serial_number = serial_number
+        # Enumerate the NI-XNET hardware once; devices and their interfaces
+        # are linked in memory by link name and port number.
+        topology = session.topology(expert_names="xnet")
 
+        # Search for the NI-XNET device with the specified serial number.
         try:
             # Assume only one device will be found
-            device = next(session.find_hardware(filter=device_filter, expert_names="xnet"))
+            device = next(
+                node
+                for node in topology
+                if node.is_device
+                and node.resource.get_property("serial_number", None) == serial_number
+            )
         except StopIteration:
             raise DeviceNotFoundError(
                 'Could not find a device with serial number "{}"'.format(serial_number)
@@ -28,22 +33,15 @@ def nixnet_assign_port_name(serial_number, port_number, port_name):
 
         # Search for the interface connected to the NI-XNET device with the
         # specified port number.
-        interface_filter = session.create_filter()
-        interface_filter.is_device = False
-        interface_filter.connects_to_link_name = device.provides_link_name
-        interface_filter.xnet.port_number = port_number
-
-        try:
-            # Assume only one interface will be found
-            interface = next(session.find_hardware(filter=interface_filter, expert_names="xnet"))
-        except StopIteration:
+        interface = device.port(port_number)
+        if interface is None or interface.is_device:
             raise PortNotFoundError(
                 'Device with serial number "{}" does not have port number {}'.format(
                     serial_number, port_number
                 )
             )
 
-        interface.rename(port_name)
+        interface.resource.rename(port_name)
 
 
 if "__main__" == __name__:
@@ -10,34 +10,32 @@ def print_resource_temperature(resource, indent):
         print(indent + "{}: {}".format(name or "Temperature", reading))
 
 
-def print_device_temperatures(session, provides_link_name, indent=""):
+def print_device_temperatures(devices, indent=""):
     print(indent + "Devices:")
-    filter = session.create_filter()
-    filter.is_present = True
-    filter.is_ni_product = True
-    filter.is_device = True
-    filter.connects_to_link_name = provides_link_name
-    for device in session.find_hardware(filter):
-        print(indent + "    {}: {}".format(device.product_name, device.name))
-        print_resource_temperature(device, indent + "        ")
+    for device in devices:
+        if not device.is_device:
+            continue
+        print(indent + "    {}: {}".format(device.resource.product_name, device.resource.name))
+        print_resource_temperature(device.resource, indent + "        ")
 
 
-def print_chassis_temperatures(session):
+def print_chassis_temperatures(topology):
     print("Chassis:")
-    filter = session.create_filter()
-    filter.is_present = True
-    filter.is_ni_product = True
-    filter.is_chassis = True
-    for chassis in session.find_hardware(filter):
-        print("    " + chassis.name)
-        print_resource_temperature(chassis, indent="        ")
-        print_device_temperatures(session, chassis.provides_link_name, indent="        ")
+    for chassis in topology.chassis():
+        print("    " + chassis.resource.name)
+        print_resource_temperature(chassis.resource, indent="        ")
+        print_device_temperatures(chassis.children, indent="        ")
 
 
 def print_temperatures():
     with nisyscfg.Session() as session:
-        print_device_temperatures(session, provides_link_name="")
-        print_chassis_temperatures(session)
+        filter = session.create_filter()
+        filter.is_present = True
+        filter.is_ni_product = True
+        # Enumerate the hardware once and walk the chassis/device tree in memory.
+        topology = session.topology(filter)
+        print_device_temperatures(topology.connected_to(""))
+        print_chassis_temperatures(topology)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+import ctypes
+import nisyscfg._library_singleton
+import nisyscfg.errors
+import nisyscfg.retry
+
+
+class Enumerator(object):
+    """
+    Base class of the iterators over native enumerations.
+
+    Subclasses implement __next__ and increment self._position for every item
+    they return.
+
+    retry_policy - An nisyscfg.retry.RetryPolicy that retries the native calls
+    that retrieve items and counts, or None.
+    """
+
+    def __init__(self, handle, retry_policy=None):
+        self._handle = handle
+        self._retry_policy = retry_policy
+        self._library = nisyscfg._library_singleton.get()
+        self._count = None
+        self._position = 0
+
+    def __del__(self):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __bool__(self) -> bool:
+        # An enumerator is true even when it is empty, as it was before it had
+        # a length, and testing it does not cost a native call.
+        return True
+
+    def __len__(self) -> int:
+        """
+        Returns the total number of items in the enumeration once it is known,
+        that is after count() or reset() was called or the enumeration was
+        exhausted. len() never makes a native call, so list(), which asks for
+        the length as a size hint, does not cost a round trip.
+
+        Raises TypeError if the count is not known yet.
+        """
+        if self._count is None:
+            raise TypeError("the count of the enumeration is not known yet, call count()")
+        return self._count
+
+    def count(self) -> int:
+        """
+        Returns the total number of items in the enumeration, including the
+        items that have already been returned.
+
+        Unless the count is already known, this costs a native
+        ResetEnumeratorGetCount call, which rewinds the enumeration; if items
+        have already been returned, they are retrieved again, and the
+        resources among them released, to return to the current position.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        if self._count is None:
+            position = self._position
+            self._count = self._reset_get_count()
+            # Getting the count rewinds the enumeration, so return to where the
+            # caller left off.
+            for _ in range(position):
+                self._skip()
+        return self._count
+
+    def reset(self) -> None:
+        """
+        Rewinds the iterator to the first item so that the items can be
+        iterated again without repeating the native enumeration.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        self._count = self._reset_get_count()
+
+    def _reset_get_count(self):
+        if not self._handle:
+            return 0
+        count = ctypes.c_uint()
+        error_code = self._call("ResetEnumeratorGetCount", self._handle, ctypes.pointer(count))
+        nisyscfg.errors.handle_error(self, error_code)
+        self._position = 0
+        return count.value
+
+    def _end_of_enum(self):
+        # Every item has been returned, so the count is known for free.
+        self._count = self._position
+        return StopIteration()
+
+    def _call(self, name, *args):
+        # Calls a native function that reads from the enumeration, retrying it
+        # according to the retry policy.
+        return nisyscfg.retry.call(self._retry_policy, name, getattr(self._library, name), *args)
+
+    def _skip(self):
+        next(self)
+
+    def close(self) -> None:
+        if self._handle:
+            error_code = self._library.CloseHandle(self._handle)
+            nisyscfg.errors.handle_error(self, error_code)
+            self._handle = None
+
+
+class CachedEnumerator(object):
+    """
+    Iterates over items that were read from a native enumeration once and are
+    shared, for example by the find_hardware() cache or by concurrent callers
+    of a coalescing nisyscfg.Session. The owner of the items releases them,
+    so close() does not.
+    """
+
+    def __init__(self, items):
+        self._items = items
+        self._position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._position >= len(self._items):
+            raise StopIteration()
+        item = self._items[self._position]
+        self._position += 1
+        return item
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def count(self) -> int:
+        """Returns the number of items."""
+        return len(self._items)
+
+    def reset(self) -> None:
+        """Rewinds the iterator to the first item."""
+        self._position = 0
+
+    def close(self) -> None:
+        pass
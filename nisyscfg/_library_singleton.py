@@ -1,4 +1,5 @@
 import ctypes
+import os
 import platform
 import threading
 
@@ -24,6 +25,28 @@ class CTypesLibrary(object):
 
 _instance = None
 _instance_lock = threading.Lock()
+_interceptors = []
+_function_names = tuple(
+    name
+    for name, value in vars(_library.Library).items()
+    if callable(value) and not name.startswith("_")
+)
+# Functions whose second argument is a property ID.
+_property_functions = (
+    "GetResourceProperty",
+    "SetResourceProperty",
+    "SetResourcePropertyWithType",
+    "SetResourcePropertyV",
+    "SetResourcePropertyWithTypeV",
+    "GetResourceIndexedProperty",
+    "GetSystemProperty",
+    "SetSystemProperty",
+    "SetSystemPropertyV",
+    "SetFilterProperty",
+    "SetFilterPropertyWithType",
+    "SetFilterPropertyV",
+    "SetFilterPropertyWithTypeV",
+)
 _library_info = {
     "Linux": {"64bit": {"name": "libnisyscfg.so", "type": "cdll"}},
     "Windows": {
@@ -51,6 +74,11 @@ def get():
     global _instance
 
     with _instance_lock:
+        if _instance is None and os.environ.get("NISYSCFG_SIMULATION"):
+            import nisyscfg.simulation
+
+            _instance = nisyscfg.simulation.SimulatedLibrary(os.environ["NISYSCFG_SIMULATION"])
+            _apply_interceptors(_instance)
         if _instance is None:
             try:
                 library_type = _get_library_type()
@@ -67,4 +95,76 @@ def get():
             except OSError:
                 raise errors.LibraryNotInstalledError()
             _instance = _library.Library(ctypes_library)
+            _apply_interceptors(_instance)
     return _instance
+
+
+def set_instance(library):
+    """
+    Replaces the library returned by get() and returns the previous one.
+
+    library - An object implementing the nisyscfg._library.Library function
+    surface, such as a replay or simulation backend. Passing None causes the
+    next call to get() to load the NI System Configuration runtime again.
+
+    Objects that already hold a reference to the previous library keep using
+    it, so the instance should be replaced before any session is created.
+    """
+    global _instance
+
+    with _instance_lock:
+        previous = _instance
+        if previous is not None:
+            _remove_interceptors(previous)
+        _instance = library
+        if library is not None:
+            _apply_interceptors(library)
+    return previous
+
+
+def add_interceptor(interceptor):
+    """
+    Routes every native call through interceptor(name, func, args).
+
+    The interceptor must call func(*args) and return its status. Interceptors
+    are installed on the library instance itself, so objects created before
+    the interceptor was added are affected as well. While no interceptor is
+    registered, calls go straight to the library with no added overhead.
+    """
+    with _instance_lock:
+        _interceptors.append(interceptor)
+        if _instance is not None:
+            _apply_interceptors(_instance)
+
+
+def remove_interceptor(interceptor):
+    """Removes an interceptor previously passed to add_interceptor()."""
+    with _instance_lock:
+        _interceptors.remove(interceptor)
+        if _instance is not None:
+            _apply_interceptors(_instance)
+
+
+def _intercept(interceptor, name, func):
+    def intercepted(*args):
+        return interceptor(name, func, args)
+
+    return intercepted
+
+
+def _remove_interceptors(library):
+    for name in _function_names:
+        vars(library).pop(name, None)
+
+
+def _apply_interceptors(library):
+    _remove_interceptors(library)
+    if not _interceptors:
+        return
+    for name in _function_names:
+        func = getattr(library, name, None)
+        if func is None:
+            continue
+        for interceptor in _interceptors:
+            func = _intercept(interceptor, name, func)
+        setattr(library, name, func)
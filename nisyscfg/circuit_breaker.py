@@ -0,0 +1,163 @@
+import threading
+import time
+import typing
+
+import nisyscfg.errors
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# The statuses that count as connection failures.
+CONNECTION_STATUSES = frozenset(
+    [
+        nisyscfg.errors.Status.OPERATION_TIMED_OUT,
+        nisyscfg.errors.Status.HOST_NOT_RESOLVED,
+        nisyscfg.errors.Status.NET_SEND_FAILED,
+        nisyscfg.errors.Status.CONTACT_HOST_DISCONNECTED,
+    ]
+)
+
+# The state of the circuit of one target. retry_at is the time.monotonic()
+# time at which an open circuit lets a probe through, or None.
+CircuitState = typing.NamedTuple(
+    "CircuitState",
+    [
+        ("state", str),
+        ("failures", int),
+        ("retry_at", typing.Optional[float]),
+    ],
+)
+
+
+class _Circuit(object):
+    __slots__ = "state", "failures", "retry_at"
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = None
+
+
+def _key(target):
+    return (target or "").strip().lower()
+
+
+class CircuitBreaker(object):
+    """
+    Stops connecting to targets that keep failing to connect.
+
+    The circuit of a target opens after failure_threshold consecutive
+    connection failures, which are LibraryErrors with a status in statuses and
+    TargetUnreachableErrors. While it is open, connecting fails at once with
+    an nisyscfg.errors.CircuitOpenError exception. After reset_timeout seconds
+    the circuit is half-open: one connection attempt is let through as a
+    probe while others keep failing at once. A successful probe closes the
+    circuit and a failed one opens it again.
+
+    Pass a CircuitBreaker to nisyscfg.Session to guard its connection, and
+    share it between the sessions of a fleet.
+
+    Example:
+        breaker = nisyscfg.circuit_breaker.CircuitBreaker()
+        for target in targets:
+            try:
+                with nisyscfg.Session(target, circuit_breaker=breaker) as session:
+                    ...
+            except nisyscfg.errors.CircuitOpenError:
+                continue
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60.0,
+        statuses: typing.Iterable[int] = CONNECTION_STATUSES,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.statuses = frozenset(statuses)
+        self._lock = threading.Lock()
+        self._circuits = {}
+
+    def before_call(self, target: typing.Optional[str]) -> None:
+        """
+        Checks that a connection to target may be attempted.
+
+        Raises an nisyscfg.errors.CircuitOpenError exception if the circuit is
+        open, or half-open with a probe already in progress.
+        """
+        with self._lock:
+            circuit = self._circuits.get(_key(target))
+            if circuit is None or circuit.state == CLOSED:
+                return
+            if circuit.state == OPEN and time.monotonic() >= circuit.retry_at:
+                circuit.state = HALF_OPEN
+                return
+            raise nisyscfg.errors.CircuitOpenError(target, circuit.retry_at)
+
+    def record_success(self, target: typing.Optional[str]) -> None:
+        """Records a successful connection to target, which closes its circuit."""
+        with self._lock:
+            self._circuits.pop(_key(target), None)
+
+    def record_failure(self, target: typing.Optional[str], error: Exception) -> None:
+        """
+        Records a failed connection to target. Other errors, such as a wrong
+        password, show that the target responded, so they close its circuit.
+        """
+        with self._lock:
+            if not self._is_connection_failure(error):
+                self._circuits.pop(_key(target), None)
+                return
+            circuit = self._circuits.setdefault(_key(target), _Circuit())
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.retry_at = time.monotonic() + self.reset_timeout
+
+    def _is_connection_failure(self, error):
+        if isinstance(error, nisyscfg.errors.TargetUnreachableError):
+            return True
+        return isinstance(error, nisyscfg.errors.LibraryError) and error.code in self.statuses
+
+    def call(self, target: typing.Optional[str], func: typing.Callable, *args, **kwargs):
+        """
+        Calls func(*args, **kwargs) as a connection attempt to target and
+        returns its result.
+
+        Raises an nisyscfg.errors.CircuitOpenError exception if the circuit is
+        open, and whatever func raises otherwise.
+        """
+        self.before_call(target)
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as err:
+            self.record_failure(target, err)
+            raise
+        self.record_success(target)
+        return result
+
+    def state(self, target: typing.Optional[str]) -> CircuitState:
+        """Returns the state of the circuit of target."""
+        with self._lock:
+            circuit = self._circuits.get(_key(target))
+            if circuit is None:
+                return CircuitState(CLOSED, 0, None)
+            return CircuitState(circuit.state, circuit.failures, circuit.retry_at)
+
+    def states(self) -> typing.Dict[str, CircuitState]:
+        """Returns the state of every target with recorded failures, keyed by lower-case target."""
+        with self._lock:
+            return {
+                key: CircuitState(circuit.state, circuit.failures, circuit.retry_at)
+                for key, circuit in self._circuits.items()
+            }
+
+    def reset(self, target: typing.Optional[str] = None) -> None:
+        """Closes the circuit of target, or of every target if target is None."""
+        with self._lock:
+            if target is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(_key(target), None)
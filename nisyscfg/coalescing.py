@@ -0,0 +1,46 @@
+import concurrent.futures
+import threading
+import typing
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time. Callers that ask for a key while
+    its call is in flight wait for that call and share its result, or its
+    exception, instead of calling again. A call that starts after the previous
+    one finished runs again, so results are never served stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: typing.Hashable, func: typing.Callable, *args):
+        """
+        Returns func(*args), or the result of the call in flight for key.
+
+        Raises whatever the call raises.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args)
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result
+
+    def in_flight(self) -> int:
+        """Returns the number of calls in flight."""
+        with self._lock:
+            return len(self._calls)
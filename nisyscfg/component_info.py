@@ -1,4 +1,5 @@
 import ctypes
+import nisyscfg._enumerator
 import nisyscfg.enums
 import nisyscfg.errors
 import typing
@@ -19,17 +20,7 @@ ComponentInfo = typing.NamedTuple(
 )
 
 
-class ComponentInfoIterator(object):
-    def __init__(self, handle):
-        self._handle = handle
-        self._library = nisyscfg._library_singleton.get()
-
-    def __del__(self):
-        self.close()
-
-    def __iter__(self):
-        return self
-
+class ComponentInfoIterator(nisyscfg._enumerator.Enumerator):
     def __next__(self) -> ComponentInfo:
         if not self._handle:
             raise StopIteration()
@@ -38,11 +29,17 @@ class ComponentInfoIterator(object):
         title = nisyscfg.types.simple_string()
         item_type = nisyscfg.types.ctypes.c_int()
         c_details = ctypes.POINTER(ctypes.c_char)()
-        error_code = self._library.NextComponentInfo(
-            self._handle, id, version, title, ctypes.pointer(item_type), c_details
+        error_code = self._call(
+            "NextComponentInfo",
+            self._handle,
+            id,
+            version,
+            title,
+            ctypes.pointer(item_type),
+            c_details,
         )
         if error_code == nisyscfg.errors.Status.END_OF_ENUM:
-            raise StopIteration()
+            raise self._end_of_enum()
         nisyscfg.errors.handle_error(self, error_code)
 
         if c_details:
@@ -52,6 +49,7 @@ class ComponentInfoIterator(object):
         else:
             details = None
 
+        self._position += 1
         return ComponentInfo(
             id=c_string_decode(id.value),
             version=c_string_decode(version.value),
@@ -60,12 +58,6 @@ class ComponentInfoIterator(object):
             details=details,
         )
 
-    def close(self) -> None:
-        if self._handle:
-            error_code = self._library.CloseHandle(self._handle)
-            nisyscfg.errors.handle_error(self, error_code)
-            self._handle = None
-
 
 class EnumSoftwareComponent(object):
     def __init__(self):
@@ -107,3 +99,10 @@ class EnumSoftwareComponent(object):
             self._handle, c_string_encode(id), c_string_encode(version), mode
         )
         nisyscfg.errors.handle_error(self, error_code)
+
+
+class CachedComponentInfoIterator(nisyscfg._enumerator.CachedEnumerator):
+    """
+    Iterates over software components shared by concurrent callers of
+    nisyscfg.Session.get_installed_software_components().
+    """
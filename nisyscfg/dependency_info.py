@@ -1,4 +1,5 @@
 import ctypes
+import nisyscfg._enumerator
 import nisyscfg.component_info
 import nisyscfg.enums
 import nisyscfg.errors
@@ -15,17 +16,7 @@ DependencyInfo = typing.NamedTuple(
 )
 
 
-class DependencyInfoIterator(object):
-    def __init__(self, handle):
-        self._handle = handle
-        self._library = nisyscfg._library_singleton.get()
-
-    def __del__(self):
-        self.close()
-
-    def __iter__(self):
-        return self
-
+class DependencyInfoIterator(nisyscfg._enumerator.Enumerator):
     def __next__(self) -> DependencyInfo:
         if not self._handle:
             raise StopIteration()
@@ -39,7 +30,8 @@ class DependencyInfoIterator(object):
         dependee_title = nisyscfg.types.simple_string()
         c_dependee_detailed_description = ctypes.POINTER(ctypes.c_char)()
 
-        error_code = self._library.NextDependencyInfo(
+        error_code = self._call(
+            "NextDependencyInfo",
             self._handle,
             depender_id,
             depender_version,
@@ -51,7 +43,7 @@ class DependencyInfoIterator(object):
             ctypes.pointer(c_dependee_detailed_description),
         )
         if error_code == nisyscfg.errors.Status.END_OF_ENUM:
-            raise StopIteration()
+            raise self._end_of_enum()
         nisyscfg.errors.handle_error(self, error_code)
 
         if c_depender_detailed_description:
@@ -72,6 +64,7 @@ class DependencyInfoIterator(object):
         else:
             dependee_detailed_description = ""
 
+        self._position += 1
         return DependencyInfo(
             depender=nisyscfg.component_info.ComponentInfo(
                 id=c_string_decode(depender_id),
@@ -88,9 +81,3 @@ class DependencyInfoIterator(object):
                 details=dependee_detailed_description,
             ),
         )
-
-    def close(self) -> None:
-        if self._handle:
-            error_code = self._library.CloseHandle(self._handle)
-            nisyscfg.errors.handle_error(self, error_code)
-            self._handle = None
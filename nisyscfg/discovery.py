@@ -0,0 +1,442 @@
+import concurrent.futures
+import contextlib
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+import nisyscfg.enums
+import nisyscfg.errors
+import nisyscfg.system_info
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# Parsing and indexing of system names live in nisyscfg.system_info.
+SystemRecord = nisyscfg.system_info.SystemRecord
+SystemIndex = nisyscfg.system_info.SystemIndex
+parse_system_name = nisyscfg.system_info.parse_system_name
+
+# A change to the systems found by a Watcher. kind is ADDED, REMOVED or
+# CHANGED; previous is the record before a change and None otherwise.
+Event = typing.NamedTuple(
+    "Event",
+    [
+        ("kind", str),
+        ("system", SystemRecord),
+        ("previous", typing.Optional[SystemRecord]),
+    ],
+)
+
+
+def _scan(session, **kwargs):
+    # A system name that cannot be parsed must not fail the whole discovery.
+    iter = session.find_systems(**kwargs)
+    try:
+        return list(iter.records(skip_invalid=True))
+    finally:
+        iter.close()
+
+
+def find_systems(
+    session,
+    device_classes: typing.Union[str, typing.Iterable[str]],
+    cache_modes: typing.Iterable[nisyscfg.enums.IncludeCachedResults] = (
+        nisyscfg.enums.IncludeCachedResults.NONE,
+    ),
+    find_output_mode: nisyscfg.enums.SystemNameFormat = nisyscfg.enums.SystemNameFormat.HOSTNAME_MAC,
+    timeout: float = 4.0,
+    detect_online_systems: bool = True,
+    only_installable_systems: bool = False,
+    max_workers: typing.Optional[int] = None,
+) -> typing.List[SystemRecord]:
+    """
+    Retrieves the systems on the network with one concurrent
+    nisyscfg.Session.find_systems() scan per device class and cache mode, so
+    that the discovery takes as long as the slowest scan instead of the sum
+    of them.
+
+    device_classes - A comma-separated string, such as "PXI,cRIO,sbRIO", or a
+    list of device classes.
+
+    cache_modes - The IncludeCachedResults modes to scan with. Each mode is
+    scanned for each device class.
+
+    find_output_mode - The format of the system names the scans return. The
+    default, HOSTNAME_MAC, reports the MAC address that results are
+    de-duplicated on.
+
+    timeout, detect_online_systems, only_installable_systems - Passed to
+    nisyscfg.Session.find_systems().
+
+    max_workers - The number of threads. The default is one per scan.
+
+    Returns the systems found, each once. Systems are de-duplicated on their
+    MAC address, or on their hostname or IP address when the scan did not
+    report a MAC address, and the fields reported by different scans are
+    combined.
+
+    Raises an nisyscfg.errors.LibraryError exception in the event of an error.
+    """
+    if isinstance(device_classes, str):
+        device_classes = device_classes.split(",")
+    device_classes = [name.strip() for name in device_classes if name.strip()] or [""]
+    scans = [(device_class, mode) for device_class in device_classes for mode in cache_modes]
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers or len(scans), thread_name_prefix="nisyscfg-discovery"
+    ) as executor:
+        futures = [
+            executor.submit(
+                _scan,
+                session,
+                device_class=device_class,
+                detect_online_systems=detect_online_systems,
+                cache_mode=mode,
+                find_output_mode=find_output_mode,
+                timeout=timeout,
+                only_installable_systems=only_installable_systems,
+            )
+            for device_class, mode in scans
+        ]
+        results = [future.result() for future in futures]
+    return list(SystemIndex(system for result in results for system in result))
+
+
+class Watcher(object):
+    """
+    Tracks the systems on the network by running find_systems() scans on a
+    schedule, keeping an indexed table of the systems found and reporting
+    the differences between scans as events.
+
+    The interval between scans starts at interval and is multiplied by
+    backoff after every scan that finds no change, up to max_interval. A scan
+    that finds a change, or fails, returns the interval to interval.
+
+    session - The nisyscfg.Session used to scan, usually a session with the
+    local system. The session must stay open while the watcher runs.
+
+    on_event - Called with each Event, on the thread that scans. An exception
+    that it raises does not stop the watcher; it is kept in last_error.
+
+    device_class, find_output_mode, timeout, only_installable_systems,
+    cache_mode - Passed to nisyscfg.Session.find_systems().
+
+    Systems are identified by their MAC address when the scan reports it, and
+    otherwise by hostname or IP address, so a find_output_mode that includes
+    the MAC address reports a changed hostname or IP address as CHANGED
+    rather than as a REMOVED and an ADDED system.
+
+    Example:
+        with nisyscfg.Session() as session:
+            with nisyscfg.discovery.Watcher(session, on_event=print, device_class="cRIO"):
+                time.sleep(600)
+    """
+
+    def __init__(
+        self,
+        session,
+        on_event: typing.Optional[typing.Callable[[Event], None]] = None,
+        device_class: str = "",
+        find_output_mode: nisyscfg.enums.SystemNameFormat = nisyscfg.enums.SystemNameFormat.HOSTNAME_IP,
+        timeout: float = 4.0,
+        only_installable_systems: bool = False,
+        cache_mode: nisyscfg.enums.IncludeCachedResults = nisyscfg.enums.IncludeCachedResults.NONE,
+        interval: float = 10.0,
+        max_interval: float = 120.0,
+        backoff: float = 2.0,
+    ):
+        self._session = session
+        self._on_event = on_event
+        self._scan_args = dict(
+            device_class=device_class,
+            cache_mode=cache_mode,
+            find_output_mode=find_output_mode,
+            timeout=timeout,
+            only_installable_systems=only_installable_systems,
+        )
+        self._min_interval = interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self.interval = interval
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._systems = SystemIndex()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    @property
+    def systems(self) -> typing.List[SystemRecord]:
+        """The systems found by the last scan."""
+        with self._lock:
+            return list(self._systems)
+
+    def find(self, name: str) -> typing.Optional[SystemRecord]:
+        """
+        Returns the system whose hostname, IP address or MAC address is name,
+        or None. Hostnames and MAC addresses are case-insensitive.
+        """
+        with self._lock:
+            return self._systems.find(name)
+
+    def scan(self) -> typing.List[Event]:
+        """
+        Scans the network once, updates the table of systems and returns the
+        events, which are also passed to on_event. If on_event raises, the
+        remaining events are still passed to it and the first exception is
+        raised afterwards.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        found = SystemIndex(_scan(self._session, **self._scan_args))
+        events = []
+        with self._lock:
+            for system in found:
+                previous = self._systems.get(nisyscfg.system_info.record_key(system))
+                if previous is None:
+                    events.append(Event(ADDED, system, None))
+                elif previous != system:
+                    events.append(Event(CHANGED, system, previous))
+            for system in self._systems:
+                if nisyscfg.system_info.record_key(system) not in found:
+                    events.append(Event(REMOVED, system, None))
+            self._systems = found
+            if events:
+                self.interval = self._min_interval
+            else:
+                self.interval = min(self.interval * self._backoff, self._max_interval)
+        if self._on_event is not None:
+            error = None
+            for event in events:
+                try:
+                    self._on_event(event)
+                except Exception as err:
+                    error = error or err
+            if error is not None:
+                raise error
+        return events
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+                self.last_error = None
+            except nisyscfg.errors.LibraryError as err:
+                self.last_error = err
+                self.interval = self._min_interval
+            except Exception as err:
+                # An exception from on_event must not stop the watcher.
+                self.last_error = err
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Starts scanning on a background thread. The first scan starts immediately."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="nisyscfg-discovery", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: typing.Optional[float] = None) -> None:
+        """
+        Stops the background scans and waits up to timeout seconds, or until
+        a scan in progress finishes, for the thread to exit.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def default_cache_path() -> pathlib.Path:
+    """
+    Returns the default location of the DiscoveryCache database, in the
+    user's cache directory.
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    if base:
+        base = pathlib.Path(base)
+    else:
+        base = pathlib.Path.home() / ".cache"
+    return base / "nisyscfg" / "discovery.sqlite"
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    scope TEXT PRIMARY KEY,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS systems (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    hostname TEXT NOT NULL,
+    ip_address TEXT NOT NULL,
+    mac_address TEXT NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+"""
+
+
+class DiscoveryCache(object):
+    """
+    An SQLite database of find_systems() results that is shared by
+    processes, so that a new process can report the systems on the network
+    without waiting for a scan.
+
+    path - The database file. The default is default_cache_path().
+
+    ttl - The age, in seconds, after which a scan is refreshed. The default
+    is 300 (5 minutes).
+
+    max_age - The time, in seconds, after which a system that no scan has
+    reported is deleted from the database. The default is one day. Only the
+    systems found by the latest scan of a scope are returned, regardless of
+    max_age.
+
+    Example:
+        cache = nisyscfg.discovery.DiscoveryCache()
+        with nisyscfg.Session() as session:
+            for system in cache.find_systems(session, "cRIO"):
+                print(system.hostname)
+            cache.wait()
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[None, str, pathlib.Path] = None,
+        ttl: float = 300.0,
+        max_age: float = 86400.0,
+    ):
+        self.path = pathlib.Path(path) if path is not None else default_cache_path()
+        self.ttl = ttl
+        self.max_age = max_age
+        self._refreshes = {}
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(str(self.path), timeout=10.0)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, scope: str) -> typing.Tuple[typing.Optional[float], typing.List[SystemRecord]]:
+        """
+        Returns when scope was last scanned, or None if it never was, and the
+        systems that the latest scan of scope found.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT scanned_at FROM scans WHERE scope = ?", (scope,)
+            ).fetchone()
+            if row is None:
+                return None, []
+            rows = connection.execute(
+                "SELECT hostname, ip_address, mac_address FROM systems"
+                " WHERE scope = ? AND last_seen >= ? ORDER BY rowid",
+                (scope, row[0]),
+            ).fetchall()
+        return row[0], [SystemRecord(*row) for row in rows]
+
+    def put(self, scope: str, systems: typing.Iterable[SystemRecord]) -> None:
+        """Records a scan of scope that found systems."""
+        now = time.time()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO systems"
+                " (scope, key, hostname, ip_address, mac_address, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (scope, nisyscfg.system_info.record_key(system)) + tuple(system) + (now,)
+                    for system in systems
+                ],
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO scans (scope, scanned_at) VALUES (?, ?)", (scope, now)
+            )
+            connection.execute("DELETE FROM systems WHERE last_seen < ?", (now - self.max_age,))
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM systems")
+            connection.execute("DELETE FROM scans")
+
+    def find_systems(
+        self,
+        session,
+        device_classes: typing.Union[str, typing.Iterable[str]] = "",
+        refresh: bool = False,
+        **kwargs
+    ) -> typing.List[SystemRecord]:
+        """
+        Returns the systems on the network from the cache, scanning with
+        nisyscfg.discovery.find_systems() only when needed.
+
+        If the cache holds a scan younger than ttl, its systems are returned.
+        If it holds an older scan, its systems are returned immediately and a
+        background thread scans again and updates the cache; call wait()
+        before closing session. If it holds no scan, or refresh is True, the
+        network is scanned before returning.
+
+        session, device_classes, **kwargs - Passed to
+        nisyscfg.discovery.find_systems(). Each combination of device classes
+        and options is cached separately.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        if isinstance(device_classes, str):
+            device_classes = device_classes.split(",")
+        device_classes = [name.strip() for name in device_classes if name.strip()]
+        # Only the scope ignores case; the native call gets the names as given.
+        options = sorted((name, repr(value)) for name, value in kwargs.items())
+        scope = repr((sorted({name.lower() for name in device_classes}), options))
+        scanned_at, systems = self.get(scope)
+        if scanned_at is None or refresh:
+            systems = find_systems(session, device_classes, **kwargs)
+            self.put(scope, systems)
+            return systems
+        if time.time() - scanned_at >= self.ttl:
+            self._refresh(scope, session, device_classes, kwargs)
+        return systems
+
+    def _refresh(self, scope, session, device_classes, kwargs):
+        def run():
+            try:
+                self.put(scope, find_systems(session, device_classes, **kwargs))
+            except nisyscfg.errors.LibraryError:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshes.pop(scope, None)
+
+        with self._lock:
+            if scope in self._refreshes:
+                return
+            thread = threading.Thread(target=run, name="nisyscfg-discovery-cache", daemon=True)
+            self._refreshes[scope] = thread
+        thread.start()
+
+    def wait(self, timeout: typing.Optional[float] = None) -> None:
+        """Waits for the background refreshes started by find_systems() to finish."""
+        with self._lock:
+            threads = list(self._refreshes.values())
+        for thread in threads:
+            thread.join(timeout)
@@ -51,6 +51,20 @@ class LibraryWarning(Warning):
         super(LibraryWarning, self).__init__(message)
 
 
+class CircuitOpenError(Error):
+    """
+    This error is raised instead of connecting to a target whose circuit
+    breaker is open after repeated connection failures.
+    """
+
+    def __init__(self, target, retry_at):
+        self.target = target
+        self.retry_at = retry_at
+        super(CircuitOpenError, self).__init__(
+            "Not connecting to {} after repeated connection failures".format(target)
+        )
+
+
 class UnsupportedPlatformError(Error):
     def __init__(self):
         super(UnsupportedPlatformError, self).__init__(
@@ -68,6 +82,21 @@ class LibraryNotInstalledError(Error):
         )
 
 
+class ReplayError(Error):
+    """This error is raised when a call does not match the replayed recording."""
+
+
+class TargetUnreachableError(Error):
+    """This error is raised when a session's pre-flight probe cannot reach the target."""
+
+    def __init__(self, target, port):
+        self.target = target
+        self.port = port
+        super(TargetUnreachableError, self).__init__(
+            "Target {} is not reachable on port {}".format(target, port)
+        )
+
+
 def handle_error(session, code, ignore_warnings=False, is_error_handling=False):
     if _is_success(code) or (_is_warning(code) and ignore_warnings):
         return
@@ -1,3 +1,4 @@
+import nisyscfg._enumerator
 import nisyscfg.errors
 import typing
 
@@ -14,17 +15,7 @@ ExpertInfo = typing.NamedTuple(
 )
 
 
-class ExpertInfoIterator(object):
-    def __init__(self, handle):
-        self._handle = handle
-        self._library = nisyscfg._library_singleton.get()
-
-    def __del__(self):
-        self.close()
-
-    def __iter__(self):
-        return self
-
+class ExpertInfoIterator(nisyscfg._enumerator.Enumerator):
     def __next__(self) -> ExpertInfo:
         if not self._handle:
             # TODO(tkrebes): raise RuntimeError
@@ -32,18 +23,13 @@ class ExpertInfoIterator(object):
         expert_name = nisyscfg.types.simple_string()
         display_name = nisyscfg.types.simple_string()
         version = nisyscfg.types.simple_string()
-        error_code = self._library.NextExpertInfo(self._handle, expert_name, display_name, version)
+        error_code = self._call("NextExpertInfo", self._handle, expert_name, display_name, version)
         if error_code == nisyscfg.errors.Status.END_OF_ENUM:
-            raise StopIteration()
+            raise self._end_of_enum()
         nisyscfg.errors.handle_error(self, error_code)
+        self._position += 1
         return ExpertInfo(
             c_string_decode(expert_name.value),
             c_string_decode(display_name.value),
             c_string_decode(version.value),
         )
-
-    def close(self) -> None:
-        if self._handle:
-            error_code = self._library.CloseHandle(self._handle)
-            nisyscfg.errors.handle_error(self, error_code)
-            self._handle = None
@@ -3,7 +3,9 @@ import nisyscfg.errors
 import nisyscfg.properties
 import nisyscfg.xnet.properties
 
+from functools import reduce
 from nisyscfg._lib import c_string_encode
+from typing import Any, Iterator, Mapping, Tuple, Union
 
 
 @nisyscfg.properties.PropertyBag(nisyscfg.properties.Filter)
@@ -12,6 +14,8 @@ class Filter(object):
     def __init__(self, session):
         self._handle = nisyscfg.types.FilterHandle()
         self._library = nisyscfg._library_singleton.get()
+        # Set properties by ID, used to identify equivalent filters.
+        self._properties = {}
         self._property_accessor = nisyscfg.properties.PropertyAccessor(
             setter=self._set_property_with_type
         )
@@ -29,13 +33,102 @@ class Filter(object):
 
     def _set_property_with_type(self, id, value, c_type, nisyscfg_type):
         if c_type == ctypes.c_char_p:
-            value = c_string_encode(value)
+            c_value = c_string_encode(value)
         elif issubclass(c_type, nisyscfg.enums.BaseEnum) or issubclass(
             c_type, nisyscfg.enums.BaseFlag
         ):
-            value = ctypes.c_int(value)
+            c_value = ctypes.c_int(value)
         else:
-            value = c_type(value)
+            c_value = c_type(value)
 
-        error_code = self._library.SetFilterPropertyWithType(self._handle, id, nisyscfg_type, value)
+        error_code = self._library.SetFilterPropertyWithType(
+            self._handle, id, nisyscfg_type, c_value
+        )
         nisyscfg.errors.handle_error(self, error_code)
+        self._properties[id] = value
+
+
+def _property_names(group, prefix=""):
+    return frozenset(
+        prefix + name.lower()
+        for name in dir(group)
+        if isinstance(getattr(group, name), nisyscfg.properties.TypeProperty)
+    )
+
+
+_PROPERTY_NAMES = _property_names(nisyscfg.properties.Filter) | _property_names(
+    nisyscfg.xnet.properties.Filter, "xnet."
+)
+
+
+class FilterSpec(object):
+    """
+    An immutable description of a hardware filter. Pass a FilterSpec wherever
+    nisyscfg.Session.find_hardware() accepts a filter; the session keeps a
+    pool of native filters that are already populated, so repeating a query
+    with an equal FilterSpec does not create or set up a filter again.
+
+    FilterSpec objects are hashable and can be pickled.
+
+    properties - Maps filter property names, such as "is_chassis" or
+    "xnet.port_number", to values. Names may also be passed as keyword
+    arguments.
+
+    Example:
+        spec = nisyscfg.filter.FilterSpec(is_chassis=True)
+        spec = nisyscfg.filter.FilterSpec({"xnet.port_number": 1})
+
+    Raises a ValueError exception if a name is not a filter property.
+    """
+
+    __slots__ = ("_items", "_hash")
+
+    def __init__(self, properties: Union[None, Mapping[str, Any]] = None, **kwargs):
+        values = dict(properties or {})
+        values.update(kwargs)
+        unknown = sorted(name for name in values if name not in _PROPERTY_NAMES)
+        if unknown:
+            raise ValueError("Unknown filter properties: {}".format(", ".join(unknown)))
+        items = tuple(sorted(values.items()))
+        object.__setattr__(self, "_items", items)
+        # Enum and bool values hash and compare equal to their integer values.
+        object.__setattr__(self, "_hash", hash(items))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FilterSpec is immutable")
+
+    def __reduce__(self):
+        return FilterSpec, (dict(self._items),)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, FilterSpec):
+            return NotImplemented
+        return self._items == other._items
+
+    def __ne__(self, other):
+        if not isinstance(other, FilterSpec):
+            return NotImplemented
+        return self._items != other._items
+
+    def __repr__(self):
+        return "FilterSpec({!r})".format(dict(self._items))
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def apply(self, filter: Filter) -> None:
+        """
+        Sets the properties of the spec on filter.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        for name, value in self._items:
+            path = name.split(".")
+            setattr(reduce(getattr, path[:-1], filter), path[-1], value)
@@ -1,11 +1,16 @@
 import ctypes
+import functools
 from functools import reduce
+import nisyscfg._enumerator
 import nisyscfg.errors
 import nisyscfg.properties
 import nisyscfg.pxi.properties
+import nisyscfg.retry
 import nisyscfg.timestamp
 import nisyscfg.types
 import nisyscfg.xnet.properties
+import queue
+import threading
 import typing
 
 from nisyscfg._lib import c_string_decode
@@ -50,42 +55,232 @@ DeleteResult = typing.NamedTuple(
 )
 
 
-class HardwareResourceIterator(object):
-    def __init__(self, session, handle):
+class HardwareResourceIterator(nisyscfg._enumerator.Enumerator):
+    def __init__(self, session, handle, on_modified=None, retry_policy=None):
         self._children = []
         self._session = session
-        self._handle = handle
-        self._library = nisyscfg._library_singleton.get()
-
-    def __del__(self):
-        self.close()
-
-    def __iter__(self):
-        return self
+        self._on_modified = on_modified
+        super(HardwareResourceIterator, self).__init__(handle, retry_policy)
 
     def __next__(self):
         if not self._handle:
             # TODO(tkrebes): raise RuntimeError
             raise StopIteration()
         resource_handle = nisyscfg.types.ResourceHandle()
-        error_code = self._library.NextResource(
-            self._session, self._handle, ctypes.pointer(resource_handle)
+        error_code = self._call(
+            "NextResource", self._session, self._handle, ctypes.pointer(resource_handle)
         )
         if error_code == nisyscfg.errors.Status.END_OF_ENUM:
-            raise StopIteration()
+            raise self._end_of_enum()
         nisyscfg.errors.handle_error(self, error_code)
-        resource = HardwareResource(resource_handle)
+        resource = HardwareResource(resource_handle, self._on_modified, self._retry_policy)
         self._children.append(resource)
+        self._position += 1
         return resource
 
+    def _skip(self):
+        resource = next(self)
+        self._children.remove(resource)
+        resource.close()
+
     def close(self):
         self._children.reverse()
         for child in self._children:
             child.close()
-        if self._handle:
-            error_code = self._library.CloseHandle(self._handle)
-            nisyscfg.errors.handle_error(self, error_code)
-            self._handle = None
+        super(HardwareResourceIterator, self).close()
+
+
+# Marks the end of the enumeration in the prefetch queue.
+_END_OF_ENUM = object()
+
+
+def _prefetch_resources(library, retry_policy, session, handle, properties, items, stop):
+    # Runs on the prefetch thread. It holds no reference to the iterator so
+    # that an abandoned iterator can still be garbage collected and closed.
+    while not stop.is_set():
+        resource_handle = nisyscfg.types.ResourceHandle()
+        error_code = nisyscfg.retry.call(
+            retry_policy,
+            "NextResource",
+            library.NextResource,
+            session,
+            handle,
+            ctypes.pointer(resource_handle),
+        )
+        if error_code == nisyscfg.errors.Status.END_OF_ENUM:
+            item = _END_OF_ENUM
+        else:
+            try:
+                nisyscfg.errors.handle_error(None, error_code)
+                item = HardwareResource(resource_handle, retry_policy=retry_policy)
+                item._prefetch(properties)
+            except Exception as err:
+                item = err
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        else:
+            if isinstance(item, HardwareResource):
+                item.close()
+            return
+        if not isinstance(item, HardwareResource):
+            return
+
+
+class PrefetchingHardwareResourceIterator(HardwareResourceIterator):
+    """
+    Iterates over hardware resources that a background thread retrieves,
+    together with the values of selected properties, ahead of the consumer.
+
+    Each prefetched property value is served once from the prefetch; reading
+    the property again queries the resource.
+    """
+
+    def __init__(self, session, handle, depth, properties, on_modified=None, retry_policy=None):
+        self._thread = None
+        self._depth = depth
+        self._properties = tuple(properties)
+        self._done = False
+        super(PrefetchingHardwareResourceIterator, self).__init__(
+            session, handle, on_modified, retry_policy
+        )
+        # Get the count before the worker starts because getting it rewinds
+        # the enumeration.
+        self._count = self._reset_get_count()
+        self._start_worker()
+
+    def __next__(self):
+        if self._done or not self._handle:
+            raise StopIteration()
+        item = self._items.get()
+        if item is _END_OF_ENUM:
+            self._done = True
+            raise StopIteration()
+        if isinstance(item, Exception):
+            self._done = True
+            raise item
+        item._on_modified = self._on_modified
+        self._children.append(item)
+        self._position += 1
+        return item
+
+    def reset(self) -> None:
+        """
+        Rewinds the iterator to the first item so that the items can be
+        iterated again without repeating the native enumeration. Resources
+        that were prefetched but not returned yet are closed.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        self._stop_worker()
+        super(PrefetchingHardwareResourceIterator, self).reset()
+        self._done = False
+        self._start_worker()
+
+    def _start_worker(self):
+        if not self._handle:
+            return
+        self._items = queue.Queue(maxsize=self._depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=_prefetch_resources,
+            args=(
+                self._library,
+                self._retry_policy,
+                self._session,
+                self._handle,
+                self._properties,
+                self._items,
+                self._stop,
+            ),
+            name="nisyscfg-prefetch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _stop_worker(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        while not self._items.empty():
+            item = self._items.get_nowait()
+            if isinstance(item, HardwareResource):
+                item.close()
+
+    def close(self):
+        self._stop_worker()
+        super(PrefetchingHardwareResourceIterator, self).close()
+
+
+class CachedHardwareResourceIterator(nisyscfg._enumerator.CachedEnumerator):
+    """
+    Iterates over hardware resources held by a session's find_hardware()
+    cache, or shared by concurrent callers of find_hardware(). The session
+    owns the resources, so close() does not close them.
+    """
+
+
+@functools.lru_cache(maxsize=32)
+def record_type(properties: typing.Tuple[str, ...]) -> typing.Type[tuple]:
+    """
+    Returns the NamedTuple class of the records that
+    nisyscfg.Session.find_hardware_records() yields for a projection. Each
+    property name is a field, with "." replaced by "_", for example
+    "xnet.port_number" becomes the xnet_port_number field.
+    """
+    return typing.NamedTuple(
+        "HardwareRecord", [(name.replace(".", "_"), typing.Any) for name in properties]
+    )
+
+
+class HardwareRecordIterator(nisyscfg._enumerator.Enumerator):
+    """
+    Iterates over the hardware in an enumeration as records of property
+    values. The native handle of each resource is closed as soon as its
+    properties are read, so no resources are held between items. Properties
+    that a resource does not have are None and indexed properties are tuples.
+    """
+
+    def __init__(self, session, handle, properties, retry_policy=None):
+        self._session = session
+        self._properties = tuple(properties)
+        self._record_type = record_type(self._properties)
+        super(HardwareRecordIterator, self).__init__(handle, retry_policy)
+
+    def _next_resource(self):
+        if not self._handle:
+            raise StopIteration()
+        resource_handle = nisyscfg.types.ResourceHandle()
+        error_code = self._call(
+            "NextResource", self._session, self._handle, ctypes.pointer(resource_handle)
+        )
+        if error_code == nisyscfg.errors.Status.END_OF_ENUM:
+            raise self._end_of_enum()
+        nisyscfg.errors.handle_error(self, error_code)
+        return HardwareResource(resource_handle, retry_policy=self._retry_policy)
+
+    def __next__(self):
+        resource = self._next_resource()
+        try:
+            values = []
+            for name in self._properties:
+                value = resource.get_property(name, None)
+                if isinstance(value, nisyscfg.properties.IndexedPropertyItems):
+                    value = tuple(value)
+                values.append(value)
+        finally:
+            resource.close()
+        self._position += 1
+        return self._record_type._make(values)
+
+    def _skip(self):
+        self._next_resource().close()
 
 
 @nisyscfg.properties.PropertyBag(nisyscfg.properties.Resource, nisyscfg.properties.IndexedResource)
@@ -96,14 +291,17 @@ class HardwareResourceIterator(object):
 )
 @nisyscfg.properties.PropertyBag(nisyscfg.xnet.properties.Resource, expert="xnet")
 class HardwareResource(object):
-    def __init__(self, handle):
+    def __init__(self, handle, on_modified=None, retry_policy=None):
         self._handle = handle
+        self._on_modified = on_modified
+        self._retry_policy = retry_policy
         self._library = nisyscfg._library_singleton.get()
         self._property_accessor = nisyscfg.properties.PropertyAccessor(
             setter=self._set_property,
             getter=self._get_property,
             indexed_getter=self._get_indexed_property,
         )
+        self._prefetched = None
 
     def __del__(self):
         self.close()
@@ -134,7 +332,51 @@ class HardwareResource(object):
             nisyscfg.errors.handle_error(self, error_code)
             self._handle = None
 
+    def _prefetch(self, names):
+        prefetched = {}
+
+        def record(key, func, *args):
+            try:
+                value = func(*args)
+            except nisyscfg.errors.LibraryError as err:
+                prefetched[key] = err
+                raise
+            prefetched[key] = value
+            return value
+
+        property_accessor = self._property_accessor
+        self._property_accessor = nisyscfg.properties.PropertyAccessor(
+            setter=self._set_property,
+            getter=lambda id, c_type: record(id, self._get_property, id, c_type),
+            indexed_getter=lambda id, index, c_type: record(
+                (id, index), self._get_indexed_property, id, index, c_type
+            ),
+        )
+        try:
+            for name in names:
+                try:
+                    value = reduce(getattr, name.split("."), self)
+                    if isinstance(value, nisyscfg.properties.IndexedPropertyItems):
+                        list(value)
+                except nisyscfg.errors.LibraryError:
+                    pass
+        finally:
+            self._property_accessor = property_accessor
+        self._prefetched = prefetched
+
+    def _modified(self):
+        if self._on_modified is not None:
+            self._on_modified()
+
+    def _take_prefetched(self, key):
+        value = self._prefetched.pop(key)
+        if isinstance(value, nisyscfg.errors.LibraryError):
+            raise value
+        return value
+
     def _get_property(self, id, c_type):
+        if self._prefetched and id in self._prefetched:
+            return self._take_prefetched(id)
         if c_type == ctypes.c_char_p:
             value = nisyscfg.types.simple_string()
             value_arg = value
@@ -147,7 +389,14 @@ class HardwareResource(object):
             value = c_type(0)
             value_arg = ctypes.pointer(value)
 
-        error_code = self._library.GetResourceProperty(self._handle, id, value_arg)
+        error_code = nisyscfg.retry.call(
+            self._retry_policy,
+            "GetResourceProperty",
+            self._library.GetResourceProperty,
+            self._handle,
+            id,
+            value_arg,
+        )
         nisyscfg.errors.handle_error(self, error_code)
 
         if issubclass(c_type, nisyscfg.enums.BaseEnum) or issubclass(
@@ -161,6 +410,8 @@ class HardwareResource(object):
         return c_string_decode(value.value)
 
     def _get_indexed_property(self, id, index, c_type):
+        if self._prefetched and (id, index) in self._prefetched:
+            return self._take_prefetched((id, index))
         if c_type == ctypes.c_char_p:
             value = nisyscfg.types.simple_string()
             value_arg = value
@@ -173,7 +424,15 @@ class HardwareResource(object):
             value = c_type()
             value_arg = ctypes.pointer(value)
 
-        error_code = self._library.GetResourceIndexedProperty(self._handle, id, index, value_arg)
+        error_code = nisyscfg.retry.call(
+            self._retry_policy,
+            "GetResourceIndexedProperty",
+            self._library.GetResourceIndexedProperty,
+            self._handle,
+            id,
+            index,
+            value_arg,
+        )
         nisyscfg.errors.handle_error(self, error_code)
 
         if issubclass(c_type, nisyscfg.enums.BaseEnum) or issubclass(
@@ -258,11 +517,12 @@ class HardwareResource(object):
             ctypes.pointer(overwritten_resource_handle),
         )
         nisyscfg.errors.handle_error(self, error_code)
+        self._modified()
 
         # TODO(tkrebes): Ensure lifetime of HardwareResource does not exceed the
         # session.
         overwritten_resource = overwritten_resource_handle.value and HardwareResource(
-            overwritten_resource_handle
+            overwritten_resource_handle, self._on_modified
         )
 
         # Do not return the bool 'name_already_existed' since it is equivalent
@@ -304,6 +564,7 @@ class HardwareResource(object):
             error_code_2 = self._library.FreeDetailedString(c_details)
         nisyscfg.errors.handle_error(self, error_code)
         nisyscfg.errors.handle_error(self, error_code_2)
+        self._modified()
 
         return SaveChangesResult(restart_required=restart_required.value != 0, details=details)
 
@@ -544,6 +805,8 @@ class HardwareResource(object):
             error_code_2 = self._library.FreeDetailedString(c_details)
         nisyscfg.errors.handle_error(self, error_code)
         nisyscfg.errors.handle_error(self, error_code_2)
+        if mode != nisyscfg.enums.DeleteValidationMode.VALIDATE_BUT_DO_NOT_DELETE:
+            self._modified()
 
         return DeleteResult(
             dependent_items_deleted=dependent_items_deleted.value != 0, details=details
@@ -0,0 +1,222 @@
+import contextlib
+import threading
+import time
+import typing
+
+import nisyscfg._library_singleton
+
+
+# Each power of two is split into 2**_SUB_BUCKET_BITS linear buckets, which
+# bounds the relative error of a recorded latency to 1/8.
+_SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+# Latency statistics of a native function or property ID, in seconds. histogram
+# lists (upper bound, count) pairs for every non-empty bucket in increasing order.
+CallStats = typing.NamedTuple(
+    "CallStats",
+    [
+        ("calls", int),
+        ("errors", int),
+        ("total_time", float),
+        ("min_time", float),
+        ("max_time", float),
+        ("mean_time", float),
+        ("p50", float),
+        ("p90", float),
+        ("p99", float),
+        ("histogram", typing.List[typing.Tuple[float, int]]),
+    ],
+)
+# Statistics keyed by native function name and, for the property getters and
+# setters, by property ID.
+Snapshot = typing.NamedTuple(
+    "Snapshot",
+    [
+        ("functions", typing.Dict[str, CallStats]),
+        ("properties", typing.Dict[int, CallStats]),
+    ],
+)
+
+
+def _bucket_index(nanoseconds):
+    if nanoseconds < _SUB_BUCKETS:
+        return nanoseconds
+    exponent = nanoseconds.bit_length() - 1
+    sub_bucket = (nanoseconds >> (exponent - _SUB_BUCKET_BITS)) & (_SUB_BUCKETS - 1)
+    return ((exponent - _SUB_BUCKET_BITS + 1) << _SUB_BUCKET_BITS) + sub_bucket
+
+
+def _bucket_upper_bound(index):
+    if index < _SUB_BUCKETS:
+        return index + 1
+    exponent = (index >> _SUB_BUCKET_BITS) + _SUB_BUCKET_BITS - 1
+    width = 1 << (exponent - _SUB_BUCKET_BITS)
+    return (_SUB_BUCKETS + (index & (_SUB_BUCKETS - 1))) * width + width
+
+
+class _Histogram(object):
+    __slots__ = "calls", "errors", "total", "min", "max", "buckets"
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = {}
+
+    def record(self, nanoseconds, error):
+        self.calls += 1
+        if error:
+            self.errors += 1
+        self.total += nanoseconds
+        if self.min is None or nanoseconds < self.min:
+            self.min = nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+        index = _bucket_index(nanoseconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, fraction):
+        threshold = fraction * self.calls
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= threshold:
+                return min(_bucket_upper_bound(index), self.max)
+        return self.max
+
+    def stats(self):
+        return CallStats(
+            calls=self.calls,
+            errors=self.errors,
+            total_time=self.total / 1e9,
+            min_time=(self.min or 0) / 1e9,
+            max_time=self.max / 1e9,
+            mean_time=self.total / self.calls / 1e9 if self.calls else 0.0,
+            p50=self.percentile(0.5) / 1e9,
+            p90=self.percentile(0.9) / 1e9,
+            p99=self.percentile(0.99) / 1e9,
+            histogram=[
+                (min(_bucket_upper_bound(index), self.max) / 1e9, self.buckets[index])
+                for index in sorted(self.buckets)
+            ],
+        )
+
+
+class Collector(object):
+    """
+    Records the call count, error count and latency histogram of every
+    native call. A Collector is an interceptor; use collect() or enable() to
+    install one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._functions = {}
+        self._properties = {}
+
+    def __call__(self, name, func, args):
+        start = time.perf_counter_ns()
+        status = func(*args)
+        elapsed = time.perf_counter_ns() - start
+        error = status < 0
+        with self._lock:
+            histogram = self._functions.get(name)
+            if histogram is None:
+                histogram = self._functions[name] = _Histogram()
+            histogram.record(elapsed, error)
+            if name in nisyscfg._library_singleton._property_functions:
+                histogram = self._properties.get(args[1])
+                if histogram is None:
+                    histogram = self._properties[args[1]] = _Histogram()
+                histogram.record(elapsed, error)
+        return status
+
+    def reset(self):
+        """Discards everything recorded so far."""
+        with self._lock:
+            self._functions = {}
+            self._properties = {}
+
+    def snapshot(self) -> Snapshot:
+        """Returns the statistics recorded so far."""
+        with self._lock:
+            return Snapshot(
+                functions={name: h.stats() for name, h in self._functions.items()},
+                properties={id: h.stats() for id, h in self._properties.items()},
+            )
+
+
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def enable():
+    """
+    Starts recording native call statistics for the whole process.
+
+    While instrumentation is disabled, native calls are not wrapped at all.
+    """
+    global _collector
+
+    with _collector_lock:
+        if _collector is None:
+            _collector = Collector()
+            nisyscfg._library_singleton.add_interceptor(_collector)
+
+
+def disable():
+    """Stops recording native call statistics and discards them."""
+    global _collector
+
+    with _collector_lock:
+        if _collector is not None:
+            nisyscfg._library_singleton.remove_interceptor(_collector)
+            _collector = None
+
+
+def is_enabled() -> bool:
+    """Returns whether enable() has been called without a matching disable()."""
+    return _collector is not None
+
+
+def reset():
+    """Discards the statistics recorded since enable()."""
+    with _collector_lock:
+        if _collector is not None:
+            _collector.reset()
+
+
+def snapshot() -> Snapshot:
+    """
+    Returns the statistics recorded since enable() or the last reset(). The
+    snapshot is empty while instrumentation is disabled.
+    """
+    with _collector_lock:
+        if _collector is None:
+            return Snapshot(functions={}, properties={})
+        return _collector.snapshot()
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    Records native call statistics for the duration of a with-block,
+    independently of enable().
+
+    Example:
+        with nisyscfg.instrumentation.collect() as collector:
+            with nisyscfg.Session() as session:
+                for resource in session.find_hardware():
+                    resource.serial_number
+        stats = collector.snapshot()
+        print(stats.functions["GetResourceProperty"].p99)
+    """
+    collector = Collector()
+    nisyscfg._library_singleton.add_interceptor(collector)
+    try:
+        yield collector
+    finally:
+        nisyscfg._library_singleton.remove_interceptor(collector)
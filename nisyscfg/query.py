@@ -0,0 +1,610 @@
+import operator
+import re
+import typing
+
+import nisyscfg.enums
+import nisyscfg.errors
+import nisyscfg.filter
+import nisyscfg.hardware_resource
+import nisyscfg.properties
+import nisyscfg.xnet.properties
+
+
+def _filter_names(group, prefix=""):
+    return {
+        prefix + name.lower(): prefix + name.lower()
+        for name in dir(group)
+        if isinstance(getattr(group, name), nisyscfg.properties.TypeProperty)
+    }
+
+
+# Maps resource property names to the Filter property that matches the same
+# value. Equality on these properties can be evaluated by FindHardware.
+_PUSHDOWN_NAMES = _filter_names(nisyscfg.properties.Filter)
+_PUSHDOWN_NAMES.update(
+    {
+        "expert_resource_name": "resource_name",
+        "expert_user_alias": "user_alias",
+    }
+)
+# NI-XNET filter properties are only pushed down when the query is limited to
+# the xnet expert.
+_XNET_PUSHDOWN_NAMES = _filter_names(nisyscfg.xnet.properties.Filter, "xnet.")
+
+# A resource and the property values read from it. Values are read the first
+# time a predicate needs them and then kept; properties that the resource
+# does not have are None and indexed properties are lists.
+Record = typing.NamedTuple(
+    "Record",
+    [
+        ("resource", nisyscfg.hardware_resource.HardwareResource),
+        ("values", typing.Dict[str, typing.Any]),
+    ],
+)
+
+
+def _read(resource, name):
+    value = resource.get_property(name, None)
+    if isinstance(value, nisyscfg.properties.IndexedPropertyItems):
+        value = list(value)
+    return value
+
+
+class _Values(dict):
+    __slots__ = ("_resource",)
+
+    def __init__(self, resource):
+        super(_Values, self).__init__()
+        self._resource = resource
+
+    def __missing__(self, name):
+        value = self[name] = _read(self._resource, name)
+        return value
+
+
+def _record(resource, properties=()):
+    values = _Values(resource)
+    for name in properties:
+        values[name]
+    return Record(resource, values)
+
+
+class Predicate(object):
+    """
+    A condition on resource properties. Combine predicates with & (and),
+    | (or) and ~ (not).
+    """
+
+    def __and__(self, other):
+        return _And(self, other)
+
+    def __or__(self, other):
+        return _Or(self, other)
+
+    def __invert__(self):
+        return _Not(self)
+
+    def fields(self) -> typing.Set[str]:
+        """Returns the names of the properties the predicate reads."""
+        raise NotImplementedError
+
+    def compile(self) -> typing.Callable[[typing.Mapping[str, typing.Any]], bool]:
+        """
+        Returns a function that evaluates the predicate against a mapping of
+        property names to values.
+        """
+        raise NotImplementedError
+
+
+class _Term(Predicate):
+    def __init__(self, field, test, description):
+        self.field = field
+        self._test = test
+        self._description = description
+
+    def __repr__(self):
+        return "{} {}".format(self.field, self._description)
+
+    def fields(self):
+        return {self.field}
+
+    def compile(self):
+        name = self.field
+        test = self._test
+
+        def evaluate(values):
+            value = values[name]
+            if value is None:
+                return False
+            if isinstance(value, list):
+                return any(item is not None and test(item) for item in value)
+            return test(value)
+
+        return evaluate
+
+
+class _Comparison(_Term):
+    def __init__(self, field, op, value, symbol):
+        def test(item):
+            try:
+                return op(item, value)
+            except TypeError:
+                return False
+
+        super(_Comparison, self).__init__(field, test, "{} {!r}".format(symbol, value))
+        self.op = op
+        self.value = value
+
+
+class _Exists(_Term):
+    def __init__(self, field):
+        super(_Exists, self).__init__(field, None, "exists")
+
+    def compile(self):
+        name = self.field
+        return lambda values: values[name] is not None
+
+
+class _And(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = []
+        for predicate in predicates:
+            if isinstance(predicate, _And):
+                self.predicates.extend(predicate.predicates)
+            else:
+                self.predicates.append(predicate)
+
+    def __repr__(self):
+        return "(" + " & ".join(repr(p) for p in self.predicates) + ")"
+
+    def fields(self):
+        return set().union(*(p.fields() for p in self.predicates))
+
+    def compile(self):
+        tests = tuple(p.compile() for p in self.predicates)
+        return lambda values: all(test(values) for test in tests)
+
+
+class _Or(Predicate):
+    def __init__(self, *predicates):
+        self.predicates = []
+        for predicate in predicates:
+            if isinstance(predicate, _Or):
+                self.predicates.extend(predicate.predicates)
+            else:
+                self.predicates.append(predicate)
+
+    def __repr__(self):
+        return "(" + " | ".join(repr(p) for p in self.predicates) + ")"
+
+    def fields(self):
+        return set().union(*(p.fields() for p in self.predicates))
+
+    def compile(self):
+        tests = tuple(p.compile() for p in self.predicates)
+        return lambda values: any(test(values) for test in tests)
+
+
+class _Not(Predicate):
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    def __repr__(self):
+        return "~{!r}".format(self.predicate)
+
+    def fields(self):
+        return self.predicate.fields()
+
+    def compile(self):
+        test = self.predicate.compile()
+        return lambda values: not test(values)
+
+
+class _All(Predicate):
+    def __repr__(self):
+        return "ALL"
+
+    def fields(self):
+        return set()
+
+    def compile(self):
+        return lambda values: True
+
+
+class Field(object):
+    """
+    A resource property in a query, named like the argument of
+    HardwareResource.get_property(), for example "slot_number" or
+    "xnet.port_number". Comparing a field builds a Predicate. A predicate on
+    an indexed property, such as expert_user_alias, is true when any of its
+    values matches, and a predicate on a property that the resource does not
+    have is false.
+    """
+
+    __hash__ = None
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __repr__(self):
+        return self._name
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return Field(self._name + "." + name)
+
+    def __eq__(self, value) -> Predicate:
+        return _Comparison(self._name, operator.eq, value, "==")
+
+    def __ne__(self, value) -> Predicate:
+        return _Comparison(self._name, operator.ne, value, "!=")
+
+    def __lt__(self, value) -> Predicate:
+        return _Comparison(self._name, operator.lt, value, "<")
+
+    def __le__(self, value) -> Predicate:
+        return _Comparison(self._name, operator.le, value, "<=")
+
+    def __gt__(self, value) -> Predicate:
+        return _Comparison(self._name, operator.gt, value, ">")
+
+    def __ge__(self, value) -> Predicate:
+        return _Comparison(self._name, operator.ge, value, ">=")
+
+    def between(self, low, high) -> Predicate:
+        """Matches values from low to high, inclusive."""
+
+        def test(item):
+            try:
+                return low <= item <= high
+            except TypeError:
+                return False
+
+        return _Term(self._name, test, "between {!r} and {!r}".format(low, high))
+
+    def isin(self, values: typing.Iterable) -> Predicate:
+        """Matches any of the values."""
+        values = frozenset(values)
+        return _Term(self._name, values.__contains__, "in {!r}".format(set(values)))
+
+    def matches(self, pattern: typing.Union[str, typing.Pattern], flags: int = 0) -> Predicate:
+        """Matches string values in which the regular expression pattern is found."""
+        search = re.compile(pattern, flags).search
+        return _Term(
+            self._name,
+            lambda item: isinstance(item, str) and search(item) is not None,
+            "matches {!r}".format(pattern),
+        )
+
+    def exists(self) -> Predicate:
+        """Matches resources that have the property."""
+        return _Exists(self._name)
+
+
+class _FieldFactory(object):
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return Field(name)
+
+
+# Builds fields by attribute access, for example P.slot_number or
+# P.xnet.port_number.
+P = _FieldFactory()
+
+
+def field(name: str) -> Field:
+    """Returns the field for a property name such as "xnet.port_number"."""
+    return Field(name)
+
+
+# The Python types of the values that each type of filter property holds, and
+# the range of the integer ones.
+_PUSHDOWN_TYPES = (
+    (nisyscfg.properties.BoolProperty, bool, None),
+    (nisyscfg.properties.UnsignedIntProperty, int, (0, 2**32)),
+    (nisyscfg.properties.IntProperty, int, (-(2**31), 2**31)),
+    (nisyscfg.properties.DoubleProperty, (int, float), None),
+    (nisyscfg.properties.StringProperty, str, None),
+)
+
+
+def _fits(name, value):
+    # Returns whether value can be set on the filter property name; values of
+    # other types are compared after enumeration instead, like Inventory.where().
+    group = nisyscfg.properties.Filter
+    if name.startswith("xnet."):
+        group, name = nisyscfg.xnet.properties.Filter, name.partition(".")[2]
+    property = getattr(group, name.upper())
+    for property_type, value_type, bounds in _PUSHDOWN_TYPES:
+        if isinstance(property, property_type):
+            if not isinstance(value, value_type):
+                return False
+            return bounds is None or bounds[0] <= value < bounds[1]
+    return False
+
+
+def _split_pushdown(predicate, expert_names):
+    names = dict(_PUSHDOWN_NAMES)
+    if expert_names.strip().lower() == "xnet":
+        names.update(_XNET_PUSHDOWN_NAMES)
+    terms = predicate.predicates if isinstance(predicate, _And) else [predicate]
+    pushed = {}
+    residual = []
+    for term in terms:
+        if (
+            type(term) is _Comparison
+            and term.op is operator.eq
+            and isinstance(term.value, (bool, int, float, str))
+            and term.field in names
+            and names[term.field] not in pushed
+            and _fits(names[term.field], term.value)
+        ):
+            pushed[names[term.field]] = term.value
+        else:
+            residual.append(term)
+    if not residual:
+        return pushed, _All()
+    if len(residual) == 1:
+        return pushed, residual[0]
+    return pushed, _And(*residual)
+
+
+# The properties that Inventory indexes by default.
+INDEX_PROPERTIES = (
+    "serial_number",
+    "expert_user_alias",
+    "expert_resource_name",
+    "tcp_mac_address",
+    "mac_address",
+    "product_id",
+)
+
+# The properties that identify a resource across Inventory.refresh() calls.
+_IDENTITY_PROPERTIES = ("expert_resource_name", "expert_user_alias")
+
+
+def _index_key(name, value):
+    if name.endswith("mac_address") and isinstance(value, str):
+        return value.replace("-", ":").upper()
+    return value
+
+
+def _identity(values):
+    return tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (values[name] for name in _IDENTITY_PROPERTIES)
+    )
+
+
+class Inventory(object):
+    """
+    A snapshot of the hardware in a system that queries are evaluated
+    against without further enumeration. Property values are read once per
+    resource and kept, and lookups by an indexed property are dictionary
+    lookups.
+
+    session - The nisyscfg.Session to enumerate.
+
+    properties - Names of properties to read for every resource up front.
+    Properties that a query needs and that were not listed are read the first
+    time they are needed.
+
+    filter, mode, expert_names - Limit the resources in the inventory, as for
+    nisyscfg.Session.find_hardware().
+
+    prefetch - The read-ahead depth passed to nisyscfg.Session.find_hardware().
+
+    indexes - Names of properties to index when the inventory is built. The
+    default is INDEX_PROPERTIES. lookup() indexes other properties the first
+    time they are looked up.
+
+    Raises an nisyscfg.errors.LibraryError exception in the event of an error.
+    """
+
+    def __init__(
+        self,
+        session,
+        properties: typing.Iterable[str] = (),
+        filter=None,
+        mode: nisyscfg.enums.FilterMode = nisyscfg.enums.FilterMode.MATCH_VALUES_ALL,
+        expert_names: str = "",
+        prefetch: int = 0,
+        indexes: typing.Iterable[str] = INDEX_PROPERTIES,
+    ):
+        self._session = session
+        self._filter = filter
+        self._mode = mode
+        self._expert_names = expert_names
+        self._prefetch = prefetch
+        self._index_names = tuple(indexes)
+        # The names and aliases identify resources across refresh() calls, so
+        # they are read up front too.
+        self._properties = tuple(
+            dict.fromkeys(tuple(properties) + self._index_names + _IDENTITY_PROPERTIES)
+        )
+        self._resources = self._enumerate(self._properties)
+        self.records = [_record(resource, self._properties) for resource in self._resources]
+        self._build_indexes()
+
+    def _enumerate(self, properties):
+        return self._session.find_hardware(
+            self._filter,
+            self._mode,
+            self._expert_names,
+            prefetch=self._prefetch,
+            prefetch_properties=properties,
+        )
+
+    def _build_indexes(self):
+        self._indexes = {}
+        for name in self._index_names:
+            self._index(name)
+
+    def _index(self, name):
+        index = self._indexes.get(name)
+        if index is None:
+            index = {}
+            for record in self.records:
+                value = record.values[name]
+                for item in value if isinstance(value, list) else [value]:
+                    if item is not None and item != "":
+                        records = index.setdefault(_index_key(name, item), [])
+                        if not records or records[-1] is not record:
+                            records.append(record)
+            self._indexes[name] = index
+        return index
+
+    def refresh(self) -> None:
+        """
+        Enumerates the hardware again and updates the inventory.
+
+        The native API does not report changes, so a refresh still costs a
+        full enumeration and reading the resource names and aliases of every
+        resource. Resources whose resource names and aliases are unchanged
+        keep the other values that were already read; only the properties of
+        new or renamed resources are read again. The session's find_hardware()
+        cache is invalidated first so that the enumeration is not served from
+        it. The resources of the previous enumeration are closed.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        known = {}
+        for record in self.records:
+            known.setdefault(_identity(record.values), []).append(record.values)
+        records = []
+        previous_resources = self._resources
+        self._session.invalidate_hardware_cache()
+        self._resources = self._enumerate(_IDENTITY_PROPERTIES)
+        for resource in self._resources:
+            values = _Values(resource)
+            for name in _IDENTITY_PROPERTIES:
+                values[name]
+            previous = known.get(_identity(values))
+            if previous:
+                values = previous.pop(0)
+                values._resource = resource
+            else:
+                for name in self._properties:
+                    values[name]
+            records.append(Record(resource, values))
+        self.records = records
+        self._build_indexes()
+        if previous_resources is not self._resources:
+            self._session._close_child(previous_resources)
+
+    def lookup(self, name: str, value) -> typing.List[Record]:
+        """
+        Returns the records whose property name equals value. For an indexed
+        property such as expert_user_alias, any of its values may match. MAC
+        addresses match regardless of case and of "-" or ":" separators.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        return list(self._index(name).get(_index_key(name, value), ()))
+
+    def _find(self, names, value):
+        for name in names:
+            records = self.lookup(name, value)
+            if records:
+                return records[0].resource
+        return None
+
+    def find_by_serial_number(
+        self, serial_number: str
+    ) -> typing.Optional[nisyscfg.hardware_resource.HardwareResource]:
+        """Returns the resource with a serial number, or None."""
+        return self._find(("serial_number",), serial_number)
+
+    def find_by_alias(
+        self, alias: str
+    ) -> typing.Optional[nisyscfg.hardware_resource.HardwareResource]:
+        """Returns the resource with an expert user alias, or None."""
+        return self._find(("expert_user_alias",), alias)
+
+    def find_by_resource_name(
+        self, resource_name: str
+    ) -> typing.Optional[nisyscfg.hardware_resource.HardwareResource]:
+        """Returns the resource with an expert resource name, or None."""
+        return self._find(("expert_resource_name",), resource_name)
+
+    def find_by_mac_address(
+        self, mac_address: str
+    ) -> typing.Optional[nisyscfg.hardware_resource.HardwareResource]:
+        """
+        Returns the resource whose tcp_mac_address or mac_address is
+        mac_address, or None.
+        """
+        return self._find(("tcp_mac_address", "mac_address"), mac_address)
+
+    def find_by_product_id(
+        self, product_id: int
+    ) -> typing.List[nisyscfg.hardware_resource.HardwareResource]:
+        """Returns the resources with a product ID."""
+        return [record.resource for record in self.lookup("product_id", product_id)]
+
+    def __iter__(self) -> typing.Iterator[Record]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def where(self, predicate: Predicate) -> typing.List[Record]:
+        """
+        Returns the records that match predicate.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        test = predicate.compile()
+        return [record for record in self.records if test(record.values)]
+
+    def select(
+        self, predicate: Predicate
+    ) -> typing.List[nisyscfg.hardware_resource.HardwareResource]:
+        """
+        Returns the resources that match predicate.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        return [record.resource for record in self.where(predicate)]
+
+
+def select(
+    session,
+    predicate: Predicate,
+    expert_names: str = "",
+    prefetch: int = 0,
+) -> typing.Iterator[nisyscfg.hardware_resource.HardwareResource]:
+    """
+    Yields the hardware resources in a system that match predicate.
+
+    Equality comparisons that are joined by & at the top level of the
+    predicate and that a hardware filter supports, for example
+    P.is_chassis == True or P.expert_user_alias == "PXI1Slot2", are evaluated
+    by FindHardware so that only the candidate resources are enumerated. The
+    rest of the predicate is evaluated for each candidate, and the properties
+    it reads are prefetched with the resource. The filter comes from the
+    session's filter pool, so repeating a query does not set it up again.
+
+    expert_names - The experts to query, as for
+    nisyscfg.Session.find_hardware(). NI-XNET filter properties are only
+    pushed down when expert_names is "xnet".
+
+    prefetch - The read-ahead depth passed to nisyscfg.Session.find_hardware().
+
+    Raises an nisyscfg.errors.LibraryError exception in the event of an error.
+    """
+    pushed, residual = _split_pushdown(predicate, expert_names or "")
+    filter = nisyscfg.filter.FilterSpec(pushed) if pushed else None
+    test = residual.compile()
+    fields = sorted(residual.fields())
+    for resource in session.find_hardware(
+        filter, expert_names=expert_names, prefetch=prefetch, prefetch_properties=fields
+    ):
+        if test(_record(resource).values):
+            yield resource
@@ -0,0 +1,91 @@
+import concurrent.futures
+import socket
+import threading
+import time
+import typing
+
+import nisyscfg.system_info
+
+# The port of the NI Service Locator, which remote System Configuration
+# sessions connect through.
+DEFAULT_PORT = 3580
+
+# How long, in seconds, a probe result is reused for the same target and port.
+CACHE_TTL = 5.0
+
+_LOCAL_TARGETS = ("", "localhost", "127.0.0.1", "::1")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def is_local(target: typing.Optional[str]) -> bool:
+    """Returns whether target means the local system, as for nisyscfg.Session."""
+    return (target or "").strip().lower() in _LOCAL_TARGETS
+
+
+def probe(
+    target: str,
+    port: typing.Optional[int] = None,
+    timeout: float = 0.5,
+    cache_ttl: typing.Optional[float] = None,
+) -> bool:
+    """
+    Returns whether a TCP connection to target can be opened within timeout
+    seconds. This is much faster than waiting for a session with an offline
+    target to time out.
+
+    The result is cached for cache_ttl seconds, CACHE_TTL by default, so
+    repeated probes of the same target and port return at once. Local targets
+    and targets given by MAC address, which cannot be probed, are reported as
+    reachable without probing. Resolving a hostname is not limited by
+    timeout.
+
+    port - The port to connect to. The default is DEFAULT_PORT.
+    """
+    if port is None:
+        port = DEFAULT_PORT
+    if cache_ttl is None:
+        cache_ttl = CACHE_TTL
+    if is_local(target) or nisyscfg.system_info.is_mac_address(target.strip()):
+        return True
+    key = (target.strip().lower(), port)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    try:
+        with socket.create_connection((target.strip(), port), timeout=timeout):
+            reachable = True
+    except OSError:
+        reachable = False
+    with _cache_lock:
+        _cache[key] = (reachable, time.monotonic() + cache_ttl)
+    return reachable
+
+
+def probe_many(
+    targets: typing.Iterable[str],
+    port: typing.Optional[int] = None,
+    timeout: float = 0.5,
+    max_workers: int = 32,
+) -> typing.Dict[str, bool]:
+    """
+    Probes targets concurrently and returns whether each one is reachable,
+    so a fleet of targets takes about as long as one timeout to check.
+    """
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        return {}
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(targets)), thread_name_prefix="nisyscfg-probe"
+    ) as executor:
+        results = executor.map(lambda target: probe(target, port, timeout), targets)
+        return dict(zip(targets, results))
+
+
+def clear_cache() -> None:
+    """Discards the cached probe results."""
+    with _cache_lock:
+        _cache.clear()
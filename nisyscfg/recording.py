@@ -0,0 +1,269 @@
+import collections
+import contextlib
+import ctypes
+import gzip
+import json
+import threading
+import time
+import typing
+
+import nisyscfg._library_singleton
+import nisyscfg.errors
+
+
+FORMAT_NAME = "nisyscfg-recording"
+FORMAT_VERSION = 1
+
+CallRecord = typing.NamedTuple(
+    "CallRecord",
+    [
+        ("function", str),
+        ("args", list),
+        ("outputs", dict),
+        ("status", int),
+        ("latency", float),
+    ],
+)
+
+
+def _encode(value):
+    if value is None or isinstance(value, (bool, float, str)):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, bytes):
+        return {"b": value.decode("latin-1")}
+    if isinstance(value, ctypes.Array):
+        if value._type_ is ctypes.c_char:
+            return {"b": value.value.decode("latin-1")}
+        return [_encode(item) for item in value]
+    if isinstance(value, ctypes._Pointer):
+        if not value:
+            return None
+        if value._type_ is ctypes.c_char:
+            return {"s": ctypes.cast(value, ctypes.c_char_p).value.decode("latin-1")}
+        return {"p": _encode(value.contents)}
+    if isinstance(value, ctypes._SimpleCData):
+        return _encode(value.value)
+    return {"r": repr(value)}
+
+
+def _is_output(value):
+    # A pointer to char is an input string (or a string being freed); reading
+    # it again after the call could touch released memory.
+    if isinstance(value, ctypes._Pointer):
+        return value._type_ is not ctypes.c_char
+    return isinstance(value, (ctypes.Array, ctypes._SimpleCData))
+
+
+def _decode_scalar(encoded):
+    if isinstance(encoded, dict) and "b" in encoded:
+        return encoded["b"].encode("latin-1")
+    return encoded
+
+
+def _decode_into(target, encoded, keepalive):
+    if isinstance(target, ctypes.Array):
+        if target._type_ is ctypes.c_char:
+            target.value = encoded["b"].encode("latin-1")
+        else:
+            for index, item in enumerate(encoded):
+                target[index] = _decode_scalar(item)
+    elif isinstance(target, ctypes._Pointer):
+        pointee = target._type_
+        contents = None if encoded is None else encoded["p"]
+        if issubclass(pointee, ctypes._Pointer) and pointee._type_ is ctypes.c_char:
+            if contents is None:
+                target[0] = pointee()
+            else:
+                buffer = ctypes.create_string_buffer(contents["s"].encode("latin-1"))
+                keepalive[ctypes.addressof(buffer)] = buffer
+                target[0] = ctypes.cast(buffer, pointee)
+        else:
+            _decode_into(target.contents, contents, keepalive)
+    elif isinstance(target, ctypes._SimpleCData):
+        target.value = _decode_scalar(encoded)
+
+
+def _to_status(code):
+    try:
+        return nisyscfg.errors.Status(code)
+    except ValueError:
+        return code
+
+
+class Recorder(object):
+    """
+    Captures every native call with its arguments, outputs, status and
+    latency to a gzip-compressed JSON-lines file.
+
+    The recorder is an interceptor; use record() to install it for the
+    duration of a with-block.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = gzip.open(str(path), "wt", encoding="utf-8")
+        self._write({"format": FORMAT_NAME, "version": FORMAT_VERSION})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __call__(self, name, func, args):
+        before = [_encode(arg) for arg in args]
+        start = time.perf_counter()
+        status = func(*args)
+        latency = time.perf_counter() - start
+        outputs = {}
+        for index, arg in enumerate(args):
+            if _is_output(arg):
+                after = _encode(arg)
+                if after != before[index]:
+                    outputs[str(index)] = after
+        self._write({"f": name, "a": before, "o": outputs, "s": int(status), "t": latency})
+        return status
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load(path) -> typing.List[CallRecord]:
+    """
+    Returns the calls captured in a recording file.
+
+    Raises an nisyscfg.errors.ReplayError exception if the file is not a
+    recording.
+    """
+    records = []
+    with gzip.open(str(path), "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != FORMAT_NAME or header.get("version") != FORMAT_VERSION:
+            raise nisyscfg.errors.ReplayError("{} is not a nisyscfg recording.".format(path))
+        for line in f:
+            entry = json.loads(line)
+            records.append(
+                CallRecord(
+                    function=entry["f"],
+                    args=entry["a"],
+                    outputs=entry["o"],
+                    status=entry["s"],
+                    latency=entry["t"],
+                )
+            )
+    return records
+
+
+class ReplayLibrary(object):
+    """
+    Serves the calls of a recording in place of the native library.
+
+    records - A path to a recording file or a list of CallRecord.
+
+    strict - Requires calls to arrive in exactly the recorded order. If False,
+    each function replays its own recorded calls in order, independently of
+    the other functions.
+
+    timing - Sleeps for the recorded latency of each call, multiplied by this
+    factor. The default of 0 replays as fast as possible.
+
+    Raises an nisyscfg.errors.ReplayError exception from a call that does not
+    match the recording or that is made after the recording is exhausted.
+    """
+
+    def __init__(self, records, strict: bool = True, timing: float = 0.0):
+        if not isinstance(records, list):
+            records = load(records)
+        self._lock = threading.Lock()
+        self._strict = strict
+        self._timing = float(timing)
+        self._keepalive = {}
+        self._sequence = collections.deque(records)
+        self._queues = collections.defaultdict(collections.deque)
+        for record in records:
+            self._queues[record.function].append(record)
+
+    def __getattr__(self, name):
+        if name not in nisyscfg._library_singleton._function_names:
+            raise AttributeError(name)
+
+        def replayed(*args):
+            return self._replay(name, args)
+
+        replayed.__name__ = name
+        return replayed
+
+    @property
+    def remaining(self) -> int:
+        """Number of recorded calls that have not been replayed yet."""
+        with self._lock:
+            if self._strict:
+                return len(self._sequence)
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _next_record(self, name):
+        with self._lock:
+            queue = self._sequence if self._strict else self._queues[name]
+            if not queue:
+                raise nisyscfg.errors.ReplayError("Recording has no more calls to {}.".format(name))
+            if queue[0].function != name:
+                raise nisyscfg.errors.ReplayError(
+                    "Expected a call to {} but {} was called.".format(queue[0].function, name)
+                )
+            return queue.popleft()
+
+    def _replay(self, name, args):
+        record = self._next_record(name)
+        if name == "FreeDetailedString" and args:
+            self._keepalive.pop(ctypes.cast(args[0], ctypes.c_void_p).value, None)
+        for index, encoded in record.outputs.items():
+            _decode_into(args[int(index)], encoded, self._keepalive)
+        if self._timing:
+            time.sleep(record.latency * self._timing)
+        return _to_status(record.status)
+
+
+@contextlib.contextmanager
+def record(path):
+    """
+    Records every native call made inside the with-block to path.
+
+    Example:
+        with nisyscfg.recording.record("inventory.rec.gz"):
+            with nisyscfg.Session() as session:
+                for resource in session.find_hardware():
+                    print(resource.serial_number)
+    """
+    recorder = Recorder(path)
+    nisyscfg._library_singleton.add_interceptor(recorder)
+    try:
+        yield recorder
+    finally:
+        nisyscfg._library_singleton.remove_interceptor(recorder)
+        recorder.close()
+
+
+@contextlib.contextmanager
+def replay(path, strict: bool = True, timing: float = 0.0):
+    """
+    Serves native calls made inside the with-block from a recording instead
+    of the NI System Configuration runtime. See ReplayLibrary for the
+    parameters.
+    """
+    library = ReplayLibrary(path, strict=strict, timing=timing)
+    previous = nisyscfg._library_singleton.set_instance(library)
+    try:
+        yield library
+    finally:
+        nisyscfg._library_singleton.set_instance(previous)
@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+import typing
+
+import nisyscfg.errors
+
+# The statuses of transient failures, after which an idempotent call is
+# retried by default.
+TRANSIENT_STATUSES = frozenset(
+    [
+        nisyscfg.errors.Status.NET_SEND_FAILED,
+        nisyscfg.errors.Status.TIMEOUT,
+        nisyscfg.errors.Status.DDP_INTERNAL_TIMEOUT,
+        nisyscfg.errors.Status.CONTACT_HOST_DISCONNECTED,
+    ]
+)
+
+# Retry counters of a native function. recovered counts calls that succeeded
+# after a retry; exhausted counts calls that still failed with a retryable
+# status when the attempts or the deadline ran out.
+RetryStats = typing.NamedTuple(
+    "RetryStats",
+    [
+        ("calls", int),
+        ("retries", int),
+        ("recovered", int),
+        ("exhausted", int),
+    ],
+)
+
+
+def call(policy: typing.Optional["RetryPolicy"], name: str, func: typing.Callable, *args) -> int:
+    """Calls the native function func(*args) through policy, or once if policy is None."""
+    if policy is None:
+        return func(*args)
+    return policy.call(name, func, *args)
+
+
+class RetryPolicy(object):
+    """
+    Retries idempotent native calls that fail with a transient status.
+
+    A call is attempted up to max_attempts times. Before retry n, the policy
+    sleeps a random time of up to base_delay * 2 ** (n - 1) seconds, capped at
+    max_delay ("full jitter"), so that many clients retrying at once do not
+    hit a target in lockstep. No retry is started that would sleep past
+    deadline seconds from the first attempt, and the native timeout of calls
+    that take one, such as connecting and find_systems(), is limited to the
+    time left before the deadline.
+
+    Pass a RetryPolicy to nisyscfg.Session to retry its reads and
+    enumerations, such as connecting, find_hardware(), find_systems(),
+    get_installed_software_components(), reading system and resource
+    properties and retrieving the items of enumerations. Operations that
+    change the system, such as install() or format(), are never retried.
+
+    Example:
+        policy = nisyscfg.retry.RetryPolicy(max_attempts=5, deadline=30.0)
+        with nisyscfg.Session("crio-1", retry_policy=policy) as session:
+            ...
+        print(policy.stats())
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        deadline: typing.Optional[float] = None,
+        statuses: typing.Iterable[int] = TRANSIENT_STATUSES,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def is_retryable(self, status: int) -> bool:
+        """Returns whether a call that returned status may be retried."""
+        return status in self.statuses
+
+    def backoff(self, retry: int) -> float:
+        """Returns a random delay, in seconds, before retry number retry, starting at 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def call(
+        self, name: str, func: typing.Callable, *args, timeout_index: typing.Optional[int] = None
+    ) -> int:
+        """
+        Calls the native function func(*args), named name in the counters,
+        until it returns a status that is not retryable or the attempts or
+        the deadline run out, and returns the last status.
+
+        timeout_index - The index in args of a timeout in milliseconds, which
+        is limited to the time left before the deadline for each attempt.
+        """
+        start = time.monotonic()
+        retries = 0
+        while True:
+            if self.deadline is not None and timeout_index is not None:
+                remaining = self.deadline - (time.monotonic() - start)
+                args = list(args)
+                args[timeout_index] = max(1, min(args[timeout_index], int(remaining * 1000)))
+            status = func(*args)
+            if not self.is_retryable(status):
+                break
+            if retries + 1 >= self.max_attempts:
+                break
+            delay = self.backoff(retries + 1)
+            if self.deadline is not None and time.monotonic() + delay - start > self.deadline:
+                break
+            time.sleep(delay)
+            retries += 1
+        self._count(name, retries, self.is_retryable(status))
+        return status
+
+    def _count(self, name, retries, exhausted):
+        with self._lock:
+            calls, total, recovered, failed = self._stats.get(name, (0, 0, 0, 0))
+            self._stats[name] = RetryStats(
+                calls + 1,
+                total + retries,
+                recovered + (1 if retries and not exhausted else 0),
+                failed + (1 if exhausted else 0),
+            )
+
+    def stats(self) -> typing.Dict[str, RetryStats]:
+        """Returns the retry counters of every native function called through the policy."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """Discards the retry counters."""
+        with self._lock:
+            self._stats.clear()
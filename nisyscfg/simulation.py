@@ -0,0 +1,1163 @@
+import contextlib
+import ctypes
+import functools
+import itertools
+import json
+import random
+import threading
+import time
+
+import nisyscfg._library_singleton
+import nisyscfg.enums
+import nisyscfg.errors
+import nisyscfg.properties
+import nisyscfg.pxi.properties
+import nisyscfg.types
+import nisyscfg.xnet.properties
+
+from nisyscfg._lib import c_string_decode
+from nisyscfg._lib import c_string_encode
+
+Status = nisyscfg.errors.Status
+
+
+def _property_table(groups):
+    table = {}
+    for prefix, group in groups:
+        for name in dir(group):
+            type_property = getattr(group, name)
+            if isinstance(type_property, nisyscfg.properties.TypeProperty):
+                table[prefix + name] = type_property
+    return table
+
+
+_RESOURCE_PROPERTIES = _property_table(
+    [
+        ("", nisyscfg.properties.Resource),
+        ("", nisyscfg.properties.IndexedResource),
+        ("pxi.", nisyscfg.pxi.properties.Resource),
+        ("pxi.", nisyscfg.pxi.properties.IndexedResource),
+        ("xnet.", nisyscfg.xnet.properties.Resource),
+    ]
+)
+_SYSTEM_PROPERTIES = _property_table([("", nisyscfg.properties.System)])
+
+_EXPERT_NAME = nisyscfg.properties.IndexedResource.EXPERT_NAME._id
+_EXPERT_RESOURCE_NAME = nisyscfg.properties.IndexedResource.EXPERT_RESOURCE_NAME._id
+_EXPERT_USER_ALIAS = nisyscfg.properties.IndexedResource.EXPERT_USER_ALIAS._id
+_SERVICE_TYPE = nisyscfg.properties.IndexedResource.SERVICE_TYPE._id
+_IS_CHASSIS = nisyscfg.properties.Resource.IS_CHASSIS._id
+_IS_DEVICE = nisyscfg.properties.Resource.IS_DEVICE._id
+_IS_PRESENT = nisyscfg.properties.Resource.IS_PRESENT._id
+_IS_SIMULATED = nisyscfg.properties.Resource.IS_SIMULATED._id
+_CONNECTS_TO_LINK_NAME = nisyscfg.properties.Resource.CONNECTS_TO_LINK_NAME._id
+_PROVIDES_LINK_NAME = nisyscfg.properties.Resource.PROVIDES_LINK_NAME._id
+_SYSTEM_RESOURCE_HANDLE = 16941086
+
+# Filter properties that match against any index of an indexed resource property.
+_INDEXED_FILTER_PROPERTIES = (
+    _EXPERT_NAME,
+    _EXPERT_RESOURCE_NAME,
+    _EXPERT_USER_ALIAS,
+    _SERVICE_TYPE,
+)
+
+_RESOURCE_DEFAULTS = {
+    _IS_PRESENT: int(nisyscfg.enums.IsPresentType.PRESENT),
+    nisyscfg.properties.Resource.IS_NI_PRODUCT._id: 1,
+    _IS_SIMULATED: 0,
+    _IS_CHASSIS: 0,
+}
+
+_SYSTEM_NAME_FORMATS = {
+    nisyscfg.enums.SystemNameFormat.HOSTNAME: ("hostname",),
+    nisyscfg.enums.SystemNameFormat.HOSTNAME_IP: ("hostname", "ip_address"),
+    nisyscfg.enums.SystemNameFormat.HOSTNAME_MAC: ("hostname", "mac_address"),
+    nisyscfg.enums.SystemNameFormat.IP: ("ip_address",),
+    nisyscfg.enums.SystemNameFormat.IP_HOSTNAME: ("ip_address", "hostname"),
+    nisyscfg.enums.SystemNameFormat.IP_MAC: ("ip_address", "mac_address"),
+    nisyscfg.enums.SystemNameFormat.MAC: ("mac_address",),
+    nisyscfg.enums.SystemNameFormat.MAC_HOSTNAME: ("mac_address", "hostname"),
+    nisyscfg.enums.SystemNameFormat.MAC_IP: ("mac_address", "ip_address"),
+}
+
+
+def _lookup_property(table, key):
+    if isinstance(key, int) or key.isdigit():
+        id = int(key)
+        for type_property in table.values():
+            if type_property._id == id:
+                return type_property
+        raise KeyError(key)
+    prefix, _, name = key.rpartition(".")
+    return table[(prefix.lower() + "." if prefix else "") + name.upper()]
+
+
+def _is_indexed(type_property):
+    return isinstance(type_property, nisyscfg.properties.IndexedProperty)
+
+
+def _coerce(type_property, value, variables):
+    if isinstance(value, str) and variables:
+        value = value.format(**variables)
+    if isinstance(
+        type_property,
+        (nisyscfg.properties.StringProperty, nisyscfg.properties.IndexedStringProperty),
+    ):
+        return str(value)
+    if isinstance(
+        type_property,
+        (
+            nisyscfg.properties.DoubleProperty,
+            nisyscfg.properties.IndexedDoubleProperty,
+            nisyscfg.properties.TimestampProperty,
+            nisyscfg.properties.IndexedTimestampProperty,
+        ),
+    ):
+        return float(value)
+    if isinstance(value, str) and type_property._enum is not None:
+        try:
+            return int(type_property._enum[value.upper()])
+        except KeyError:
+            pass
+    return int(value)
+
+
+def _parse_status(value):
+    if isinstance(value, str):
+        return Status[value.upper()]
+    return int(value)
+
+
+def _to_status(code):
+    try:
+        return Status(code)
+    except ValueError:
+        return code
+
+
+def _handle_value(handle):
+    if handle is None:
+        return 0
+    if isinstance(handle, ctypes.c_void_p):
+        return handle.value or 0
+    return int(handle)
+
+
+def _read_string(value):
+    if value is None:
+        return ""
+    if isinstance(value, ctypes._Pointer):
+        value = ctypes.cast(value, ctypes.c_char_p).value
+    elif isinstance(value, (ctypes.Array, ctypes._SimpleCData)):
+        value = value.value
+    return c_string_decode(value) or ""
+
+
+def _read_value(value):
+    if isinstance(value, bytes):
+        return c_string_decode(value)
+    if isinstance(value, ctypes.Array):
+        if value._type_ is ctypes.c_char:
+            return c_string_decode(value.value)
+        return _seconds_from_timestamp(value)
+    if isinstance(value, ctypes._Pointer) and value._type_ is ctypes.c_char:
+        return _read_string(value)
+    if isinstance(value, ctypes._SimpleCData):
+        value = value.value
+        return c_string_decode(value) if isinstance(value, bytes) else value
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _normalize(value):
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _timestamp_from_seconds(seconds):
+    whole = int(seconds // 1)
+    fraction = int(round((seconds - whole) * 2**64)) & 0xFFFFFFFFFFFFFFFF
+    return [fraction & 0xFFFFFFFF, fraction >> 32, whole & 0xFFFFFFFF, (whole >> 32) & 0xFFFFFFFF]
+
+
+def _seconds_from_timestamp(timestamp):
+    fraction = timestamp[0] | (timestamp[1] << 32)
+    whole = timestamp[2] | (timestamp[3] << 32)
+    return whole + fraction / 2**64
+
+
+def _write_value(arg, value):
+    if isinstance(arg, ctypes.Array) and arg._type_ is ctypes.c_char:
+        arg.value = c_string_encode(str(value))[: len(arg) - 1]
+        return
+    target = arg.contents if isinstance(arg, ctypes._Pointer) else arg
+    if isinstance(target, ctypes.Array):
+        target[:] = _timestamp_from_seconds(value)
+    elif isinstance(target, ctypes.c_double):
+        target.value = float(value)
+    else:
+        target.value = int(value)
+
+
+class _Resource(object):
+    __slots__ = "properties", "indexed", "parent", "deleted"
+
+    def __init__(self, parent=None):
+        self.properties = {}
+        self.indexed = {}
+        self.parent = parent
+        self.deleted = False
+
+    def experts(self):
+        return [name.lower() for name in self.indexed.get(_EXPERT_NAME, [])]
+
+    def filter_value(self, id):
+        if id in _INDEXED_FILTER_PROPERTIES:
+            return self.indexed.get(id)
+        return self.properties.get(id)
+
+
+class _Enumerator(object):
+    __slots__ = "items", "position"
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.position = 0
+
+    def next(self):
+        if self.position >= len(self.items):
+            return None
+        item = self.items[self.position]
+        self.position += 1
+        return item
+
+
+class _Fault(object):
+    def __init__(
+        self, function, status, probability=1.0, after=0, count=None, property=None, target=None
+    ):
+        self.function = function
+        self.status = _parse_status(status)
+        self.probability = probability
+        self.after = after
+        self.count = count
+        self.property = None
+        if property is not None:
+            try:
+                self.property = _lookup_property(_RESOURCE_PROPERTIES, property)._id
+            except KeyError:
+                self.property = _lookup_property(_SYSTEM_PROPERTIES, property)._id
+        self.target = target
+        self.seen = 0
+        self.injected = 0
+
+    def matches(self, name, args):
+        if self.function not in ("*", name):
+            return False
+        if self.property is not None and (
+            name not in nisyscfg._library_singleton._property_functions or args[1] != self.property
+        ):
+            return False
+        if self.target is not None and (
+            name != "InitializeSession" or _read_string(args[0]) != self.target
+        ):
+            return False
+        return True
+
+
+def load_topology(path) -> dict:
+    """Reads a JSON topology file for SimulatedLibrary."""
+    with open(str(path), "r") as f:
+        return json.load(f)
+
+
+def _simulated(func):
+    name = func.__name__
+
+    @functools.wraps(func)
+    def call(self, *args):
+        return self._call(name, func, args)
+
+    return call
+
+
+class SimulatedLibrary(object):
+    """
+    An in-process implementation of the NI System Configuration function
+    surface, backed by a declarative topology.
+
+    topology - A dict, or the path of a JSON file, describing the simulated
+    system. All keys are optional:
+
+        {
+            "system": {"properties": {"HOSTNAME": "sim-pxi", ...},
+                       "resource": {<resource>}},
+            "experts": [{"name": "nipxi", "display_name": "NI-PXI",
+                         "version": "23.0"}, ...],
+            "resources": [<resource>, ...],
+            "software": {"installed": [<component>, ...],
+                         "available": [<component>, ...],
+                         "images": [<component>, ...]},
+            "feeds": [{"name": ..., "uri": ..., "enabled": true,
+                       "trusted": false}, ...],
+            "systems": [{"hostname": ..., "ip_address": ...,
+                         "mac_address": ..., "device_class": "PXI"}, ...],
+            "latency": <latency>,
+            "faults": [<fault>, ...]
+        }
+
+    A <resource> is {"expert", "name", "alias", "properties", "children",
+    "count", "var", "start"}. "expert", "name" and "alias" are strings or
+    lists, one entry per expert. "properties" maps property names such as
+    "SERIAL_NUMBER", "xnet.PORT_NUMBER" or "TEMPERATURE_READING" to values;
+    indexed properties take lists and their count property is filled in
+    automatically. A resource with "count" is repeated that many times and
+    the index is available to every string below it as "{<var>}" (the
+    variable defaults to "i" and counts from "start", default 1). Children
+    connect to the link name provided by their parent unless they set
+    CONNECTS_TO_LINK_NAME themselves.
+
+    A <component> is {"id", "version", "title", "type"}, where type is a
+    ComponentType name.
+
+    latency - Seconds to sleep in every call, or a dict mapping function
+    names (and "default") to seconds. Overrides the topology's latency.
+
+    faults - A list of dicts with the keys of add_fault(), appended to the
+    topology's faults.
+
+    seed - Seed for the random number generator used by probabilistic
+    faults.
+
+    The simulation can also be selected without code changes by setting the
+    NISYSCFG_SIMULATION environment variable to the path of a topology file.
+    """
+
+    def __init__(self, topology=None, latency=None, faults=None, seed=None):
+        if topology is None:
+            topology = {}
+        elif not isinstance(topology, dict):
+            topology = load_topology(topology)
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._handle_counter = itertools.count(0x1000)
+        self._handles = {}
+        self._detailed_strings = {}
+        self._filter_properties = {}
+        self.latency = topology.get("latency", 0.0) if latency is None else latency
+        self._faults = []
+        for fault in list(topology.get("faults", [])) + list(faults or []):
+            self.add_fault(**fault)
+
+        self._experts = [dict(expert) for expert in topology.get("experts", [])]
+        self._resources = []
+        for spec in topology.get("resources", []):
+            self._expand(spec, {}, None, self._resources)
+
+        system = topology.get("system", {})
+        self._system_properties = {}
+        for key, value in system.get("properties", {}).items():
+            type_property = _lookup_property(_SYSTEM_PROPERTIES, key)
+            self._system_properties[type_property._id] = _coerce(type_property, value, None)
+        system_resources = []
+        self._expand(system.get("resource", {}), {}, None, system_resources)
+        self._system_resource = system_resources[0]
+
+        software = topology.get("software", {})
+        self._installed = [self._component(c) for c in software.get("installed", [])]
+        self._available = [self._component(c) for c in software.get("available", [])]
+        self._images = [self._component(c) for c in software.get("images", [])]
+        self._feeds = [dict(feed) for feed in topology.get("feeds", [])]
+        self._systems = [dict(system) for system in topology.get("systems", [])]
+
+    def __getattr__(self, name):
+        if name not in nisyscfg._library_singleton._function_names:
+            raise AttributeError(name)
+
+        def not_implemented(*args):
+            return self._call(name, lambda self, *args: Status.NOT_IMPLEMENTED, args)
+
+        not_implemented.__name__ = name
+        return not_implemented
+
+    @property
+    def open_handles(self) -> int:
+        """Number of handles that have been returned and not closed."""
+        with self._lock:
+            return len(self._handles)
+
+    @property
+    def resources(self) -> int:
+        """Number of simulated hardware resources."""
+        with self._lock:
+            return len(self._resources)
+
+    def add_fault(
+        self, function, status, probability=1.0, after=0, count=None, property=None, target=None
+    ):
+        """
+        Makes calls to a function fail with a status.
+
+        function - The name of the Library function, or "*" for any function.
+
+        status - An nisyscfg.errors.Status name or code to return.
+
+        probability - The chance, between 0 and 1, that a matching call fails.
+
+        after - The number of matching calls to let through first.
+
+        count - The maximum number of failures to inject. None is unlimited.
+
+        property - Only match property calls for this property name or ID.
+
+        target - Only match InitializeSession calls for this target name.
+        """
+        with self._lock:
+            self._faults.append(
+                _Fault(function, status, probability, after, count, property, target)
+            )
+
+    def clear_faults(self):
+        """Removes all injected faults."""
+        with self._lock:
+            self._faults = []
+
+    def _expand(self, spec, variables, parent, resources):
+        count = spec.get("count")
+        start = spec.get("start", 1)
+        for number in range(start, start + (1 if count is None else count)):
+            scope = dict(variables)
+            if count is not None:
+                scope[spec.get("var", "i")] = number
+            resource = _Resource(parent)
+
+            def as_list(value):
+                if value is None:
+                    return []
+                if isinstance(value, (list, tuple)):
+                    return [str(item).format(**scope) for item in value]
+                return [str(value).format(**scope)]
+
+            experts = as_list(spec.get("expert"))
+            names = as_list(spec.get("name"))
+            aliases = as_list(spec.get("alias"))
+            length = max(len(experts), len(names), len(aliases))
+            if length:
+                for id, values in (
+                    (_EXPERT_NAME, experts),
+                    (_EXPERT_RESOURCE_NAME, names),
+                    (_EXPERT_USER_ALIAS, aliases),
+                ):
+                    resource.indexed[id] = values + [""] * (length - len(values))
+
+            counts = {}
+            for key, value in spec.get("properties", {}).items():
+                type_property = _lookup_property(_RESOURCE_PROPERTIES, key)
+                if _is_indexed(type_property):
+                    values = [_coerce(type_property, item, scope) for item in value]
+                    resource.indexed[type_property._id] = values
+                    count_id = type_property.count_property._id
+                    counts[count_id] = max(counts.get(count_id, 0), len(values))
+                else:
+                    resource.properties[type_property._id] = _coerce(type_property, value, scope)
+            if length:
+                counts[nisyscfg.properties.Resource.NUMBER_OF_EXPERTS._id] = length
+            for id, value in counts.items():
+                resource.properties.setdefault(id, value)
+            for id, value in _RESOURCE_DEFAULTS.items():
+                resource.properties.setdefault(id, value)
+            resource.properties.setdefault(_IS_DEVICE, 0 if resource.properties[_IS_CHASSIS] else 1)
+            if parent is not None and _PROVIDES_LINK_NAME in parent.properties:
+                resource.properties.setdefault(
+                    _CONNECTS_TO_LINK_NAME, parent.properties[_PROVIDES_LINK_NAME]
+                )
+
+            resources.append(resource)
+            for child in spec.get("children", []):
+                self._expand(child, scope, resource, resources)
+
+    def _component(self, component):
+        return {
+            "id": component.get("id", ""),
+            "version": component.get("version", ""),
+            "title": component.get("title", component.get("id", "")),
+            "type": int(nisyscfg.enums.ComponentType[component.get("type", "STANDARD").upper()]),
+        }
+
+    def _latency_for(self, name):
+        if isinstance(self.latency, dict):
+            return self.latency.get(name, self.latency.get("default", 0.0))
+        return self.latency
+
+    def _call(self, name, func, args):
+        delay = self._latency_for(name)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            for fault in self._faults:
+                if not fault.matches(name, args):
+                    continue
+                fault.seen += 1
+                if fault.seen <= fault.after:
+                    continue
+                if fault.count is not None and fault.injected >= fault.count:
+                    continue
+                if self._random.random() < fault.probability:
+                    fault.injected += 1
+                    return _to_status(fault.status)
+            return func(self, *args)
+
+    def _new_handle(self, obj):
+        handle = next(self._handle_counter)
+        self._handles[handle] = obj
+        return handle
+
+    def _write_handle(self, arg, obj):
+        _write_value(arg, self._new_handle(obj))
+
+    def _get(self, handle, kind):
+        obj = self._handles.get(_handle_value(handle))
+        if not isinstance(obj, kind):
+            return None
+        return obj
+
+    def _write_detail(self, arg, text):
+        # Only a pointer to a char pointer can receive a detailed string.
+        if not (isinstance(arg, ctypes._Pointer) and issubclass(arg._type_, ctypes._Pointer)):
+            return
+        buffer = ctypes.create_string_buffer(c_string_encode(text))
+        self._detailed_strings[ctypes.addressof(buffer)] = buffer
+        arg[0] = ctypes.cast(buffer, arg._type_)
+
+    def _resource(self, handle):
+        resource = self._get(handle, _Resource)
+        if resource is None or resource.deleted:
+            return None
+        return resource
+
+    @_simulated
+    def InitializeSession(
+        self,
+        targetName,
+        username,
+        password,
+        language,
+        forcePropertyRefresh,
+        connectTimeoutMsec,
+        expertEnumHandle,
+        sessionHandle,
+    ):
+        self._write_handle(sessionHandle, _read_string(targetName) or "localhost")
+        return Status.OK
+
+    @_simulated
+    def CloseHandle(self, syscfgHandle):
+        if self._handles.pop(_handle_value(syscfgHandle), None) is None:
+            return Status.INVALID_ARG
+        self._filter_properties.pop(_handle_value(syscfgHandle), None)
+        return Status.OK
+
+    @_simulated
+    def GetSystemExperts(self, sessionHandle, expertNames, expertEnumHandle):
+        names = {name.strip().lower() for name in _read_string(expertNames).split(",") if name}
+        experts = [e for e in self._experts if not names or e["name"].lower() in names]
+        self._write_handle(expertEnumHandle, _Enumerator(experts))
+        return Status.OK
+
+    @_simulated
+    def SetRemoteTimeout(self, sessionHandle, remoteTimeoutMsec):
+        return Status.OK
+
+    def _matches(self, resource, mode, properties):
+        if not properties:
+            return True
+        results = []
+        for id, expected in properties.items():
+            actual = resource.filter_value(id)
+            if actual is None:
+                results.append(None)
+            elif isinstance(actual, list):
+                results.append(_normalize(expected) in [_normalize(v) for v in actual])
+            else:
+                results.append(_normalize(actual) == _normalize(expected))
+        if mode == nisyscfg.enums.FilterMode.MATCH_VALUES_ANY:
+            return any(results)
+        if mode == nisyscfg.enums.FilterMode.MATCH_VALUES_NONE:
+            return not any(results)
+        if mode == nisyscfg.enums.FilterMode.ALL_PROPERTIES_EXIST:
+            return all(result is not None for result in results)
+        return all(results)
+
+    @_simulated
+    def FindHardware(
+        self, sessionHandle, filterMode, filterHandle, expertNames, resourceEnumHandle
+    ):
+        properties = {}
+        if _handle_value(filterHandle):
+            if self._get(filterHandle, dict) is None:
+                return Status.INVALID_ARG
+            properties = self._filter_properties[_handle_value(filterHandle)]
+        experts = {name.strip().lower() for name in _read_string(expertNames).split(",") if name}
+        matches = [
+            resource
+            for resource in self._resources
+            if (not experts or experts.intersection(resource.experts()))
+            and self._matches(resource, filterMode, properties)
+        ]
+        self._write_handle(resourceEnumHandle, _Enumerator(matches))
+        return Status.OK
+
+    @_simulated
+    def FindSystems(
+        self,
+        sessionHandle,
+        deviceClass,
+        detectOnlineSystems,
+        cacheMode,
+        findOutputMode,
+        timeoutMsec,
+        onlyInstallableSystems,
+        systemEnumHandle,
+    ):
+        classes = {name.strip().lower() for name in _read_string(deviceClass).split(",") if name}
+        fields = _SYSTEM_NAME_FORMATS[nisyscfg.enums.SystemNameFormat(findOutputMode)]
+        names = []
+        for system in self._systems:
+            if classes and system.get("device_class", "").lower() not in classes:
+                continue
+            # Unconfigured systems without a hostname are reported as IP_MAC.
+            system_fields = fields
+            if "hostname" in fields and not system.get("hostname"):
+                system_fields = _SYSTEM_NAME_FORMATS[nisyscfg.enums.SystemNameFormat.IP_MAC]
+            values = [system.get(field, "") for field in system_fields]
+            if len(values) == 2:
+                names.append("{} ({})".format(*values))
+            else:
+                names.append(values[0])
+        self._write_handle(systemEnumHandle, _Enumerator(names))
+        return Status.OK
+
+    @_simulated
+    def SelfTestHardware(self, resourceHandle, mode, detailedResult):
+        if self._resource(resourceHandle) is None:
+            return Status.INVALID_ARG
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def SelfCalibrateHardware(self, resourceHandle, detailedResult):
+        if self._resource(resourceHandle) is None:
+            return Status.INVALID_ARG
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def ResetHardware(self, resourceHandle, mode):
+        if self._resource(resourceHandle) is None:
+            return Status.INVALID_ARG
+        return Status.OK
+
+    @_simulated
+    def RenameResource(
+        self,
+        resourceHandle,
+        newName,
+        overwriteConflict,
+        updateDependencies,
+        nameAlreadyExisted,
+        overwrittenResourceHandle,
+    ):
+        resource = self._resource(resourceHandle)
+        if resource is None:
+            return Status.INVALID_ARG
+        new_name = _read_string(newName)
+        conflict = None
+        for other in self._resources:
+            if other is not resource and new_name in other.indexed.get(_EXPERT_USER_ALIAS, []):
+                conflict = other
+        if conflict is not None and not overwriteConflict:
+            return Status.NAME_COLLISION
+        aliases = resource.indexed.setdefault(_EXPERT_USER_ALIAS, [""])
+        aliases[0] = new_name
+        _write_value(nameAlreadyExisted, 1 if conflict is not None else 0)
+        if conflict is not None:
+            conflict.indexed[_EXPERT_USER_ALIAS] = [
+                "" if alias == new_name else alias for alias in conflict.indexed[_EXPERT_USER_ALIAS]
+            ]
+            self._write_handle(overwrittenResourceHandle, conflict)
+        return Status.OK
+
+    @_simulated
+    def DeleteResource(self, resourceHandle, mode, dependentItemsDeleted, detailedResult):
+        resource = self._resource(resourceHandle)
+        if resource is None:
+            return Status.INVALID_ARG
+        if resource.properties.get(_IS_PRESENT) == nisyscfg.enums.IsPresentType.PRESENT and (
+            not resource.properties.get(_IS_SIMULATED)
+        ):
+            return Status.CANNOT_DELETE_PRESENT_RESOURCE
+        children = [r for r in self._resources if r.parent is resource]
+        if children and mode == nisyscfg.enums.DeleteValidationMode.DELETE_IF_NO_DEPENDENCIES_EXIST:
+            return Status.FAIL
+        deleted = [resource]
+        if mode == nisyscfg.enums.DeleteValidationMode.DELETE_ITEM_AND_ANY_DEPENDENCIES:
+            deleted.extend(children)
+        if mode != nisyscfg.enums.DeleteValidationMode.VALIDATE_BUT_DO_NOT_DELETE:
+            for item in deleted:
+                item.deleted = True
+            self._resources = [r for r in self._resources if not r.deleted]
+        _write_value(dependentItemsDeleted, 1 if len(deleted) > 1 else 0)
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def GetResourceProperty(self, resourceHandle, propertyID, value):
+        resource = self._resource(resourceHandle)
+        if resource is None:
+            return Status.INVALID_ARG
+        if propertyID not in resource.properties:
+            return Status.PROP_DOES_NOT_EXIST
+        _write_value(value, resource.properties[propertyID])
+        return Status.OK
+
+    def _set_resource_property(self, resourceHandle, propertyID, args):
+        resource = self._resource(resourceHandle)
+        if resource is None:
+            return Status.INVALID_ARG
+        resource.properties[propertyID] = _read_value(args)
+        return Status.OK
+
+    @_simulated
+    def SetResourceProperty(self, resourceHandle, propertyID, args):
+        return self._set_resource_property(resourceHandle, propertyID, args)
+
+    @_simulated
+    def SetResourcePropertyWithType(self, resourceHandle, propertyID, propertyType, args):
+        return self._set_resource_property(resourceHandle, propertyID, args)
+
+    @_simulated
+    def GetResourceIndexedProperty(self, resourceHandle, propertyID, index, value):
+        resource = self._resource(resourceHandle)
+        if resource is None:
+            return Status.INVALID_ARG
+        values = resource.indexed.get(propertyID, [])
+        if not 0 <= index < len(values):
+            return Status.PROP_DOES_NOT_EXIST
+        _write_value(value, values[index])
+        return Status.OK
+
+    @_simulated
+    def SaveResourceChanges(self, resourceHandle, changesRequireRestart, detailedResult):
+        if self._resource(resourceHandle) is None:
+            return Status.INVALID_ARG
+        _write_value(changesRequireRestart, 0)
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def GetSystemProperty(self, sessionHandle, propertyID, value):
+        if propertyID == _SYSTEM_RESOURCE_HANDLE:
+            self._write_handle(value, self._system_resource)
+            return Status.OK
+        if propertyID not in self._system_properties:
+            return Status.PROP_DOES_NOT_EXIST
+        _write_value(value, self._system_properties[propertyID])
+        return Status.OK
+
+    @_simulated
+    def SetSystemProperty(self, sessionHandle, propertyID, args):
+        self._system_properties[propertyID] = _read_value(args)
+        return Status.OK
+
+    @_simulated
+    def SaveSystemChanges(self, sessionHandle, changesRequireRestart, detailedResult):
+        _write_value(changesRequireRestart, 0)
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def CreateFilter(self, sessionHandle, filterHandle):
+        properties = {}
+        handle = self._new_handle(properties)
+        self._filter_properties[handle] = properties
+        _write_value(filterHandle, handle)
+        return Status.OK
+
+    def _set_filter_property(self, filterHandle, propertyID, args):
+        properties = self._get(filterHandle, dict)
+        if properties is None:
+            return Status.INVALID_ARG
+        properties[propertyID] = _read_value(args)
+        return Status.OK
+
+    @_simulated
+    def SetFilterProperty(self, filterHandle, propertyID, args):
+        return self._set_filter_property(filterHandle, propertyID, args)
+
+    @_simulated
+    def SetFilterPropertyWithType(self, filterHandle, propertyID, propertyType, args):
+        return self._set_filter_property(filterHandle, propertyID, args)
+
+    def _upgrade_firmware(self, resourceHandle, firmwareStatus, detailedResult):
+        if self._resource(resourceHandle) is None:
+            return Status.INVALID_ARG
+        _write_value(firmwareStatus, nisyscfg.enums.FirmwareStatus.INSTALLED_NORMAL_OPERATION)
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def UpgradeFirmwareFromFile(
+        self,
+        resourceHandle,
+        firmwareFile,
+        autoStopTasks,
+        alwaysOverwrite,
+        waitForOperationToFinish,
+        firmwareStatus,
+        detailedResult,
+    ):
+        return self._upgrade_firmware(resourceHandle, firmwareStatus, detailedResult)
+
+    @_simulated
+    def UpgradeFirmwareVersion(
+        self,
+        resourceHandle,
+        firmwareVersion,
+        autoStopTasks,
+        alwaysOverwrite,
+        waitForOperationToFinish,
+        firmwareStatus,
+        detailedResult,
+    ):
+        return self._upgrade_firmware(resourceHandle, firmwareStatus, detailedResult)
+
+    @_simulated
+    def CheckFirmwareStatus(self, resourceHandle, percentComplete, firmwareStatus, detailedResult):
+        if self._resource(resourceHandle) is None:
+            return Status.INVALID_ARG
+        _write_value(percentComplete, -1)
+        _write_value(firmwareStatus, nisyscfg.enums.FirmwareStatus.INSTALLED_NORMAL_OPERATION)
+        self._write_detail(detailedResult, "")
+        return Status.OK
+
+    @_simulated
+    def FormatWithBaseSystemImage(
+        self,
+        sessionHandle,
+        autoRestart,
+        fileSystem,
+        networkSettings,
+        systemImageID,
+        systemImageVersion,
+        timeoutMsec,
+    ):
+        self._installed = []
+        return Status.OK
+
+    @_simulated
+    def Restart(
+        self,
+        sessionHandle,
+        waitForRestartToFinish,
+        installMode,
+        flushDNS,
+        timeoutMsec,
+        newIpAddress,
+    ):
+        ip_address = nisyscfg.properties.System.IP_ADDRESS._id
+        _write_value(newIpAddress, self._system_properties.get(ip_address, ""))
+        return Status.OK
+
+    @_simulated
+    def GetAvailableSoftwareComponents(self, sessionHandle, itemTypes, componentEnumHandle):
+        self._write_handle(componentEnumHandle, _Enumerator(self._available))
+        return Status.OK
+
+    @_simulated
+    def GetFilteredBaseSystemImages(
+        self, repositoryPath, deviceClass, operatingSystem, productID, systemImageEnumHandle
+    ):
+        self._write_handle(systemImageEnumHandle, _Enumerator(self._images))
+        return Status.OK
+
+    @_simulated
+    def GetInstalledSoftwareComponents(self, sessionHandle, itemTypes, cached, componentEnumHandle):
+        self._write_handle(componentEnumHandle, _Enumerator(self._installed))
+        return Status.OK
+
+    @_simulated
+    def SetSystemImageFromFolder2(
+        self,
+        sessionHandle,
+        autoRestart,
+        sourceFolder,
+        encryptionPassphrase,
+        numBlacklistEntries,
+        blacklistFilesDirectories,
+        originalSystemOnly,
+        networkSettings,
+    ):
+        return Status.OK
+
+    def _install(self, components):
+        installed = {component["id"]: component for component in self._installed}
+        for component in components:
+            installed[component["id"]] = component
+        self._installed = list(installed.values())
+
+    @_simulated
+    def InstallAll(
+        self,
+        sessionHandle,
+        autoRestart,
+        deselectConflicts,
+        installedComponentEnumHandle,
+        brokenDependencyEnumHandle,
+    ):
+        self._install(self._available)
+        self._write_handle(installedComponentEnumHandle, _Enumerator(self._available))
+        self._write_handle(brokenDependencyEnumHandle, _Enumerator([]))
+        return Status.OK
+
+    @_simulated
+    def InstallUninstallComponents2(
+        self,
+        sessionHandle,
+        autoRestart,
+        autoSelectDependencies,
+        autoSelectRecommends,
+        componentToInstallEnumHandle,
+        numComponentsToUninstall,
+        componentIDsToUninstall,
+        brokenDependencyEnumHandle,
+    ):
+        to_install = self._get(componentToInstallEnumHandle, _Enumerator)
+        if to_install is None:
+            return Status.INVALID_ARG
+        self._install(to_install.items)
+        ids = ctypes.cast(componentIDsToUninstall, ctypes.POINTER(ctypes.c_char_p))
+        to_uninstall = {c_string_decode(ids[i]) for i in range(numComponentsToUninstall)}
+        self._installed = [c for c in self._installed if c["id"] not in to_uninstall]
+        self._write_handle(brokenDependencyEnumHandle, _Enumerator([]))
+        return Status.OK
+
+    @_simulated
+    def UninstallAll(self, sessionHandle, autoRestart):
+        self._installed = []
+        return Status.OK
+
+    @_simulated
+    def GetSoftwareFeeds(self, sessionHandle, feedEnumHandle):
+        self._write_handle(feedEnumHandle, _Enumerator(self._feeds))
+        return Status.OK
+
+    def _find_feed(self, name):
+        for feed in self._feeds:
+            if feed["name"] == name:
+                return feed
+        return None
+
+    @_simulated
+    def AddSoftwareFeed(self, sessionHandle, feedName, uri, enabled, trusted):
+        name = _read_string(feedName)
+        if self._find_feed(name) is not None:
+            return Status.NAME_COLLISION
+        self._feeds.append(
+            {
+                "name": name,
+                "uri": _read_string(uri),
+                "enabled": bool(enabled),
+                "trusted": bool(trusted),
+            }
+        )
+        return Status.OK
+
+    @_simulated
+    def ModifySoftwareFeed(self, sessionHandle, feedName, newFeedName, uri, enabled, trusted):
+        feed = self._find_feed(_read_string(feedName))
+        if feed is None:
+            return Status.ITEM_DOES_NOT_EXIST
+        feed["name"] = _read_string(newFeedName) or feed["name"]
+        feed["uri"] = _read_string(uri)
+        feed["enabled"] = bool(enabled)
+        feed["trusted"] = bool(trusted)
+        return Status.OK
+
+    @_simulated
+    def RemoveSoftwareFeed(self, sessionHandle, feedName):
+        feed = self._find_feed(_read_string(feedName))
+        if feed is None:
+            return Status.ITEM_DOES_NOT_EXIST
+        self._feeds.remove(feed)
+        return Status.OK
+
+    @_simulated
+    def CreateComponentsEnum(self, componentEnumHandle):
+        self._write_handle(componentEnumHandle, _Enumerator([]))
+        return Status.OK
+
+    @_simulated
+    def AddComponentToEnum(self, componentEnumHandle, ID, version, mode):
+        components = self._get(componentEnumHandle, _Enumerator)
+        if components is None:
+            return Status.INVALID_ARG
+        id = _read_string(ID)
+        for component in self._available:
+            if component["id"] == id:
+                components.items.append(component)
+                return Status.OK
+        return Status.ITEM_DOES_NOT_EXIST
+
+    @_simulated
+    def FreeDetailedString(self, str):
+        self._detailed_strings.pop(ctypes.cast(str, ctypes.c_void_p).value, None)
+        return Status.OK
+
+    @_simulated
+    def NextResource(self, sessionHandle, resourceEnumHandle, resourceHandle):
+        enumerator = self._get(resourceEnumHandle, _Enumerator)
+        if enumerator is None:
+            return Status.INVALID_ARG
+        resource = enumerator.next()
+        if resource is None:
+            return Status.END_OF_ENUM
+        self._write_handle(resourceHandle, resource)
+        return Status.OK
+
+    @_simulated
+    def NextSystemInfo(self, systemEnumHandle, system):
+        enumerator = self._get(systemEnumHandle, _Enumerator)
+        if enumerator is None:
+            return Status.INVALID_ARG
+        name = enumerator.next()
+        if name is None:
+            return Status.END_OF_ENUM
+        _write_value(system, name)
+        return Status.OK
+
+    @_simulated
+    def NextExpertInfo(self, expertEnumHandle, expertName, displayName, version):
+        enumerator = self._get(expertEnumHandle, _Enumerator)
+        if enumerator is None:
+            return Status.INVALID_ARG
+        expert = enumerator.next()
+        if expert is None:
+            return Status.END_OF_ENUM
+        _write_value(expertName, expert["name"])
+        _write_value(displayName, expert.get("display_name", expert["name"]))
+        _write_value(version, expert.get("version", ""))
+        return Status.OK
+
+    @_simulated
+    def NextComponentInfo(
+        self, componentEnumHandle, ID, version, title, itemType, detailedDescription
+    ):
+        enumerator = self._get(componentEnumHandle, _Enumerator)
+        if enumerator is None:
+            return Status.INVALID_ARG
+        component = enumerator.next()
+        if component is None:
+            return Status.END_OF_ENUM
+        _write_value(ID, component["id"])
+        _write_value(version, component["version"])
+        _write_value(title, component["title"])
+        _write_value(itemType, component["type"])
+        self._write_detail(detailedDescription, "")
+        return Status.OK
+
+    @_simulated
+    def NextDependencyInfo(
+        self,
+        dependencyEnumHandle,
+        dependerID,
+        dependerVersion,
+        dependerTitle,
+        dependerDetailedDescription,
+        dependeeID,
+        dependeeVersion,
+        dependeeTitle,
+        dependeeDetailedDescription,
+    ):
+        if self._get(dependencyEnumHandle, _Enumerator) is None:
+            return Status.INVALID_ARG
+        return Status.END_OF_ENUM
+
+    @_simulated
+    def NextSoftwareFeed(self, feedEnumHandle, feedName, uri, enabled, trusted):
+        enumerator = self._get(feedEnumHandle, _Enumerator)
+        if enumerator is None:
+            return Status.INVALID_ARG
+        feed = enumerator.next()
+        if feed is None:
+            return Status.END_OF_ENUM
+        _write_value(feedName, feed["name"])
+        _write_value(uri, feed.get("uri", ""))
+        _write_value(enabled, 1 if feed.get("enabled", True) else 0)
+        _write_value(trusted, 1 if feed.get("trusted", False) else 0)
+        return Status.OK
+
+    @_simulated
+    def ResetEnumeratorGetCount(self, enumHandle, count):
+        enumerator = self._get(enumHandle, _Enumerator)
+        if enumerator is None:
+            return Status.INVALID_ARG
+        enumerator.position = 0
+        _write_value(count, len(enumerator.items))
+        return Status.OK
+
+    @_simulated
+    def GetStatusDescription(self, sessionHandle, status, detailedDescription):
+        try:
+            description = Status(status).name.replace("_", " ").capitalize() + "."
+        except ValueError:
+            description = ""
+        self._write_detail(detailedDescription, description)
+        return Status.OK
+
+    @_simulated
+    def TimestampFromValues(self, secondsSinceEpoch1970, fractionalSeconds, timestamp):
+        _write_value(timestamp, _read_value(secondsSinceEpoch1970) + _read_value(fractionalSeconds))
+        return Status.OK
+
+    @_simulated
+    def ValuesFromTimestamp(self, timestamp, secondsSinceEpoch1970, fractionalSeconds):
+        seconds = _seconds_from_timestamp(timestamp)
+        _write_value(secondsSinceEpoch1970, int(seconds // 1))
+        _write_value(fractionalSeconds, seconds - int(seconds // 1))
+        return Status.OK
+
+
+@contextlib.contextmanager
+def simulate(topology=None, latency=None, faults=None, seed=None):
+    """
+    Serves native calls made inside the with-block from a SimulatedLibrary
+    instead of the NI System Configuration runtime.
+
+    Example:
+        topology = {
+            "resources": [
+                {
+                    "count": 2,
+                    "expert": "nipxi",
+                    "name": "PXI{i}",
+                    "properties": {"IS_CHASSIS": True, "PROVIDES_LINK_NAME": "PXI{i}"},
+                    "children": [
+                        {"count": 17, "var": "slot", "expert": "nidaqmx",
+                         "name": "PXI{i}Slot{slot}", "properties": {"SLOT_NUMBER": "{slot}"}}
+                    ],
+                }
+            ]
+        }
+        with nisyscfg.simulation.simulate(topology):
+            with nisyscfg.Session() as session:
+                print(len(list(session.find_hardware())))  # 36
+    """
+    library = SimulatedLibrary(topology, latency=latency, faults=faults, seed=seed)
+    previous = nisyscfg._library_singleton.set_instance(library)
+    try:
+        yield library
+    finally:
+        nisyscfg._library_singleton.set_instance(previous)
@@ -1,4 +1,5 @@
 import ctypes
+import nisyscfg._enumerator
 import nisyscfg.errors
 import typing
 
@@ -15,17 +16,7 @@ SoftwareFeed = typing.NamedTuple(
 )
 
 
-class SoftwareFeedIterator(object):
-    def __init__(self, handle):
-        self._handle = handle
-        self._library = nisyscfg._library_singleton.get()
-
-    def __del__(self):
-        self.close()
-
-    def __iter__(self):
-        return self
-
+class SoftwareFeedIterator(nisyscfg._enumerator.Enumerator):
     def __next__(self) -> SoftwareFeed:
         if not self._handle:
             raise StopIteration()
@@ -33,21 +24,21 @@ class SoftwareFeedIterator(object):
         uri = nisyscfg.types.simple_string()
         enabled = ctypes.c_int()
         trusted = ctypes.c_int()
-        error_code = self._library.NextSoftwareFeed(
-            self._handle, name, uri, ctypes.pointer(enabled), ctypes.pointer(trusted)
+        error_code = self._call(
+            "NextSoftwareFeed",
+            self._handle,
+            name,
+            uri,
+            ctypes.pointer(enabled),
+            ctypes.pointer(trusted),
         )
         if error_code == nisyscfg.errors.Status.END_OF_ENUM:
-            raise StopIteration()
+            raise self._end_of_enum()
         nisyscfg.errors.handle_error(self, error_code)
+        self._position += 1
         return SoftwareFeed(
             name=c_string_decode(name.value),
             uri=c_string_decode(uri.value),
             enabled=enabled.value != 0,
             trusted=trusted.value != 0,
         )
-
-    def close(self) -> None:
-        if self._handle:
-            error_code = self._library.CloseHandle(self._handle)
-            nisyscfg.errors.handle_error(self, error_code)
-            self._handle = None
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import contextlib
 import ctypes
 import pathlib
 import tempfile
+import threading
+import time
+import weakref
 import zipfile
 from contextlib import ExitStack
 
 import nisyscfg
 import nisyscfg._library_singleton
+import nisyscfg.circuit_breaker
+import nisyscfg.coalescing
 import nisyscfg.component_info
 import nisyscfg.dependency_info
 import nisyscfg.expert_info
@@ -15,16 +23,23 @@ import nisyscfg.filter
 import nisyscfg.hardware_resource
 import nisyscfg.properties
 import nisyscfg.pxi.properties
+import nisyscfg.reachability
+import nisyscfg.retry
 import nisyscfg.software_feed
 import nisyscfg.system_info
+import nisyscfg.timeouts
+import nisyscfg.topology
 import nisyscfg.xnet.properties
 
 from nisyscfg._lib import c_string_decode
 from nisyscfg._lib import c_string_encode
 
-from typing import List, NamedTuple, Union
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Union
 
 
+# The remote timeout, in seconds, of a new session.
+_DEFAULT_REMOTE_TIMEOUT = 300.0
+
 InstallAllResult = NamedTuple(
     "InstallAllResult",
     [
@@ -41,6 +56,51 @@ SaveChangesResult = NamedTuple(
     ],
 )
 
+# How the enumeration of one expert went. elapsed is in seconds; count is the
+# number of resources the expert returned before any de-duplication.
+ExpertEnumeration = NamedTuple(
+    "ExpertEnumeration",
+    [
+        ("expert_name", str),
+        ("elapsed", float),
+        ("count", int),
+        ("error", Optional[nisyscfg.errors.LibraryError]),
+        ("timed_out", bool),
+    ],
+)
+
+FindHardwareByExpertResult = NamedTuple(
+    "FindHardwareByExpertResult",
+    [
+        ("resources", List[nisyscfg.hardware_resource.HardwareResource]),
+        ("experts", Dict[str, ExpertEnumeration]),
+    ],
+)
+
+
+class _Handoff(object):
+    # Hands the result of a background call to a caller that may stop waiting
+    # for it. Whichever of deliver() and abandon() runs first decides whether
+    # the caller or the background call owns the result.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._delivered = False
+        self._abandoned = False
+
+    def deliver(self):
+        # Returns whether the caller still waits for the result.
+        with self._lock:
+            self._delivered = not self._abandoned
+            return self._delivered
+
+    def abandon(self):
+        # Returns whether the caller stopped waiting before the result was
+        # delivered.
+        with self._lock:
+            self._abandoned = not self._delivered
+            return self._abandoned
+
 
 @nisyscfg.properties.PropertyBag(nisyscfg.properties.System)
 class Session(object):
@@ -89,6 +149,59 @@ class Session(object):
     operation times out. When the operation succeeds, the session handle that is
     returned is set to the default, which is defined as 300 (5 minutes).
 
+    hardware_cache_ttl - Enables caching of find_hardware() results for the
+    given number of seconds. Calls with an equivalent filter, mode and expert
+    names then return the cached resources without a native enumeration. The
+    cache is cleared by invalidate_hardware_cache(), save_changes(), restart()
+    and by renaming, deleting or saving a resource of this session. The default
+    of None disables the cache.
+
+    filter_pool_size - The number of native filters the session keeps
+    populated for nisyscfg.filter.FilterSpec objects passed to
+    find_hardware(). When the pool is full, the least recently used filter is
+    closed. The default is 16.
+
+    lazy - Defers connecting to the system until the first operation that
+    needs the connection, so creating the session does not block. Connection
+    errors are then raised by that operation. The default is False.
+
+    preconnect - With lazy, starts connecting on a background thread right
+    away. The first operation that needs the connection waits for it.
+
+    probe_timeout - Before connecting to a remote target, checks with
+    nisyscfg.reachability.probe() that a TCP connection to the target can be
+    opened within this many seconds, and raises an
+    nisyscfg.errors.TargetUnreachableError exception if not. Probe results
+    are cached per target for a few seconds. The default of None connects
+    without probing.
+
+    circuit_breaker - An nisyscfg.circuit_breaker.CircuitBreaker that records
+    the connection attempts of the session. While the breaker's circuit for
+    the target is open, connecting raises an nisyscfg.errors.CircuitOpenError
+    exception at once.
+
+    timeouts - An nisyscfg.timeouts.AdaptiveTimeouts that records the latency
+    of connecting, restarting and the session's remote calls on the target.
+    Once enough calls have been observed, the learned timeouts replace
+    timeout and the default timeout of restart(). The remote timeouts of
+    find_hardware() and of system property reads are learned separately and
+    set on the session for those reads; other calls, including long-running
+    operations such as install() and format(), run with the remote timeout
+    set by set_remote_timeout().
+
+    retry_policy - An nisyscfg.retry.RetryPolicy that retries the session's
+    idempotent calls, which are connecting, enumerations and reading system
+    properties, when they fail with a transient status. Calls that change the
+    system are never retried. The default of None does not retry.
+
+    coalesce - Makes concurrent identical calls of find_hardware(),
+    get_installed_software_components() and system property reads from
+    several threads share one native call and its result. Coalesced
+    find_hardware() calls share the same resources and ignore prefetch, and
+    coalesced get_installed_software_components() calls return an
+    nisyscfg.component_info.CachedComponentInfoIterator. The default is
+    False.
+
     Raises an nisyscfg.errors.LibraryError exception in the event of an error.
     """
 
@@ -100,26 +213,240 @@ class Session(object):
         language: nisyscfg.enums.Locale = nisyscfg.enums.Locale.DEFAULT,
         force_property_refresh: bool = True,
         timeout: float = 300.0,
+        hardware_cache_ttl: Union[None, float] = None,
+        filter_pool_size: int = 16,
+        lazy: bool = False,
+        preconnect: bool = False,
+        probe_timeout: Union[None, float] = None,
+        circuit_breaker: Union[None, nisyscfg.circuit_breaker.CircuitBreaker] = None,
+        timeouts: Union[None, nisyscfg.timeouts.AdaptiveTimeouts] = None,
+        retry_policy: Union[None, nisyscfg.retry.RetryPolicy] = None,
+        coalesce: bool = False,
     ) -> None:
         self._children = []
-        self._session = nisyscfg.types.SessionHandle()
-        self._library = nisyscfg._library_singleton.get()
-        self._property_accessor = nisyscfg.properties.PropertyAccessor(
-            setter=self._set_property,
-            getter=self._get_property,
-        )
-        error_code = self._library.InitializeSession(
+        self._filter_pool = collections.OrderedDict()
+        self._filter_pool_size = filter_pool_size
+        self._filter_pool_lock = threading.Lock()
+        self._experts = None
+        self._expert_names = frozenset()
+        self._hardware_cache_ttl = hardware_cache_ttl
+        self._hardware_cache = {}
+        self._released_resources = weakref.WeakSet()
+        self._expert_workers = set()
+        self._session_handle = nisyscfg.types.SessionHandle()
+        self._connected = False
+        self._connect_lock = threading.Lock()
+        self._connect_error = None
+        self._probe_timeout = probe_timeout
+        self._circuit_breaker = circuit_breaker
+        self._timeouts = timeouts
+        self._retry_policy = retry_policy
+        self._single_flight = nisyscfg.coalescing.SingleFlight() if coalesce else None
+        self._resource_lock = threading.Lock()
+        self._timeout = timeout
+        self._remote_timeout = _DEFAULT_REMOTE_TIMEOUT
+        self._applied_remote_timeout = _DEFAULT_REMOTE_TIMEOUT
+        self._remote_timeout_condition = threading.Condition()
+        self._learned_reads = []
+        self._long_operations = 0
+        self._initialize_args = (
             c_string_encode(target),
             c_string_encode(username),
             c_string_encode(password),
             language,
             force_property_refresh,
-            int(timeout * 1000),
+        )
+        self._library = nisyscfg._library_singleton.get()
+        self._property_accessor = nisyscfg.properties.PropertyAccessor(
+            setter=self._set_property,
+            getter=self._get_property,
+        )
+        self.target_name = target
+        if not lazy:
+            self.connect()
+        elif preconnect:
+            threading.Thread(target=self._preconnect, name="nisyscfg-connect", daemon=True).start()
+
+    @property
+    def _session(self):
+        handle = self._read_session
+        if self._applied_remote_timeout != self._remote_timeout:
+            self._restore_remote_timeout()
+        return handle
+
+    @property
+    def _read_session(self):
+        # The session handle for reads that set their own learned remote
+        # timeout, so that the configured one is not restored first.
+        if not self._connected and self._session_handle is not None:
+            self.connect()
+        return self._session_handle
+
+    def connect(self) -> None:
+        """
+        Connects to the system if the session was created with lazy and is not
+        connected yet. Other operations call this as needed.
+
+        Raises an nisyscfg.errors.TargetUnreachableError exception if the
+        pre-flight probe fails, an nisyscfg.errors.CircuitOpenError exception
+        if the circuit breaker is open, or an nisyscfg.errors.LibraryError
+        exception in the event of an error.
+        """
+        with self._connect_lock:
+            if self._connected or self._session_handle is None:
+                return
+            error = self._connect_error
+            if error is not None:
+                # Report a failed background connection once, then try again
+                # on the next operation.
+                self._connect_error = None
+                raise error
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.call(self.target_name, self._initialize)
+            else:
+                self._initialize()
+            self._connected = True
+
+    def _initialize(self):
+        if self._probe_timeout is not None and not nisyscfg.reachability.probe(
+            self.target_name or "", timeout=self._probe_timeout
+        ):
+            raise nisyscfg.errors.TargetUnreachableError(
+                self.target_name, nisyscfg.reachability.DEFAULT_PORT
+            )
+        error_code = self._idempotent(
+            "InitializeSession",
+            self._timed,
+            nisyscfg.timeouts.CONNECT,
+            self._library.InitializeSession,
+            *self._initialize_args,
+            int(self._adaptive_timeout(nisyscfg.timeouts.CONNECT, self._timeout) * 1000),
             None,  # expert_enum_handle
-            ctypes.pointer(self._session),
+            ctypes.pointer(self._session_handle),
+            timeout_index=2 + len(self._initialize_args),
         )
         nisyscfg.errors.handle_error(self, error_code)
-        self.target_name = target
+
+    def _adaptive_timeout(self, operation, default):
+        if self._timeouts is None:
+            return default
+        return self._timeouts.timeout(self.target_name, operation, default)
+
+    def _idempotent(self, name, func, *args, timeout_index=None):
+        if self._retry_policy is None:
+            return func(*args)
+        return self._retry_policy.call(name, func, *args, timeout_index=timeout_index)
+
+    def _timed(self, operation, func, *args):
+        if self._timeouts is None:
+            return func(*args)
+        with ExitStack() as stack:
+            if operation.startswith(nisyscfg.timeouts.REMOTE):
+                stack.enter_context(self._learned_remote_timeout(operation))
+            start = time.perf_counter()
+            error_code = func(*args)
+            elapsed = time.perf_counter() - start
+        if error_code in (
+            nisyscfg.errors.Status.OPERATION_TIMED_OUT,
+            nisyscfg.errors.Status.TIMEOUT,
+        ):
+            self._timeouts.record_timeout(self.target_name, operation)
+        elif error_code >= 0:
+            self._timeouts.record(self.target_name, operation, elapsed)
+        return error_code
+
+    @contextlib.contextmanager
+    def _learned_remote_timeout(self, operation):
+        # Sets the remote timeout learned for the read, or the configured one
+        # if none has been learned, unless it is already set. While several
+        # reads run, the longest of their timeouts applies. The timeout stays
+        # set after the read so that repeated reads cost no native call; other
+        # calls of the session restore the configured timeout first, and
+        # long-running operations such as install() or format() wait for the
+        # reads to finish.
+        timeout = None
+        if not nisyscfg.reachability.is_local(self.target_name):
+            timeout = self._timeouts.timeout(self.target_name, operation, None)
+        joined = False
+        with self._remote_timeout_condition:
+            if not self._long_operations:
+                self._learned_reads.append(timeout)
+                joined = True
+                self._apply_remote_timeout(
+                    max(
+                        self._remote_timeout if read is None else read
+                        for read in self._learned_reads
+                    )
+                )
+        try:
+            yield
+        finally:
+            if joined:
+                with self._remote_timeout_condition:
+                    self._learned_reads.remove(timeout)
+                    if not self._learned_reads:
+                        self._remote_timeout_condition.notify_all()
+
+    @contextlib.contextmanager
+    def _long_operation(self):
+        # Waits for reads that run with a learned remote timeout to finish, so
+        # that the operation runs with the configured remote timeout.
+        if self._timeouts is None:
+            yield
+            return
+        with self._remote_timeout_condition:
+            self._long_operations += 1
+            while self._learned_reads:
+                self._remote_timeout_condition.wait()
+            self._apply_remote_timeout(self._remote_timeout)
+        try:
+            yield
+        finally:
+            with self._remote_timeout_condition:
+                self._long_operations -= 1
+
+    def _restore_remote_timeout(self):
+        with self._remote_timeout_condition:
+            if not self._learned_reads:
+                self._apply_remote_timeout(self._remote_timeout)
+
+    def set_remote_timeout(self, timeout: float) -> None:
+        """
+        Sets the time, in seconds, that remote calls of the session wait before
+        they time out. The default is 300 s.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        self._read_session
+        with self._remote_timeout_condition:
+            self._remote_timeout = timeout
+            if not self._learned_reads:
+                self._apply_remote_timeout(timeout)
+
+    def _apply_remote_timeout(self, timeout):
+        # Calls SetRemoteTimeout only if the timeout changes.
+        if timeout == self._applied_remote_timeout:
+            return
+        error_code = self._library.SetRemoteTimeout(self._session_handle, int(timeout * 1000))
+        nisyscfg.errors.handle_error(self, error_code)
+        self._applied_remote_timeout = timeout
+
+    @property
+    def connected(self) -> bool:
+        """Whether the session has connected to the system and is not closed."""
+        return self._connected
+
+    def _preconnect(self):
+        try:
+            self.connect()
+        except (
+            nisyscfg.errors.LibraryError,
+            nisyscfg.errors.TargetUnreachableError,
+            nisyscfg.errors.CircuitOpenError,
+        ) as err:
+            with self._connect_lock:
+                self._connect_error = err
 
     def __del__(self):
         self.close()
@@ -132,8 +459,10 @@ class Session(object):
 
     def _get_status_description(self, status):
         c_detailed_description = ctypes.POINTER(ctypes.c_char)()
+        # Use the handle as it is: a session that failed to connect must not
+        # try to connect again while describing the error.
         error_code = self._library.GetStatusDescription(
-            self._session, status, ctypes.pointer(c_detailed_description)
+            self._session_handle, status, ctypes.pointer(c_detailed_description)
         )
         if c_detailed_description:
             detailed_description = c_string_decode(
@@ -152,13 +481,32 @@ class Session(object):
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
+        # Expert enumerations that find_hardware_by_expert() stopped waiting
+        # for still use the session.
+        workers = list(self._expert_workers)
+        for future in workers:
+            future.cancel()
+        concurrent.futures.wait(workers)
+        for iter, _, _ in self._hardware_cache.values():
+            iter.close()
+        self._hardware_cache = {}
+        for resource in list(self._released_resources):
+            resource.close()
+        for filter in self._filter_pool.values():
+            filter.close()
+        self._filter_pool.clear()
         self._children.reverse()
         for child in self._children:
             child.close()
-        if self._session:
-            error_code = self._library.CloseHandle(self._session)
+        # Waits for a background connection in progress.
+        with self._connect_lock:
+            handle = self._session_handle
+            connected = self._connected
+            self._session_handle = None
+            self._connected = False
+        if connected and handle:
+            error_code = self._library.CloseHandle(handle)
             nisyscfg.errors.handle_error(self, error_code)
-            self._session = None
 
     def get_system_experts(self, expert_names: str = "") -> nisyscfg.expert_info.ExpertInfoIterator:
         """
@@ -174,25 +522,88 @@ class Session(object):
         expert_handle = nisyscfg.types.EnumExpertHandle()
         if isinstance(expert_names, list):
             expert_names = ",".join(expert_names)
-        error_code = self._library.GetSystemExperts(
-            self._session, c_string_encode(expert_names), ctypes.pointer(expert_handle)
+        error_code = self._idempotent(
+            "GetSystemExperts",
+            self._library.GetSystemExperts,
+            self._session,
+            c_string_encode(expert_names),
+            ctypes.pointer(expert_handle),
         )
         nisyscfg.errors.handle_error(self, error_code)
-        iter = nisyscfg.expert_info.ExpertInfoIterator(expert_handle)
+        iter = nisyscfg.expert_info.ExpertInfoIterator(expert_handle, self._retry_policy)
         self._children.append(iter)
         return iter
 
+    def get_experts(self, refresh: bool = False) -> List[nisyscfg.expert_info.ExpertInfo]:
+        """
+        Returns the experts available on the system.
+
+        The experts are retrieved with one native enumeration the first time
+        and then cached for the life of the session. restart() clears the
+        cache.
+
+        refresh - Retrieves the experts again and updates the cache.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        if self._experts is None or refresh:
+            iter = self.get_system_experts()
+            try:
+                experts = list(iter)
+            finally:
+                iter.close()
+            self._experts = experts
+            self._expert_names = frozenset(expert.expert_name.lower() for expert in experts)
+        return list(self._experts)
+
+    def refresh_experts(self) -> None:
+        """
+        Retrieves the experts available on the system again and updates the
+        cache used by get_experts(), get_expert_names() and has_expert().
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        self.get_experts(refresh=True)
+
+    def get_expert_names(self) -> FrozenSet[str]:
+        """
+        Returns the names of the experts available on the system, in lower
+        case, from the cache used by get_experts().
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        self.get_experts()
+        return self._expert_names
+
+    def has_expert(self, expert_name: str) -> bool:
+        """
+        Returns whether an expert, such as "xnet" or "nipxi", is available on
+        the system. The name is case-insensitive. Uses the cache of
+        get_experts().
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        return expert_name.strip().lower() in self.get_expert_names()
+
     def find_hardware(
         self,
-        filter: Union[None, nisyscfg.filter.Filter] = None,
+        filter: Union[None, nisyscfg.filter.Filter, nisyscfg.filter.FilterSpec] = None,
         mode: nisyscfg.enums.FilterMode = nisyscfg.enums.FilterMode.MATCH_VALUES_ALL,
         expert_names: str = "",
+        prefetch: int = 0,
+        prefetch_properties: Iterable[str] = (),
     ) -> nisyscfg.hardware_resource.HardwareResourceIterator:
         """
         Returns an iterator of hardware in a specified system.
 
         filter - Specifies a filter you can use to limit the results to hardware
-        matching specific properties. The default is no filter.
+        matching specific properties. The filter is either a filter created by
+        create_filter() or an nisyscfg.filter.FilterSpec, which is mapped to a
+        pooled native filter. The default is no filter.
 
         mode - The enumerated list of filter modes.
         ==================== ===================================================
@@ -213,19 +624,232 @@ class Session(object):
         specifying which experts to query. If None or empty-string, all
         supported experts are queried.
 
+        prefetch - The number of resources a background thread retrieves ahead
+        of the caller. This overlaps the latency of the enumeration, which is
+        significant on remote targets, with the caller's processing. The
+        default of 0 retrieves each resource when the caller asks for it.
+
+        prefetch_properties - Names of properties, such as "serial_number" or
+        "xnet.port_number", that the background thread reads for each
+        prefetched resource. Each prefetched value is returned once; reading
+        the property again queries the resource. Prefetching does not apply to
+        results served by the session's hardware cache.
+
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
-        if filter is None:
+        filter = self._resolve_filter(filter)
+        if isinstance(expert_names, list):
+            expert_names = ",".join(expert_names)
+        if self._hardware_cache_ttl is not None:
+            cache_key = self._hardware_cache_key(filter, mode, expert_names)
+            cached = self._get_cached_hardware(cache_key)
+            if cached is not None:
+                return cached
+            prefetch = 0
+        if self._single_flight is not None:
+            key = ("FindHardware",) + self._hardware_cache_key(filter, mode, expert_names)
+            return nisyscfg.hardware_resource.CachedHardwareResourceIterator(
+                self._single_flight.do(key, self._find_shared_hardware, filter, mode, expert_names)
+            )
+        iter = self._enumerate_hardware(filter, mode, expert_names, prefetch, prefetch_properties)
+        if self._hardware_cache_ttl is not None:
+            return nisyscfg.hardware_resource.CachedHardwareResourceIterator(
+                self._cache_hardware(cache_key, iter)
+            )
+        self._children.append(iter)
+        return iter
 
-            class DummyFilter(object):
-                _handle = None
+    def _find_shared_hardware(self, filter, mode, expert_names):
+        iter = self._enumerate_hardware(filter, mode, expert_names, 0, ())
+        if self._hardware_cache_ttl is not None:
+            return self._cache_hardware(self._hardware_cache_key(filter, mode, expert_names), iter)
+        resources = list(iter)
+        self._children.append(iter)
+        return resources
 
-            filter = DummyFilter()
+    def _enumerate_hardware(self, filter, mode, expert_names, prefetch, prefetch_properties):
         resource_handle = nisyscfg.types.EnumResourceHandle()
+        error_code = self._idempotent(
+            "FindHardware",
+            self._timed,
+            nisyscfg.timeouts.remote("FindHardware"),
+            self._library.FindHardware,
+            self._read_session,
+            mode,
+            filter._handle,
+            c_string_encode(expert_names),
+            ctypes.pointer(resource_handle),
+        )
+        nisyscfg.errors.handle_error(self, error_code)
+        if prefetch > 0:
+            # The enumeration continues the read, so it keeps the read's
+            # remote timeout.
+            iter = nisyscfg.hardware_resource.PrefetchingHardwareResourceIterator(
+                self._session_handle,
+                resource_handle,
+                prefetch,
+                prefetch_properties,
+                self.invalidate_hardware_cache,
+                self._retry_policy,
+            )
+        else:
+            iter = nisyscfg.hardware_resource.HardwareResourceIterator(
+                self._session_handle,
+                resource_handle,
+                self.invalidate_hardware_cache,
+                self._retry_policy,
+            )
+        return iter
+
+    def _find_expert_hardware(self, filter, mode, expert_name, handoff):
+        start = time.perf_counter()
+        iter = None
+        resources = []
+        error = None
+        try:
+            iter = self.find_hardware(filter, mode, expert_name)
+            for resource in iter:
+                key = tuple(zip(resource.expert_name, resource.expert_resource_name))
+                # A resource without expert names cannot be matched with the
+                # resources of other experts, so it is always kept.
+                resources.append((key or (expert_name, len(resources)), resource))
+        except nisyscfg.errors.LibraryError as err:
+            error = err
+        if not handoff.deliver():
+            # The caller timed out, so no one else will release the resources.
+            if iter is not None:
+                self._close_child(iter)
+            return [], error, time.perf_counter() - start
+        return resources, error, time.perf_counter() - start
+
+    def find_hardware_by_expert(
+        self,
+        filter: Union[None, nisyscfg.filter.Filter, nisyscfg.filter.FilterSpec] = None,
+        mode: nisyscfg.enums.FilterMode = nisyscfg.enums.FilterMode.MATCH_VALUES_ALL,
+        expert_names: str = "",
+        timeout: Union[None, float] = None,
+        max_workers: Union[None, int] = None,
+    ) -> FindHardwareByExpertResult:
+        """
+        Returns the hardware in a specified system, enumerating each expert
+        separately and concurrently so that one slow expert, such as a
+        network or GPIB expert, does not hold up the others.
+
+        The experts are listed with get_experts() and each one is
+        enumerated with find_hardware() on a thread pool. A resource that
+        several experts return is included once, from the first expert that
+        returns it in the order of get_experts().
+
+        filter, mode, expert_names - As for find_hardware().
+
+        timeout - The time, in seconds from the start of the call, that each
+        expert's enumeration may take. The resources of an expert that does
+        not finish in time are left out and its ExpertEnumeration has
+        timed_out set. The native call cannot be cancelled, so it finishes in
+        the background and its resources are then closed; close() waits for
+        it. The default of None waits for every expert.
+
+        max_workers - The number of threads. The default is one per expert.
+
+        Returns a FindHardwareByExpertResult whose experts field maps each
+        expert name to an ExpertEnumeration with its timing, resource count
+        and error. An expert that fails does not fail the other experts.
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
         if isinstance(expert_names, list):
             expert_names = ",".join(expert_names)
-        error_code = self._library.FindHardware(
+        names = {name.strip().lower() for name in (expert_names or "").split(",") if name.strip()}
+        expert_list = [
+            expert.expert_name
+            for expert in self.get_experts()
+            if not names or expert.expert_name.lower() in names
+        ]
+        if isinstance(filter, nisyscfg.filter.FilterSpec):
+            filter = self._pooled_filter(filter)
+        resources = []
+        experts = {}
+        if not expert_list:
+            return FindHardwareByExpertResult(resources, experts)
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or len(expert_list), thread_name_prefix="nisyscfg-expert"
+        )
+        try:
+            start = time.perf_counter()
+            handoffs = [_Handoff() for _ in expert_list]
+            futures = [
+                executor.submit(self._find_expert_hardware, filter, mode, expert_name, handoff)
+                for expert_name, handoff in zip(expert_list, handoffs)
+            ]
+            for future in futures:
+                self._expert_workers.add(future)
+                future.add_done_callback(self._expert_workers.discard)
+            seen = set()
+            for expert_name, handoff, future in zip(expert_list, handoffs, futures):
+                remaining = None
+                if timeout is not None:
+                    remaining = max(0.0, start + timeout - time.perf_counter())
+                try:
+                    expert_resources, error, elapsed = future.result(remaining)
+                except concurrent.futures.TimeoutError:
+                    if handoff.abandon():
+                        experts[expert_name] = ExpertEnumeration(
+                            expert_name, time.perf_counter() - start, 0, None, True
+                        )
+                        continue
+                    # The enumeration finished as the wait timed out.
+                    expert_resources, error, elapsed = future.result()
+                experts[expert_name] = ExpertEnumeration(
+                    expert_name, elapsed, len(expert_resources), error, False
+                )
+                for key, resource in expert_resources:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    resources.append(resource)
+        finally:
+            executor.shutdown(wait=False)
+        return FindHardwareByExpertResult(resources, experts)
+
+    def find_hardware_records(
+        self,
+        properties: Iterable[str],
+        filter: Union[None, nisyscfg.filter.Filter, nisyscfg.filter.FilterSpec] = None,
+        mode: nisyscfg.enums.FilterMode = nisyscfg.enums.FilterMode.MATCH_VALUES_ALL,
+        expert_names: str = "",
+    ) -> nisyscfg.hardware_resource.HardwareRecordIterator:
+        """
+        Returns an iterator of records holding selected properties of the
+        hardware in a specified system.
+
+        Unlike find_hardware(), the iterator does not keep a resource for each
+        item: every resource is closed as soon as its properties are read, so
+        memory use does not grow with the size of the system. Results are
+        never served from the session's hardware cache.
+
+        properties - Names of properties, such as "serial_number" or
+        "xnet.port_number". Each record is a NamedTuple with one field per
+        property, named with "." replaced by "_". Properties that a resource
+        does not have are None and indexed properties are tuples.
+
+        filter, mode, expert_names - As for find_hardware().
+
+        Example:
+            for record in session.find_hardware_records(["product_name", "serial_number"]):
+                print(record.product_name, record.serial_number)
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        filter = self._resolve_filter(filter)
+        if isinstance(expert_names, list):
+            expert_names = ",".join(expert_names)
+        resource_handle = nisyscfg.types.EnumResourceHandle()
+        error_code = self._idempotent(
+            "FindHardware",
+            self._library.FindHardware,
             self._session,
             mode,
             filter._handle,
@@ -233,10 +857,109 @@ class Session(object):
             ctypes.pointer(resource_handle),
         )
         nisyscfg.errors.handle_error(self, error_code)
-        iter = nisyscfg.hardware_resource.HardwareResourceIterator(self._session, resource_handle)
+        iter = nisyscfg.hardware_resource.HardwareRecordIterator(
+            self._session, resource_handle, properties, self._retry_policy
+        )
         self._children.append(iter)
         return iter
 
+    def _resolve_filter(self, filter):
+        if filter is None:
+
+            class DummyFilter(object):
+                _handle = None
+                _properties = {}
+
+            return DummyFilter()
+        if isinstance(filter, nisyscfg.filter.FilterSpec):
+            return self._pooled_filter(filter)
+        return filter
+
+    def _pooled_filter(self, spec):
+        with self._filter_pool_lock:
+            filter = self._filter_pool.get(spec)
+            if filter is not None:
+                self._filter_pool.move_to_end(spec)
+                return filter
+        filter = nisyscfg.filter.Filter(self._session)
+        try:
+            spec.apply(filter)
+        except Exception:
+            filter.close()
+            raise
+        with self._filter_pool_lock:
+            if self._filter_pool_size <= 0:
+                # Pooling is disabled, so the filter lives as long as the session.
+                self._children.append(filter)
+                return filter
+            evicted = []
+            existing = self._filter_pool.setdefault(spec, filter)
+            self._filter_pool.move_to_end(spec)
+            while len(self._filter_pool) > self._filter_pool_size:
+                evicted.append(self._filter_pool.popitem(last=False)[1])
+        if existing is not filter:
+            evicted.append(filter)
+        for filter in evicted:
+            filter.close()
+        return existing
+
+    @staticmethod
+    def _hardware_cache_key(filter, mode, expert_names):
+        # Enum and bool values compare equal to their integer values.
+        properties = tuple(
+            sorted(
+                (id, int(value) if isinstance(value, int) else value)
+                for id, value in filter._properties.items()
+            )
+        )
+        experts = frozenset(
+            name.strip().lower() for name in (expert_names or "").split(",") if name.strip()
+        )
+        return properties, int(mode), experts
+
+    def _get_cached_hardware(self, key):
+        entry = self._hardware_cache.get(key)
+        if entry is None:
+            return None
+        iter, resources, expires = entry
+        # A caller may have closed one of the cached resources.
+        if time.monotonic() >= expires or not all(resource._handle for resource in resources):
+            del self._hardware_cache[key]
+            self._release_cached_hardware(iter, resources)
+            return None
+        return nisyscfg.hardware_resource.CachedHardwareResourceIterator(resources)
+
+    def _cache_hardware(self, key, iter):
+        resources = list(iter)
+        self._hardware_cache[key] = (iter, resources, time.monotonic() + self._hardware_cache_ttl)
+        return resources
+
+    def _close_child(self, child):
+        # Closes an enumeration before the session is closed. Enumerations
+        # served by the hardware cache are owned by the cache and left open.
+        if child in self._children:
+            self._children.remove(child)
+            child.close()
+
+    def _release_cached_hardware(self, iter, resources):
+        # Callers may still hold cached resources, so they are detached from
+        # the enumeration and closed when they are garbage collected or when
+        # the session is closed.
+        iter._children = []
+        iter.close()
+        self._released_resources.update(resources)
+
+    def invalidate_hardware_cache(self) -> None:
+        """
+        Discards the results cached by find_hardware() when the session was
+        created with a hardware_cache_ttl. Resources that were returned from the
+        cache remain valid.
+        """
+        cache = self._hardware_cache
+        self._hardware_cache = {}
+        for iter, resources, _ in cache.values():
+            self._release_cached_hardware(iter, resources)
+
     def find_systems(
         self,
         device_class: str = "",
@@ -301,13 +1024,16 @@ class Session(object):
         systems.
 
         Returns an interator that yields the system names in the format
-        requested from the input parameter
+        requested from the input parameter. Its records() and index() methods
+        parse the names into nisyscfg.system_info.SystemRecord tuples.
 
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
         system_handle = nisyscfg.types.EnumSystemHandle()
-        error_code = self._library.FindSystems(
+        error_code = self._idempotent(
+            "FindSystems",
+            self._library.FindSystems,
             self._session,
             c_string_encode(device_class),
             nisyscfg.enums.Bool(detect_online_systems),
@@ -316,22 +1042,63 @@ class Session(object):
             int(timeout * 1000),
             nisyscfg.enums.Bool(only_installable_systems),
             ctypes.pointer(system_handle),
+            timeout_index=5,
         )
         nisyscfg.errors.handle_error(self, error_code)
 
-        return nisyscfg.system_info.SystemInfoIterator(system_handle)
+        return nisyscfg.system_info.SystemInfoIterator(
+            system_handle, find_output_mode, self._retry_policy
+        )
 
-    def create_filter(self) -> nisyscfg.filter.Filter:
+    def topology(
+        self,
+        filter: Union[None, nisyscfg.filter.Filter] = None,
+        mode: nisyscfg.enums.FilterMode = nisyscfg.enums.FilterMode.MATCH_VALUES_ALL,
+        expert_names: str = "",
+        prefetch: int = 0,
+    ) -> nisyscfg.topology.Topology:
+        """
+        Returns a tree of the hardware in the system, indexed by link name,
+        slot number and NI-XNET port number, built from a single hardware
+        enumeration.
+
+        filter, mode and expert_names - Limit the resources in the tree. See
+        find_hardware().
+
+        prefetch - Reads the resources' topology properties on a background
+        thread this many resources ahead. See find_hardware().
+
+        Raises an nisyscfg.errors.LibraryError exception in the event of an
+        error.
+        """
+        return nisyscfg.topology.Topology(
+            self.find_hardware(
+                filter,
+                mode,
+                expert_names,
+                prefetch=prefetch,
+                prefetch_properties=nisyscfg.topology.NODE_PROPERTIES,
+            )
+        )
+
+    def create_filter(
+        self, spec: Union[None, nisyscfg.filter.FilterSpec] = None
+    ) -> nisyscfg.filter.Filter:
         """
         Creates a hardware filter object that is used to query for specific
         resources in a system. After creating a filter, set one or more
         properties to limit the set of  detected resources.
 
+        spec - An nisyscfg.filter.FilterSpec whose properties are set on the new
+        filter. The default sets no properties.
+
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
         filter = nisyscfg.filter.Filter(self._session)
         self._children.append(filter)
+        if spec is not None:
+            spec.apply(filter)
         return filter
 
     def restart(
@@ -339,7 +1106,7 @@ class Session(object):
         sync_call: bool = True,
         install_mode: bool = False,
         flush_dns: bool = False,
-        timeout: float = 90.0,
+        timeout: Union[None, float] = None,
     ) -> str:
         """
         Reboots a system or network device.
@@ -358,7 +1125,9 @@ class Session(object):
         system.
 
         timeout - The time, in seconds, that the function waits to establish a
-        connection before it returns an error. The default is 90 s.
+        connection before it returns an error. The default is 90 s, or the
+        timeout learned by the session's nisyscfg.timeouts.AdaptiveTimeouts
+        from previous synchronous restarts.
 
         Returns the new IP address of the rebooted system. This IP address may
         differ from the previous IP address if the system acquires a different
@@ -367,8 +1136,10 @@ class Session(object):
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
+        if timeout is None:
+            timeout = self._adaptive_timeout(nisyscfg.timeouts.RESTART, 90.0)
         new_ip_address = nisyscfg.types.simple_string()
-        error_code = self._library.Restart(
+        args = (
             self._session,
             sync_call,
             install_mode,
@@ -376,7 +1147,15 @@ class Session(object):
             int(timeout * 1000),
             new_ip_address,
         )
+        with self._long_operation():
+            if sync_call:
+                # Only a synchronous restart takes as long as the reboot.
+                error_code = self._timed(nisyscfg.timeouts.RESTART, self._library.Restart, *args)
+            else:
+                error_code = self._library.Restart(*args)
         nisyscfg.errors.handle_error(self, error_code)
+        self.invalidate_hardware_cache()
+        self._experts = None
         return c_string_decode(new_ip_address.value)
 
     def get_filtered_base_system_images(
@@ -409,7 +1188,9 @@ class Session(object):
         error.
         """
         software_component_handle = nisyscfg.types.EnumSoftwareComponentHandle()
-        error_code = self._library.GetFilteredBaseSystemImages(
+        error_code = self._idempotent(
+            "GetFilteredBaseSystemImages",
+            self._library.GetFilteredBaseSystemImages,
             c_string_encode(repository_path),
             c_string_encode(device_class),
             c_string_encode(os),
@@ -418,7 +1199,9 @@ class Session(object):
         )
         nisyscfg.errors.handle_error(self, error_code)
         if software_component_handle:
-            iter = nisyscfg.component_info.ComponentInfoIterator(software_component_handle)
+            iter = nisyscfg.component_info.ComponentInfoIterator(
+                software_component_handle, self._retry_policy
+            )
             self._children.append(iter)
             return iter
 
@@ -494,15 +1277,16 @@ class Session(object):
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
-        error_code = self._library.FormatWithBaseSystemImage(
-            self._session,
-            nisyscfg.enums.Bool(auto_restart),
-            file_system,
-            network_settings,
-            c_string_encode(system_image_id),
-            c_string_encode(system_image_version),
-            ctypes.c_uint(int(timeout * 1000)),
-        )
+        with self._long_operation():
+            error_code = self._library.FormatWithBaseSystemImage(
+                self._session,
+                nisyscfg.enums.Bool(auto_restart),
+                file_system,
+                network_settings,
+                c_string_encode(system_image_id),
+                c_string_encode(system_image_version),
+                ctypes.c_uint(int(timeout * 1000)),
+            )
         nisyscfg.errors.handle_error(self, error_code)
 
     def get_available_software_components(
@@ -534,12 +1318,18 @@ class Session(object):
         error.
         """
         software_component_handle = nisyscfg.types.EnumSoftwareComponentHandle()
-        error_code = self._library.GetAvailableSoftwareComponents(
-            self._session, item_types, ctypes.pointer(software_component_handle)
+        error_code = self._idempotent(
+            "GetAvailableSoftwareComponents",
+            self._library.GetAvailableSoftwareComponents,
+            self._session,
+            item_types,
+            ctypes.pointer(software_component_handle),
         )
         nisyscfg.errors.handle_error(self, error_code)
         if software_component_handle:
-            iter = nisyscfg.component_info.ComponentInfoIterator(software_component_handle)
+            iter = nisyscfg.component_info.ComponentInfoIterator(
+                software_component_handle, self._retry_policy
+            )
             self._children.append(iter)
             return iter
 
@@ -575,13 +1365,41 @@ class Session(object):
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
+        if self._single_flight is not None:
+            components = self._single_flight.do(
+                ("GetInstalledSoftwareComponents", int(item_types), bool(cached)),
+                self._read_installed_software_components,
+                item_types,
+                cached,
+            )
+            if components is not None:
+                return nisyscfg.component_info.CachedComponentInfoIterator(components)
+            return None
+        return self._get_installed_software_components(item_types, cached)
+
+    def _read_installed_software_components(self, item_types, cached):
+        iter = self._get_installed_software_components(item_types, cached)
+        if iter is None:
+            return None
+        components = list(iter)
+        self._close_child(iter)
+        return components
+
+    def _get_installed_software_components(self, item_types, cached):
         software_component_handle = nisyscfg.types.EnumSoftwareComponentHandle()
-        error_code = self._library.GetInstalledSoftwareComponents(
-            self._session, item_types, cached, ctypes.pointer(software_component_handle)
+        error_code = self._idempotent(
+            "GetInstalledSoftwareComponents",
+            self._library.GetInstalledSoftwareComponents,
+            self._session,
+            item_types,
+            cached,
+            ctypes.pointer(software_component_handle),
         )
         nisyscfg.errors.handle_error(self, error_code)
         if software_component_handle:
-            iter = nisyscfg.component_info.ComponentInfoIterator(software_component_handle)
+            iter = nisyscfg.component_info.ComponentInfoIterator(
+                software_component_handle, self._retry_policy
+            )
             self._children.append(iter)
             return iter
 
@@ -698,13 +1516,14 @@ class Session(object):
         """
         installed_component_handle = nisyscfg.types.EnumSoftwareFeedHandle()
         broken_dependency_handle = nisyscfg.types.EnumDependencyHandle()
-        error_code = self._library.InstallAll(
-            self._session,
-            auto_restart,
-            deselect_conflicts,
-            ctypes.pointer(installed_component_handle),
-            ctypes.pointer(broken_dependency_handle),
-        )
+        with self._long_operation():
+            error_code = self._library.InstallAll(
+                self._session,
+                auto_restart,
+                deselect_conflicts,
+                ctypes.pointer(installed_component_handle),
+                ctypes.pointer(broken_dependency_handle),
+            )
         nisyscfg.errors.handle_error(self, error_code)
 
         result = InstallAllResult(
@@ -733,7 +1552,8 @@ class Session(object):
         Raises an nisyscfg.errors.LibraryError exception in the event of an
         error.
         """
-        error_code = self._library.UninstallAll(self._session, auto_restart)
+        with self._long_operation():
+            error_code = self._library.UninstallAll(self._session, auto_restart)
         nisyscfg.errors.handle_error(self, error_code)
 
     def _install_uninstall(
@@ -815,16 +1635,19 @@ class Session(object):
 
         broken_dependency_handle = nisyscfg.types.EnumDependencyHandle()
 
-        error_code = self._library.InstallUninstallComponents2(
-            self._session,
-            auto_restart,
-            auto_select_dependencies,
-            auto_select_recommends,
-            software_to_install._handle,
-            len(c_components_to_uninstall),
-            ctypes.cast(c_components_to_uninstall, ctypes.POINTER(ctypes.POINTER(ctypes.c_char))),
-            ctypes.pointer(broken_dependency_handle),
-        )
+        with self._long_operation():
+            error_code = self._library.InstallUninstallComponents2(
+                self._session,
+                auto_restart,
+                auto_select_dependencies,
+                auto_select_recommends,
+                software_to_install._handle,
+                len(c_components_to_uninstall),
+                ctypes.cast(
+                    c_components_to_uninstall, ctypes.POINTER(ctypes.POINTER(ctypes.c_char))
+                ),
+                ctypes.pointer(broken_dependency_handle),
+            )
         nisyscfg.errors.handle_error(self, error_code)
 
         broken_dependencies = nisyscfg.dependency_info.DependencyInfoIterator(
@@ -989,25 +1812,44 @@ class Session(object):
         error.
         """
         software_feed_handle = nisyscfg.types.EnumSoftwareFeedHandle()
-        error_code = self._library.GetSoftwareFeeds(
-            self._session, ctypes.pointer(software_feed_handle)
+        error_code = self._idempotent(
+            "GetSoftwareFeeds",
+            self._library.GetSoftwareFeeds,
+            self._session,
+            ctypes.pointer(software_feed_handle),
         )
         nisyscfg.errors.handle_error(self, error_code)
         if software_feed_handle:
-            iter = nisyscfg.software_feed.SoftwareFeedIterator(software_feed_handle)
+            iter = nisyscfg.software_feed.SoftwareFeedIterator(
+                software_feed_handle, self._retry_policy
+            )
             self._children.append(iter)
             return iter
 
     @property
     def resource(self) -> nisyscfg.hardware_resource.HardwareResource:
         """System resource properties"""
-        if not hasattr(self, "_resource"):
-            resource_handle = self._get_property(16941086, nisyscfg.types.ResourceHandle)
-            self._resource = nisyscfg.hardware_resource.HardwareResource(resource_handle)
-            self._children.append(self._resource)
+        # The resource is created once so that concurrent callers do not each
+        # open a handle and the session does not close one handle twice.
+        with self._resource_lock:
+            if not hasattr(self, "_resource"):
+                resource_handle = self._get_property(16941086, nisyscfg.types.ResourceHandle)
+                self._resource = nisyscfg.hardware_resource.HardwareResource(
+                    resource_handle, self.invalidate_hardware_cache, self._retry_policy
+                )
+                self._children.append(self._resource)
         return self._resource
 
     def _get_property(self, id, c_type):
+        # Handles are not shared, since each caller owns and closes the handle
+        # it reads.
+        if self._single_flight is not None and not issubclass(c_type, ctypes.c_void_p):
+            return self._single_flight.do(
+                ("GetSystemProperty", id), self._read_property, id, c_type
+            )
+        return self._read_property(id, c_type)
+
+    def _read_property(self, id, c_type):
         if c_type == ctypes.c_char_p:
             value = nisyscfg.types.simple_string()
             value_arg = value
@@ -1020,7 +1862,15 @@ class Session(object):
             value = c_type(0)
             value_arg = ctypes.pointer(value)
 
-        error_code = self._library.GetSystemProperty(self._session, id, value_arg)
+        error_code = self._idempotent(
+            "GetSystemProperty",
+            self._timed,
+            nisyscfg.timeouts.remote("GetSystemProperty"),
+            self._library.GetSystemProperty,
+            self._read_session,
+            id,
+            value_arg,
+        )
         nisyscfg.errors.handle_error(self, error_code)
 
         if issubclass(c_type, nisyscfg.enums.BaseEnum) or issubclass(
@@ -1063,14 +1913,16 @@ class Session(object):
         """
         restart_required = ctypes.c_int()
         c_details = ctypes.POINTER(ctypes.c_char)()
-        error_code = self._library.SaveSystemChanges(
-            self._session, restart_required, ctypes.pointer(c_details)
-        )
+        with self._long_operation():
+            error_code = self._library.SaveSystemChanges(
+                self._session, restart_required, ctypes.pointer(c_details)
+            )
         if c_details:
             details = c_string_decode(ctypes.cast(c_details, ctypes.c_char_p).value)
             error_code_2 = self._library.FreeDetailedString(c_details)
         nisyscfg.errors.handle_error(self, error_code)
         nisyscfg.errors.handle_error(self, error_code_2)
+        self.invalidate_hardware_cache()
         return SaveChangesResult(restart_required=restart_required.value != 0, details=details)
 
     def set_system_image(
@@ -1133,14 +1985,15 @@ class Session(object):
                     )
                 zip_ref.extractall(source_folder)
 
-            error_code = self._library.SetSystemImageFromFolder2(
-                self._session,
-                nisyscfg.enums.Bool(auto_restart),
-                c_string_encode(source_folder),
-                c_string_encode(encryption_passphrase),
-                len(exclude_paths) if exclude_paths else 0,
-                exclude_paths,
-                nisyscfg.enums.Bool(original_system_only),
-                network_settings,
-            )
+            with self._long_operation():
+                error_code = self._library.SetSystemImageFromFolder2(
+                    self._session,
+                    nisyscfg.enums.Bool(auto_restart),
+                    c_string_encode(source_folder),
+                    c_string_encode(encryption_passphrase),
+                    len(exclude_paths) if exclude_paths else 0,
+                    exclude_paths,
+                    nisyscfg.enums.Bool(original_system_only),
+                    network_settings,
+                )
             nisyscfg.errors.handle_error(self, error_code)
@@ -1,31 +1,226 @@
+import ipaddress
+import nisyscfg._enumerator
+import nisyscfg.enums
 import nisyscfg.errors
+import re
+import typing
 
 from nisyscfg._lib import c_string_decode
 
 
-class SystemInfoIterator(object):
-    def __init__(self, handle):
-        self._handle = handle
-        self._library = nisyscfg._library_singleton.get()
+# A system found on the network. Fields that the system name did not include,
+# which depends on the SystemNameFormat, are empty strings. MAC addresses are
+# upper case and separated by ":".
+SystemRecord = typing.NamedTuple(
+    "SystemRecord",
+    [
+        ("hostname", str),
+        ("ip_address", str),
+        ("mac_address", str),
+    ],
+)
 
-    def __del__(self):
-        self.close()
+_MAC_ADDRESS = re.compile(r"^[0-9A-Fa-f]{2}([:-])[0-9A-Fa-f]{2}(\1[0-9A-Fa-f]{2}){4}$")
+_SYSTEM_NAME = re.compile(r"^(.*?)\s*\(([^()]*)\)$")
 
-    def __iter__(self):
-        return self
+_FORMAT_FIELDS = {
+    nisyscfg.enums.SystemNameFormat.HOSTNAME: ("hostname",),
+    nisyscfg.enums.SystemNameFormat.HOSTNAME_IP: ("hostname", "ip_address"),
+    nisyscfg.enums.SystemNameFormat.HOSTNAME_MAC: ("hostname", "mac_address"),
+    nisyscfg.enums.SystemNameFormat.IP: ("ip_address",),
+    nisyscfg.enums.SystemNameFormat.IP_HOSTNAME: ("ip_address", "hostname"),
+    nisyscfg.enums.SystemNameFormat.IP_MAC: ("ip_address", "mac_address"),
+    nisyscfg.enums.SystemNameFormat.MAC: ("mac_address",),
+    nisyscfg.enums.SystemNameFormat.MAC_HOSTNAME: ("mac_address", "hostname"),
+    nisyscfg.enums.SystemNameFormat.MAC_IP: ("mac_address", "ip_address"),
+}
+
+
+def _is_ip_address(value):
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _kind(value):
+    if _MAC_ADDRESS.match(value):
+        return "mac_address"
+    if _is_ip_address(value):
+        return "ip_address"
+    return "hostname"
+
+
+def is_mac_address(value: str) -> bool:
+    """Returns whether value is a MAC address such as "00:80:2F:00:00:02"."""
+    return _MAC_ADDRESS.match(value) is not None
+
+
+def normalize_mac_address(mac_address: str) -> str:
+    """Returns a MAC address in upper case and separated by ":"."""
+    return mac_address.replace("-", ":").upper()
+
+
+def parse_system_name(
+    name: str,
+    find_output_mode: typing.Optional[nisyscfg.enums.SystemNameFormat] = None,
+) -> SystemRecord:
+    """
+    Parses a system name returned by nisyscfg.Session.find_systems(), such as
+    "myhost (10.0.0.2)" or "10.0.0.2 (00:80:2F:00:00:02)", into a
+    SystemRecord.
+
+    find_output_mode - The SystemNameFormat the name was requested in. The
+    parts of the name must have the form of the fields of that format, except
+    that an unconfigured system may be returned as IP_MAC. If None, each part
+    is identified by its form.
+
+    Raises a ValueError exception if the name does not have the form of
+    find_output_mode or of IP_MAC.
+    """
+    name = name.strip()
+    match = _SYSTEM_NAME.match(name)
+    parts = [match.group(1).strip(), match.group(2).strip()] if match else [name]
+    kinds = tuple(_kind(part) for part in parts)
+    if find_output_mode is not None:
+        mode = nisyscfg.enums.SystemNameFormat(find_output_mode)
+        expected = _FORMAT_FIELDS[mode]
+        if kinds not in (expected, _FORMAT_FIELDS[nisyscfg.enums.SystemNameFormat.IP_MAC]):
+            # A hostname may have any form, for example that of an IP address.
+            if len(expected) != len(kinds) or not all(
+                field == kind or field == "hostname" for field, kind in zip(expected, kinds)
+            ):
+                raise ValueError("System name {!r} does not match {}".format(name, mode.name))
+            kinds = expected
+    if len(set(kinds)) != len(kinds) or not all(parts):
+        raise ValueError("System name {!r} is not valid".format(name))
+    fields = {"hostname": "", "ip_address": "", "mac_address": ""}
+    for kind, part in zip(kinds, parts):
+        if kind == "mac_address":
+            part = normalize_mac_address(part)
+        fields[kind] = part
+    return SystemRecord(**fields)
+
+
+def record_key(system: SystemRecord) -> str:
+    """
+    Returns the key that identifies a system: its MAC address, or its
+    hostname in lower case or its IP address when the MAC address is not
+    known.
+    """
+    return system.mac_address or system.hostname.lower() or system.ip_address
+
+
+class SystemIndex(object):
+    """
+    SystemRecords indexed by hostname, IP address and MAC address. Records
+    with the same record_key() are stored once, combining their fields.
+    """
+
+    def __init__(self, systems: typing.Iterable[SystemRecord] = ()):
+        self._systems = {}
+        self._by_hostname = {}
+        self._by_ip_address = {}
+        self._by_mac_address = {}
+        for system in systems:
+            self.add(system)
+
+    def __iter__(self) -> typing.Iterator[SystemRecord]:
+        return iter(list(self._systems.values()))
+
+    def __len__(self) -> int:
+        return len(self._systems)
+
+    def __contains__(self, key) -> bool:
+        return key in self._systems
+
+    def get(self, key: str) -> typing.Optional[SystemRecord]:
+        """Returns the system with a record_key(), or None."""
+        return self._systems.get(key)
+
+    def add(self, system: SystemRecord) -> SystemRecord:
+        """Adds system, combining it with a system that has the same key, and returns it."""
+        key = record_key(system)
+        previous = self._systems.get(key)
+        if previous is not None:
+            self._unindex(previous)
+            system = SystemRecord(*(new or old for new, old in zip(system, previous)))
+        self._systems[key] = system
+        if system.hostname:
+            self._by_hostname[system.hostname.lower()] = system
+        if system.ip_address:
+            self._by_ip_address[system.ip_address] = system
+        if system.mac_address:
+            self._by_mac_address[system.mac_address] = system
+        return system
+
+    def _unindex(self, system):
+        for index, value in (
+            (self._by_hostname, system.hostname.lower()),
+            (self._by_ip_address, system.ip_address),
+            (self._by_mac_address, system.mac_address),
+        ):
+            if index.get(value) is system:
+                del index[value]
+
+    def by_hostname(self, hostname: str) -> typing.Optional[SystemRecord]:
+        """Returns the system with a hostname, which is case-insensitive, or None."""
+        return self._by_hostname.get(hostname.lower())
+
+    def by_ip_address(self, ip_address: str) -> typing.Optional[SystemRecord]:
+        """Returns the system with an IP address, or None."""
+        return self._by_ip_address.get(ip_address)
+
+    def by_mac_address(self, mac_address: str) -> typing.Optional[SystemRecord]:
+        """Returns the system with a MAC address, in any case and separator, or None."""
+        return self._by_mac_address.get(normalize_mac_address(mac_address))
+
+    def find(self, name: str) -> typing.Optional[SystemRecord]:
+        """Returns the system whose hostname, IP address or MAC address is name, or None."""
+        return self.by_hostname(name) or self.by_ip_address(name) or self.by_mac_address(name)
+
+
+class SystemInfoIterator(nisyscfg._enumerator.Enumerator):
+    def __init__(self, handle, find_output_mode=None, retry_policy=None):
+        self._find_output_mode = find_output_mode
+        super(SystemInfoIterator, self).__init__(handle, retry_policy)
 
     def __next__(self) -> str:
         if not self._handle:
             raise StopIteration()
         system_name = nisyscfg.types.simple_string()
-        error_code = self._library.NextSystemInfo(self._handle, system_name)
+        error_code = self._call("NextSystemInfo", self._handle, system_name)
         if error_code == nisyscfg.errors.Status.END_OF_ENUM:
-            raise StopIteration()
+            raise self._end_of_enum()
         nisyscfg.errors.handle_error(self, error_code)
+        self._position += 1
         return c_string_decode(system_name.value)
 
-    def close(self) -> None:
-        if self._handle:
-            error_code = self._library.CloseHandle(self._handle)
-            nisyscfg.errors.handle_error(self, error_code)
-            self._handle = None
+    def records(self, skip_invalid: bool = False) -> typing.Iterator[SystemRecord]:
+        """
+        Yields the remaining systems as SystemRecords, parsed according to the
+        find_output_mode of the find_systems() call.
+
+        skip_invalid - Skips system names that cannot be parsed instead of
+        raising an exception.
+
+        Raises a ValueError exception if a system name cannot be parsed and
+        skip_invalid is False, or an nisyscfg.errors.LibraryError exception in
+        the event of an error.
+        """
+        for name in self:
+            try:
+                yield parse_system_name(name, self._find_output_mode)
+            except ValueError:
+                if not skip_invalid:
+                    raise
+
+    def index(self) -> SystemIndex:
+        """
+        Returns a SystemIndex of the remaining systems.
+
+        Raises a ValueError exception if a system name cannot be parsed, or
+        an nisyscfg.errors.LibraryError exception in the event of an error.
+        """
+        return SystemIndex(self.records())
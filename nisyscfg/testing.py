@@ -0,0 +1,79 @@
+import collections
+import contextlib
+import threading
+import typing
+
+import nisyscfg._library_singleton
+
+
+class CallBudgetExceeded(AssertionError):
+    """This error is raised when a block makes more native calls than budgeted."""
+
+    def __init__(self, exceeded, counts):
+        self.exceeded = exceeded
+        self.counts = counts
+        super(CallBudgetExceeded, self).__init__(
+            "Native call budget exceeded: "
+            + ", ".join(
+                "{} called {} times (budget {})".format(name, counts[name], budget)
+                for name, budget in sorted(exceeded.items())
+            )
+        )
+
+
+class CallCounter(object):
+    """
+    Counts native calls by function name. A CallCounter is an interceptor;
+    use call_budget() to install one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = collections.Counter()
+
+    def __call__(self, name, func, args):
+        with self._lock:
+            self._counts[name] += 1
+        return func(*args)
+
+    @property
+    def counts(self) -> typing.Dict[str, int]:
+        """Number of calls made to each native function so far."""
+        with self._lock:
+            return dict(self._counts)
+
+    @property
+    def total(self) -> int:
+        """Number of native calls made so far."""
+        with self._lock:
+            return sum(self._counts.values())
+
+
+@contextlib.contextmanager
+def call_budget(budget: typing.Dict[str, int]):
+    """
+    Fails a test when the with-block makes more native calls than budgeted.
+
+    budget - Maps native function names, such as "GetResourceProperty", to
+    the maximum number of calls allowed. The key "*" limits the total number
+    of native calls. Functions that are not listed are not limited.
+
+    Example:
+        with nisyscfg.testing.call_budget({"NextResource": 10, "GetResourceProperty": 40}):
+            for resource in session.find_hardware():
+                resource.serial_number
+
+    Raises an nisyscfg.testing.CallBudgetExceeded exception, which is an
+    AssertionError, when the block exits after exceeding the budget.
+    """
+    counter = CallCounter()
+    nisyscfg._library_singleton.add_interceptor(counter)
+    try:
+        yield counter
+    finally:
+        nisyscfg._library_singleton.remove_interceptor(counter)
+    counts = counter.counts
+    counts["*"] = sum(counts.values())
+    exceeded = {name: limit for name, limit in budget.items() if counts.setdefault(name, 0) > limit}
+    if exceeded:
+        raise CallBudgetExceeded(exceeded, counts)
@@ -0,0 +1,135 @@
+import collections
+import math
+import threading
+import typing
+
+# The operations whose latency nisyscfg.Session records. The session's own
+# remote reads, such as FindHardware and GetSystemProperty, are recorded per
+# native function under the operation that remote() returns, and set the
+# session's remote timeout.
+CONNECT = "connect"
+REMOTE = "remote"
+RESTART = "restart"
+
+# Observed latency of one operation on one target, in seconds.
+LatencyStats = typing.NamedTuple(
+    "LatencyStats",
+    [
+        ("samples", int),
+        ("p50", float),
+        ("p99", float),
+        ("max", float),
+    ],
+)
+
+
+def remote(function: str) -> str:
+    """Returns the operation of the session's remote reads through a native function."""
+    return REMOTE + "." + function
+
+
+def _key(target):
+    return (target or "").strip().lower()
+
+
+def _percentile(ordered, fraction):
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class AdaptiveTimeouts(object):
+    """
+    Derives the timeouts of operations on a target from their observed
+    latency, so that hangs on a healthy target fail fast and slow links do not
+    fail spuriously.
+
+    The timeout of an operation is its latency at percentile over the last
+    window successful calls, times factor, kept between minimum and maximum
+    seconds. Until min_samples calls have succeeded, the caller's default
+    timeout is used. A call that times out discards the samples of its
+    operation, so the default applies again until the latency is learned
+    anew.
+
+    Pass an AdaptiveTimeouts to nisyscfg.Session, and share it between the
+    sessions of a fleet so that each target's latency is learned once.
+
+    Example:
+        timeouts = nisyscfg.timeouts.AdaptiveTimeouts()
+        for target in targets:
+            with nisyscfg.Session(target, timeouts=timeouts) as session:
+                ...
+    """
+
+    def __init__(
+        self,
+        factor: float = 3.0,
+        percentile: float = 0.99,
+        minimum: float = 1.0,
+        maximum: float = 300.0,
+        min_samples: int = 10,
+        window: int = 256,
+    ):
+        self.factor = factor
+        self.percentile = percentile
+        self.minimum = minimum
+        self.maximum = maximum
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, target: typing.Optional[str], operation: str, seconds: float) -> None:
+        """Records the latency of a successful operation on target."""
+        key = (_key(target), operation)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def record_timeout(self, target: typing.Optional[str], operation: str) -> None:
+        """Records that an operation on target timed out, which discards its samples."""
+        with self._lock:
+            self._samples.pop((_key(target), operation), None)
+
+    def timeout(
+        self, target: typing.Optional[str], operation: str, default: typing.Optional[float]
+    ) -> typing.Optional[float]:
+        """
+        Returns the timeout, in seconds, of an operation on target, or default
+        if not enough of its calls have been observed.
+        """
+        with self._lock:
+            samples = self._samples.get((_key(target), operation))
+            if samples is None or len(samples) < self.min_samples:
+                return default
+            ordered = sorted(samples)
+        timeout = _percentile(ordered, self.percentile) * self.factor
+        return min(self.maximum, max(self.minimum, timeout))
+
+    def stats(self, target: typing.Optional[str]) -> typing.Dict[str, LatencyStats]:
+        """Returns the observed latency of each operation on target."""
+        target = _key(target)
+        with self._lock:
+            observed = {
+                operation: sorted(samples)
+                for (key, operation), samples in self._samples.items()
+                if key == target and samples
+            }
+        return {
+            operation: LatencyStats(
+                samples=len(ordered),
+                p50=_percentile(ordered, 0.5),
+                p99=_percentile(ordered, 0.99),
+                max=ordered[-1],
+            )
+            for operation, ordered in observed.items()
+        }
+
+    def reset(self, target: typing.Optional[str] = None) -> None:
+        """Discards the samples of target, or of every target if target is None."""
+        with self._lock:
+            if target is None:
+                self._samples.clear()
+            else:
+                for key in [key for key in self._samples if key[0] == _key(target)]:
+                    del self._samples[key]
@@ -0,0 +1,146 @@
+import collections
+import typing
+
+
+# The properties read for every resource, which Session.topology() prefetches.
+NODE_PROPERTIES = (
+    "provides_link_name",
+    "connects_to_link_name",
+    "slot_number",
+    "xnet.port_number",
+    "is_chassis",
+    "is_device",
+)
+
+
+class TopologyNode(object):
+    """
+    A hardware resource and its position in the system topology.
+
+    The properties that place the resource are read once when the topology is
+    built. Properties that the resource does not have are None.
+    """
+
+    __slots__ = (
+        "resource",
+        "provides_link_name",
+        "connects_to_link_name",
+        "slot_number",
+        "port_number",
+        "is_chassis",
+        "is_device",
+        "parent",
+        "children",
+    )
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.provides_link_name = resource.get_property("provides_link_name", None)
+        self.connects_to_link_name = resource.get_property("connects_to_link_name", "") or ""
+        self.slot_number = resource.get_property("slot_number", None)
+        self.port_number = resource.get_property("xnet.port_number", None)
+        self.is_chassis = bool(resource.get_property("is_chassis", False))
+        self.is_device = bool(resource.get_property("is_device", False))
+        self.parent = None
+        self.children = []
+
+    def __repr__(self):
+        return "TopologyNode(resource={!r})".format(self.resource)
+
+    def slot(self, slot_number: int) -> typing.Optional["TopologyNode"]:
+        """Returns the resource in a slot of this chassis, or None."""
+        for child in self.children:
+            if child.slot_number == slot_number:
+                return child
+        return None
+
+    def port(self, port_number: int) -> typing.Optional["TopologyNode"]:
+        """Returns the interface with an NI-XNET port number of this device, or None."""
+        for child in self.children:
+            if child.port_number == port_number:
+                return child
+        return None
+
+    def walk(self) -> typing.Iterator[typing.Tuple["TopologyNode", int]]:
+        """Yields (node, depth) for this node and its descendants, depth first."""
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+
+
+class Topology(object):
+    """
+    An in-memory tree of the hardware in a system, built from one native
+    enumeration. Resources are linked to the resource whose provides_link_name
+    equals their connects_to_link_name, for example a module to its chassis or
+    an NI-XNET interface to its device.
+
+    Use nisyscfg.Session.topology() to build one.
+    """
+
+    def __init__(self, resources):
+        self.nodes = [TopologyNode(resource) for resource in resources]
+        self._by_link_name = {}
+        self._connected_to = collections.defaultdict(list)
+        for node in self.nodes:
+            if node.provides_link_name:
+                self._by_link_name.setdefault(node.provides_link_name, node)
+            self._connected_to[node.connects_to_link_name].append(node)
+        self.roots = []
+        for node in self.nodes:
+            parent = self._by_link_name.get(node.connects_to_link_name)
+            if parent is None or parent is node:
+                self.roots.append(node)
+            else:
+                node.parent = parent
+                parent.children.append(node)
+        self._by_slot = {}
+        self._by_port = {}
+        for node in self.nodes:
+            if node.parent is None:
+                continue
+            if node.slot_number is not None:
+                self._by_slot.setdefault((node.parent.provides_link_name, node.slot_number), node)
+            if node.port_number is not None:
+                self._by_port.setdefault((node.parent.provides_link_name, node.port_number), node)
+
+    def __iter__(self) -> typing.Iterator[TopologyNode]:
+        return iter(self.nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def find(self, link_name: str) -> typing.Optional[TopologyNode]:
+        """Returns the resource that provides link_name, or None."""
+        return self._by_link_name.get(link_name)
+
+    def connected_to(self, link_name: str) -> typing.List[TopologyNode]:
+        """
+        Returns the resources whose connects_to_link_name is link_name. An
+        empty link name returns the resources that are not connected to any
+        other resource.
+        """
+        return list(self._connected_to.get(link_name or "", []))
+
+    def chassis(self) -> typing.List[TopologyNode]:
+        """Returns the chassis in the system."""
+        return [node for node in self.nodes if node.is_chassis]
+
+    def slot(self, link_name: str, slot_number: int) -> typing.Optional[TopologyNode]:
+        """Returns the resource in a slot of the chassis providing link_name, or None."""
+        return self._by_slot.get((link_name, slot_number))
+
+    def port(self, link_name: str, port_number: int) -> typing.Optional[TopologyNode]:
+        """
+        Returns the interface with an NI-XNET port number of the device
+        providing link_name, or None.
+        """
+        return self._by_port.get((link_name, port_number))
+
+    def walk(self) -> typing.Iterator[typing.Tuple[TopologyNode, int]]:
+        """Yields (node, depth) for every resource, depth first from the roots."""
+        for root in self.roots:
+            for item in root.walk():
+                yield item
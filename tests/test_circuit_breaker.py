@@ -0,0 +1,66 @@
+import time
+
+import nisyscfg
+import nisyscfg.circuit_breaker
+import nisyscfg.errors
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+def test_circuit_opens_after_consecutive_connection_failures():
+    breaker = nisyscfg.circuit_breaker.CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("InitializeSession", "OPERATION_TIMED_OUT", count=3)
+        with nisyscfg.testing.call_budget({"InitializeSession": 3}):
+            for _ in range(2):
+                with pytest.raises(nisyscfg.errors.LibraryError):
+                    nisyscfg.Session("crio-1", circuit_breaker=breaker)
+            assert breaker.state("CRIO-1").state == nisyscfg.circuit_breaker.OPEN
+            with pytest.raises(nisyscfg.errors.CircuitOpenError):
+                nisyscfg.Session("crio-1", circuit_breaker=breaker)
+
+            time.sleep(0.2)
+            with pytest.raises(nisyscfg.errors.LibraryError):
+                nisyscfg.Session("crio-1", circuit_breaker=breaker)
+            assert breaker.state("crio-1").state == nisyscfg.circuit_breaker.OPEN
+            assert breaker.state("crio-1").failures == 3
+
+        time.sleep(0.2)
+        with nisyscfg.Session("crio-1", circuit_breaker=breaker) as session:
+            assert session.connected
+        assert breaker.state("crio-1") == (nisyscfg.circuit_breaker.CLOSED, 0, None)
+        assert breaker.states() == {}
+
+
+def test_circuits_are_per_target():
+    breaker = nisyscfg.circuit_breaker.CircuitBreaker(failure_threshold=1)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("InitializeSession", "HOST_NOT_RESOLVED", count=1)
+        with pytest.raises(nisyscfg.errors.LibraryError):
+            nisyscfg.Session("crio-1", circuit_breaker=breaker)
+        with pytest.raises(nisyscfg.errors.CircuitOpenError):
+            nisyscfg.Session("crio-1", circuit_breaker=breaker)
+        nisyscfg.Session("crio-2", circuit_breaker=breaker).close()
+    assert list(breaker.states()) == ["crio-1"]
+
+
+def test_half_open_circuit_allows_a_single_probe():
+    breaker = nisyscfg.circuit_breaker.CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure("crio-1", nisyscfg.errors.TargetUnreachableError("crio-1", 3580))
+    breaker.before_call("crio-1")
+    assert breaker.state("crio-1").state == nisyscfg.circuit_breaker.HALF_OPEN
+    with pytest.raises(nisyscfg.errors.CircuitOpenError):
+        breaker.before_call("crio-1")
+    breaker.record_failure("crio-1", nisyscfg.errors.LibraryError(nisyscfg.errors.Status.FAIL, ""))
+    assert breaker.state("crio-1").state == nisyscfg.circuit_breaker.CLOSED
+
+
+def test_other_errors_do_not_count():
+    breaker = nisyscfg.circuit_breaker.CircuitBreaker(failure_threshold=1)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("InitializeSession", "FAIL")
+        for _ in range(3):
+            with pytest.raises(nisyscfg.errors.LibraryError):
+                nisyscfg.Session("crio-1", circuit_breaker=breaker)
+    assert breaker.state("crio-1").state == nisyscfg.circuit_breaker.CLOSED
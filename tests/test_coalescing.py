@@ -0,0 +1,84 @@
+import concurrent.futures
+import pathlib
+import threading
+import time
+
+import nisyscfg
+import nisyscfg.coalescing
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = pathlib.Path(__file__).parent.parent / "examples" / "simulated_pxi_system.json"
+
+
+def _concurrently(func, count=8):
+    barrier = threading.Barrier(count)
+
+    def call():
+        barrier.wait()
+        return func()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(call) for _ in range(count)]
+        return [future.result() for future in futures]
+
+
+def test_single_flight_shares_result_and_exception():
+    single_flight = nisyscfg.coalescing.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        release.wait(5)
+        if value is None:
+            raise ValueError("failed")
+        return [value]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(single_flight.do, "key", slow, 1)]
+        while not calls:
+            time.sleep(0.001)
+        futures += [executor.submit(single_flight.do, "key", slow, 2) for _ in range(3)]
+        # Let the other callers join the call in flight.
+        time.sleep(0.1)
+        assert single_flight.in_flight() == 1
+        release.set()
+        results = [future.result() for future in futures]
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert single_flight.in_flight() == 0
+
+    with pytest.raises(ValueError):
+        single_flight.do("key", slow, None)
+    assert single_flight.do("key", slow, 3) == [3]
+
+
+def test_concurrent_identical_session_calls_share_native_calls():
+    latency = {
+        "FindHardware": 0.05,
+        "GetInstalledSoftwareComponents": 0.05,
+        "GetSystemProperty": 0.05,
+    }
+    with nisyscfg.simulation.simulate(TOPOLOGY, latency=latency):
+        with nisyscfg.Session(coalesce=True) as session:
+            with nisyscfg.testing.call_budget(
+                {"FindHardware": 2, "GetInstalledSoftwareComponents": 2, "GetSystemProperty": 2}
+            ):
+                iterators = _concurrently(session.find_hardware)
+                components = _concurrently(session.get_installed_software_components)
+                hostnames = _concurrently(lambda: session.hostname)
+            assert len({tuple(iterator) for iterator in iterators}) == 1
+            assert len(iterators[0]) == 18 * 17 + 18
+            assert len({tuple(iterator) for iterator in components}) == 1
+            assert len(set(hostnames)) == 1
+
+
+def test_concurrent_session_resource_reads_share_one_handle():
+    with nisyscfg.simulation.simulate(TOPOLOGY, latency={"GetSystemProperty": 0.05}) as library:
+        with nisyscfg.Session(coalesce=True) as session:
+            resources = _concurrently(lambda: session.resource, count=4)
+            assert all(resource is resources[0] for resource in resources)
+        assert library.open_handles == 0
@@ -0,0 +1,192 @@
+import threading
+import time
+
+import nisyscfg
+import nisyscfg._library_singleton
+import nisyscfg.discovery
+import nisyscfg.enums
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = {
+    "systems": [
+        {"hostname": "crio-1", "ip_address": "10.0.0.11", "mac_address": "00:80:2F:00:00:11", "device_class": "cRIO"},
+        {"hostname": "", "ip_address": "10.0.0.12", "mac_address": "00:80:2F:00:00:12", "device_class": "cRIO"},
+    ]
+}
+
+
+def test_parse_system_name():
+    parse = nisyscfg.discovery.parse_system_name
+    assert parse("crio-1 (10.0.0.11)") == ("crio-1", "10.0.0.11", "")
+    assert parse("10.0.0.12 (00-80-2f-00-00-12)") == ("", "10.0.0.12", "00:80:2F:00:00:12")
+    assert parse("00:80:2F:00:00:11 (crio-1)") == ("crio-1", "", "00:80:2F:00:00:11")
+    assert parse("crio-1") == ("crio-1", "", "")
+
+
+def test_watcher_reports_changes_and_backs_off():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            events = []
+            watcher = nisyscfg.discovery.Watcher(
+                session,
+                on_event=events.append,
+                find_output_mode=nisyscfg.enums.SystemNameFormat.MAC_IP,
+                interval=1.0,
+                max_interval=3.0,
+            )
+            assert [event.kind for event in watcher.scan()] == ["added", "added"]
+            assert watcher.find("crio-1") is None
+            assert watcher.find("00-80-2f-00-00-11").ip_address == "10.0.0.11"
+            assert watcher.interval == 1.0
+            assert watcher.scan() == []
+            assert watcher.scan() == []
+            assert watcher.interval == 3.0
+
+            library._systems[0]["ip_address"] = "10.0.0.21"
+            del library._systems[1]
+            changed, removed = watcher.scan()
+            assert changed.kind == nisyscfg.discovery.CHANGED
+            assert (changed.previous.ip_address, changed.system.ip_address) == ("10.0.0.11", "10.0.0.21")
+            assert removed == ("removed", ("", "10.0.0.12", "00:80:2F:00:00:12"), None)
+            assert watcher.interval == 1.0
+            assert watcher.find("10.0.0.21").mac_address == "00:80:2F:00:00:11"
+            assert len(events) == 4
+
+
+def test_watcher_scans_in_background():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            added = threading.Event()
+            with nisyscfg.discovery.Watcher(session, on_event=lambda event: added.set()) as watcher:
+                assert added.wait(5)
+            assert sorted(system.ip_address for system in watcher.systems) == ["10.0.0.11", "10.0.0.12"]
+
+
+def test_watcher_survives_failing_callbacks():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            events = []
+
+            def on_event(event):
+                # Every scan finds a new system, so every scan fails.
+                events.append(event)
+                number = 20 + len(events)
+                library._systems.append(
+                    {"hostname": "crio-{}".format(number), "ip_address": "10.0.0.{}".format(number)}
+                )
+                raise ValueError(event.kind)
+
+            with nisyscfg.discovery.Watcher(session, on_event=on_event, interval=0.01) as watcher:
+                deadline = time.monotonic() + 5
+                while len(events) < 5 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            assert len(events) >= 5
+            assert isinstance(watcher.last_error, ValueError)
+
+
+def test_find_systems_scans_classes_concurrently():
+    topology = {
+        "systems": [
+            {"hostname": "pxi-1", "ip_address": "10.0.0.2", "mac_address": "00:80:2F:00:00:02", "device_class": "PXI"},
+            {"hostname": "crio-1", "ip_address": "10.0.0.11", "mac_address": "00:80:2F:00:00:11", "device_class": "cRIO"},
+            {"hostname": "", "ip_address": "10.0.0.31", "mac_address": "00:80:2F:00:00:31", "device_class": "sbRIO"},
+        ]
+    }
+
+    def slow_scan(name, func, args):
+        if name == "FindSystems":
+            time.sleep(0.3)
+        return func(*args)
+
+    with nisyscfg.simulation.simulate(topology):
+        with nisyscfg.Session() as session:
+            nisyscfg._library_singleton.add_interceptor(slow_scan)
+            try:
+                start = time.perf_counter()
+                systems = nisyscfg.discovery.find_systems(
+                    session,
+                    "PXI, cRIO,sbRIO",
+                    cache_modes=[
+                        nisyscfg.enums.IncludeCachedResults.NONE,
+                        nisyscfg.enums.IncludeCachedResults.ALL,
+                    ],
+                )
+                elapsed = time.perf_counter() - start
+            finally:
+                nisyscfg._library_singleton.remove_interceptor(slow_scan)
+    assert elapsed < 6 * 0.3
+    assert systems == [
+        ("pxi-1", "", "00:80:2F:00:00:02"),
+        ("crio-1", "", "00:80:2F:00:00:11"),
+        ("", "10.0.0.31", "00:80:2F:00:00:31"),
+    ]
+
+
+def test_discovery_cache_serves_and_refreshes_scans(tmp_path):
+    path = tmp_path / "discovery.sqlite"
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            cache = nisyscfg.discovery.DiscoveryCache(path, ttl=60)
+            with nisyscfg.testing.call_budget({"FindSystems": 1}):
+                first = cache.find_systems(session, "cRIO")
+                # A new cache object, as in a new process, reads the same database.
+                second = nisyscfg.discovery.DiscoveryCache(path).find_systems(session, "crio")
+            assert sorted(first) == sorted(second)
+            assert len(first) == 2
+
+            library._systems.append(
+                {"hostname": "crio-3", "ip_address": "10.0.0.13", "mac_address": "00:80:2F:00:00:13", "device_class": "cRIO"}
+            )
+            stale = nisyscfg.discovery.DiscoveryCache(path, ttl=0)
+            assert len(stale.find_systems(session, "cRIO")) == 2
+            stale.wait()
+            with nisyscfg.testing.call_budget({"FindSystems": 0}):
+                systems = nisyscfg.discovery.DiscoveryCache(path).find_systems(session, "cRIO")
+            assert sorted(system.hostname for system in systems) == ["", "crio-1", "crio-3"]
+
+
+def test_discovery_cache_passes_device_classes_unchanged(tmp_path):
+    device_classes = []
+
+    def interceptor(name, func, args):
+        if name == "FindSystems":
+            device_classes.append(args[1])
+        return func(*args)
+
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            nisyscfg._library_singleton.add_interceptor(interceptor)
+            try:
+                cache = nisyscfg.discovery.DiscoveryCache(tmp_path / "discovery.sqlite")
+                cache.find_systems(session, "cRIO, PXI")
+            finally:
+                nisyscfg._library_singleton.remove_interceptor(interceptor)
+    assert sorted(device_classes) == [b"PXI", b"cRIO"]
+
+
+def test_discovery_cache_returns_only_the_latest_scan(tmp_path):
+    cache = nisyscfg.discovery.DiscoveryCache(tmp_path / "discovery.sqlite")
+    crio_1 = nisyscfg.discovery.SystemRecord("crio-1", "10.0.0.11", "00:80:2F:00:00:11")
+    crio_2 = nisyscfg.discovery.SystemRecord("crio-2", "10.0.0.12", "00:80:2F:00:00:12")
+    assert cache.get("scope") == (None, [])
+    cache.put("scope", [crio_1, crio_2])
+    cache.put("scope", [crio_2])
+    scanned_at, systems = cache.get("scope")
+    assert scanned_at is not None
+    assert systems == [crio_2]
+
+
+def test_unparsable_system_names_are_skipped():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        library._systems.append({"hostname": "odd", "ip_address": "", "device_class": "cRIO"})
+        with nisyscfg.Session() as session:
+            mode = nisyscfg.enums.SystemNameFormat.HOSTNAME_IP
+            with pytest.raises(ValueError):
+                list(session.find_systems(find_output_mode=mode).records())
+            systems = nisyscfg.discovery.find_systems(session, "cRIO", find_output_mode=mode)
+            assert sorted(system.ip_address for system in systems) == ["10.0.0.11", "10.0.0.12"]
+            watcher = nisyscfg.discovery.Watcher(session, find_output_mode=mode)
+            assert len(watcher.scan()) == 2
@@ -0,0 +1,62 @@
+import nisyscfg
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = {
+    "experts": [{"name": "nidaqmx"}, {"name": "nipxi"}],
+    "resources": [{"count": 4, "expert": "nidaqmx", "name": "Dev{i}"}],
+    "software": {"installed": [{"id": "a"}, {"id": "b"}]},
+    "feeds": [{"name": "ni", "uri": "https://example.com"}],
+}
+
+
+def test_hardware_iterator_len_and_reset_reuse_enumeration():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"FindHardware": 1}):
+                resources = session.find_hardware()
+                first = next(resources)
+                with pytest.raises(TypeError):
+                    len(resources)
+                assert resources.count() == 4
+                assert len(resources) == 4
+                assert [r.expert_resource_name[0] for r in resources] == ["Dev2", "Dev3", "Dev4"]
+                resources.reset()
+                assert len([r.expert_resource_name[0] for r in resources]) == 4
+                assert first.expert_resource_name[0] == "Dev1"
+        assert library.open_handles == 0
+
+
+def test_info_iterators_are_countable_and_resettable():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            for iterator, expected in [
+                (session.get_system_experts(), 2),
+                (session.get_installed_software_components(), 2),
+                (session.get_software_feeds(), 1),
+            ]:
+                assert len(list(iterator)) == expected
+                iterator.reset()
+                assert len(iterator) == expected
+                assert len(list(iterator)) == expected
+
+
+def test_empty_enumerator_is_true_without_native_call():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            resources = session.find_hardware(expert_names="nipxi")
+            with nisyscfg.testing.call_budget({"ResetEnumeratorGetCount": 0}):
+                assert resources
+            assert resources.count() == 0
+
+
+def test_list_does_not_count_the_enumeration():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"ResetEnumeratorGetCount": 0}):
+                resources = session.find_hardware()
+                assert len(list(resources)) == 4
+                # Exhausting the enumeration makes its count known.
+                assert len(resources) == resources.count() == 4
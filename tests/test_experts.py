@@ -0,0 +1,28 @@
+import nisyscfg
+import nisyscfg.simulation
+import nisyscfg.testing
+
+
+TOPOLOGY = {
+    "experts": [
+        {"name": "nipxi", "display_name": "NI-PXI", "version": "23.0.0"},
+        {"name": "xnet", "display_name": "NI-XNET", "version": "23.0.0"},
+    ],
+    "resources": [{"expert": "xnet", "name": "CAN1"}],
+}
+
+
+def test_experts_are_cached_per_session():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"GetSystemExperts": 1}):
+                experts = session.get_experts()
+                assert [expert.expert_name for expert in experts] == ["nipxi", "xnet"]
+                assert experts[1].display_name == "NI-XNET"
+                assert session.has_expert("XNET")
+                assert not session.has_expert("nidaqmx")
+                assert session.get_expert_names() == {"nipxi", "xnet"}
+                assert len(session.find_hardware_by_expert(expert_names="xnet").resources) == 1
+            with nisyscfg.testing.call_budget({"GetSystemExperts": 1}):
+                session.refresh_experts()
+                assert session.has_expert("nipxi")
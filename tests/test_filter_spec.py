@@ -0,0 +1,52 @@
+import pickle
+
+import nisyscfg
+import nisyscfg.filter
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = {
+    "resources": [
+        {"count": 2, "expert": "nipxi", "name": "PXI{i}", "properties": {"IS_CHASSIS": True}},
+        {"count": 3, "expert": "nidaqmx", "name": "Dev{i}", "alias": "Dev{i}"},
+    ]
+}
+
+
+def test_filter_spec_is_hashable_and_picklable():
+    spec = nisyscfg.filter.FilterSpec({"xnet.port_number": 1}, is_chassis=True)
+    assert spec == nisyscfg.filter.FilterSpec(is_chassis=1, **{"xnet.port_number": 1})
+    assert hash(spec) == hash(nisyscfg.filter.FilterSpec({"is_chassis": True, "xnet.port_number": 1}))
+    assert spec != nisyscfg.filter.FilterSpec(is_chassis=False)
+    assert pickle.loads(pickle.dumps(spec)) == spec
+    assert dict(spec) == {"is_chassis": True, "xnet.port_number": 1}
+    with pytest.raises(AttributeError):
+        spec.is_chassis = False
+    with pytest.raises(ValueError):
+        nisyscfg.filter.FilterSpec(product_name="PXIe-1085")
+
+
+def test_find_hardware_reuses_pooled_filters():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"CreateFilter": 2, "SetFilterPropertyWithType": 2}):
+                for _ in range(5):
+                    chassis = list(session.find_hardware(nisyscfg.filter.FilterSpec(is_chassis=True)))
+                    assert len(chassis) == 2
+                    devices = list(session.find_hardware(nisyscfg.filter.FilterSpec(user_alias="Dev3")))
+                    assert [resource.name for resource in devices] == ["Dev3"]
+            filter = session.create_filter(nisyscfg.filter.FilterSpec(is_chassis=True))
+            assert len(list(session.find_hardware(filter))) == 2
+        assert library.open_handles == 0
+
+
+def test_filter_pool_evicts_least_recently_used():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session(filter_pool_size=1) as session:
+            with nisyscfg.testing.call_budget({}) as counter:
+                for alias in ["Dev1", "Dev2", "Dev1", "Dev1"]:
+                    list(session.find_hardware(nisyscfg.filter.FilterSpec(user_alias=alias)))
+            assert counter.counts["CreateFilter"] == 3
+        assert library.open_handles == 0
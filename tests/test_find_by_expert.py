@@ -0,0 +1,83 @@
+import pathlib
+import threading
+import time
+
+import nisyscfg
+import nisyscfg._library_singleton
+import nisyscfg.errors
+import nisyscfg.simulation
+import pytest
+
+
+TOPOLOGY = pathlib.Path(__file__).parent.parent / "examples" / "simulated_pxi_system.json"
+
+
+@pytest.fixture(scope="function")
+def simulation():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        yield library
+
+
+def slow_expert(expert_name, delay):
+    def interceptor(name, func, args):
+        if name == "FindHardware" and args[3] == expert_name.encode():
+            time.sleep(delay)
+        return func(*args)
+
+    return interceptor
+
+
+def test_find_hardware_by_expert_merges_and_deduplicates(simulation):
+    with nisyscfg.Session() as session:
+        result = session.find_hardware_by_expert()
+        assert len(result.resources) == 18 * 17 + 18
+        assert sorted(result.experts) == ["nidaqmx", "nipxi", "xnet"]
+        assert result.experts["nipxi"].count == 18 * 17 + 18
+        assert result.experts["nidaqmx"].count == 18 * 17
+        assert result.experts["xnet"].count == 0
+        assert not any(expert.timed_out or expert.error for expert in result.experts.values())
+        assert all(expert.elapsed >= 0 for expert in result.experts.values())
+
+
+def test_find_hardware_by_expert_reports_timeouts(simulation):
+    interceptor = slow_expert("nidaqmx", 0.5)
+    nisyscfg._library_singleton.add_interceptor(interceptor)
+    try:
+        with nisyscfg.Session() as session:
+            result = session.find_hardware_by_expert(expert_names="nidaqmx,xnet", timeout=0.1)
+            assert result.experts["nidaqmx"].timed_out
+            assert not result.experts["xnet"].timed_out
+            assert result.resources == []
+    finally:
+        # Let the abandoned enumeration finish before the simulation ends.
+        for thread in threading.enumerate():
+            if thread.name.startswith("nisyscfg-expert"):
+                thread.join()
+        nisyscfg._library_singleton.remove_interceptor(interceptor)
+
+
+def test_find_hardware_by_expert_isolates_errors(simulation):
+    simulation.add_fault("FindHardware", "FAIL", count=1)
+    with nisyscfg.Session() as session:
+        result = session.find_hardware_by_expert(expert_names="nidaqmx", max_workers=1)
+        assert result.experts["nidaqmx"].error.code == nisyscfg.errors.Status.FAIL
+        assert result.resources == []
+
+
+def test_close_releases_resources_of_timed_out_experts(simulation):
+    def interceptor(name, func, args):
+        error_code = func(*args)
+        # The enumeration is open when the caller stops waiting for it.
+        if name == "FindHardware" and args[3] == b"nipxi":
+            time.sleep(0.3)
+        return error_code
+
+    nisyscfg._library_singleton.add_interceptor(interceptor)
+    try:
+        session = nisyscfg.Session()
+        result = session.find_hardware_by_expert(timeout=0.1)
+        assert result.experts["nipxi"].timed_out
+        session.close()
+        assert simulation.open_handles == 0
+    finally:
+        nisyscfg._library_singleton.remove_interceptor(interceptor)
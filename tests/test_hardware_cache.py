@@ -0,0 +1,63 @@
+import nisyscfg
+import nisyscfg.enums
+import nisyscfg.simulation
+import nisyscfg.testing
+
+
+TOPOLOGY = {
+    "resources": [
+        {"count": 2, "expert": "nipxi", "name": "PXI{i}", "properties": {"IS_CHASSIS": True}},
+        {"count": 3, "expert": "nidaqmx", "name": "Dev{i}", "alias": "Dev{i}"},
+    ]
+}
+
+
+def chassis_filter(session):
+    filter = session.create_filter()
+    filter.is_chassis = True
+    return filter
+
+
+def test_find_hardware_cache_hits_for_equivalent_queries():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session(hardware_cache_ttl=60) as session:
+            with nisyscfg.testing.call_budget({"FindHardware": 3}) as counter:
+                first = list(session.find_hardware(chassis_filter(session)))
+                second = list(session.find_hardware(chassis_filter(session)))
+                assert len(first) == 2
+                assert [r._handle.value for r in first] == [r._handle.value for r in second]
+                assert len(list(session.find_hardware(expert_names="NIDAQMX, "))) == 3
+                assert len(list(session.find_hardware(expert_names="nidaqmx"))) == 3
+                other_mode = session.find_hardware(
+                    chassis_filter(session), mode=nisyscfg.enums.FilterMode.MATCH_VALUES_NONE
+                )
+                assert len(other_mode) == 3
+            assert counter.counts["FindHardware"] == 3
+        assert library.open_handles == 0
+
+
+def test_find_hardware_cache_expires():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session(hardware_cache_ttl=0) as session:
+            with nisyscfg.testing.call_budget({}) as counter:
+                list(session.find_hardware())
+                list(session.find_hardware())
+            assert counter.counts["FindHardware"] == 2
+
+
+def test_find_hardware_cache_invalidated_by_changes():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session(hardware_cache_ttl=60) as session:
+            with nisyscfg.testing.call_budget({}) as counter:
+                resource = next(session.find_hardware(expert_names="nidaqmx"))
+                resource.rename("Renamed")
+                # The renamed resource stays usable after invalidation.
+                assert resource.expert_user_alias[0] == "Renamed"
+                next(session.find_hardware(expert_names="nidaqmx")).save_changes()
+                list(session.find_hardware(expert_names="nidaqmx"))
+                session.save_changes()
+                list(session.find_hardware(expert_names="nidaqmx"))
+                session.invalidate_hardware_cache()
+                list(session.find_hardware(expert_names="nidaqmx"))
+            assert counter.counts["FindHardware"] == 5
+        assert library.open_handles == 0
@@ -0,0 +1,40 @@
+import pathlib
+
+import nisyscfg
+import nisyscfg.filter
+import nisyscfg.simulation
+import nisyscfg.testing
+
+
+TOPOLOGY = pathlib.Path(__file__).parent.parent / "examples" / "simulated_pxi_system.json"
+
+
+def test_find_hardware_records_yields_projection():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            records = session.find_hardware_records(
+                ["serial_number", "slot_number", "expert_user_alias", "xnet.port_number"],
+                nisyscfg.filter.FilterSpec(user_alias="Dev3_4"),
+            )
+            assert records.count() == 1
+            (record,) = list(records)
+            assert record.serial_number == "63630304"
+            assert record.slot_number == 4
+            assert record.expert_user_alias == ("", "Dev3_4")
+            assert record.xnet_port_number is None
+            # The session, the pooled filter and the enumeration.
+            assert library.open_handles == 3
+
+
+def test_find_hardware_records_closes_each_resource():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"NextResource": 18 * 17 + 18 + 1}):
+                open_handles = set()
+                count = 0
+                for record in session.find_hardware_records(["product_name"]):
+                    open_handles.add(library.open_handles)
+                    count += 1
+            assert count == 18 * 17 + 18
+            assert open_handles == {2}
+        assert library.open_handles == 0
@@ -0,0 +1,56 @@
+import nisyscfg
+import nisyscfg.instrumentation
+import nisyscfg.properties
+import nisyscfg.simulation
+
+
+TOPOLOGY = {
+    "resources": [
+        {
+            "count": 5,
+            "expert": "nidaqmx",
+            "name": "Dev{i}",
+            "properties": {"SERIAL_NUMBER": "S{i}"},
+        }
+    ]
+}
+
+
+def test_collect_records_function_and_property_stats():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.instrumentation.collect() as collector:
+            with nisyscfg.Session() as session:
+                for resource in session.find_hardware():
+                    resource.serial_number
+                    resource.vendor_id = 1
+                    try:
+                        resource.product_name
+                    except nisyscfg.errors.LibraryError:
+                        pass
+    stats = collector.snapshot()
+    assert stats.functions["NextResource"].calls == 6
+    get_property = stats.functions["GetResourceProperty"]
+    assert get_property.calls == 10
+    assert get_property.errors == 5
+    assert sum(count for _, count in get_property.histogram) == 10
+    assert get_property.min_time <= get_property.p50 <= get_property.p99 <= get_property.max_time
+    serial_number = stats.properties[nisyscfg.properties.Resource.SERIAL_NUMBER._id]
+    assert serial_number.calls == 5
+    assert serial_number.errors == 0
+    assert stats.properties[nisyscfg.properties.Resource.VENDOR_ID._id].calls == 5
+
+
+def test_enable_disable_snapshot():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        assert not nisyscfg.instrumentation.is_enabled()
+        nisyscfg.instrumentation.enable()
+        try:
+            with nisyscfg.Session():
+                pass
+            assert nisyscfg.instrumentation.snapshot().functions["InitializeSession"].calls == 1
+            nisyscfg.instrumentation.reset()
+            assert nisyscfg.instrumentation.snapshot().functions == {}
+        finally:
+            nisyscfg.instrumentation.disable()
+        assert "InitializeSession" not in vars(library)
+        assert nisyscfg.instrumentation.snapshot().functions == {}
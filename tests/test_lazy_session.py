@@ -0,0 +1,47 @@
+import time
+
+import nisyscfg
+import nisyscfg.errors
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = {
+    "system": {"properties": {"HOSTNAME": "sim-target"}},
+    "resources": [{"expert": "nidaqmx", "name": "Dev1"}],
+}
+
+
+def test_lazy_session_connects_on_first_use():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.testing.call_budget({"InitializeSession": 1}) as counter:
+            sessions = [nisyscfg.Session("target{}".format(i), lazy=True) for i in range(500)]
+            assert counter.total == 0
+            assert not sessions[0].connected
+            assert sessions[0].hostname == "sim-target"
+            assert sessions[0].connected
+            assert len(list(sessions[0].find_hardware())) == 1
+            for session in sessions:
+                session.close()
+        assert library.open_handles == 0
+
+
+def test_lazy_session_preconnects_in_background():
+    with nisyscfg.simulation.simulate(TOPOLOGY, latency={"InitializeSession": 0.2}):
+        start = time.perf_counter()
+        with nisyscfg.Session(lazy=True, preconnect=True) as session:
+            assert time.perf_counter() - start < 0.2
+            assert session.hostname == "sim-target"
+            assert session.connected
+
+
+def test_lazy_session_reports_connection_errors_on_use():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        library.add_fault("InitializeSession", "FAIL", count=1)
+        with nisyscfg.Session(lazy=True) as session:
+            with pytest.raises(nisyscfg.errors.LibraryError) as excinfo:
+                session.hostname
+            assert excinfo.value.code == nisyscfg.errors.Status.FAIL
+            assert session.hostname == "sim-target"
+        assert library.open_handles == 0
@@ -0,0 +1,78 @@
+import time
+
+import nisyscfg
+import nisyscfg.errors
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = {
+    "resources": [
+        {
+            "count": 20,
+            "expert": "nidaqmx",
+            "name": "Dev{i}",
+            "properties": {"SERIAL_NUMBER": "S{i}", "TEMPERATURE_READING": [30, 31]},
+        }
+    ]
+}
+
+
+def test_prefetch_serves_properties_read_ahead():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({}) as counter:
+                resources = session.find_hardware(
+                    prefetch=4,
+                    prefetch_properties=["serial_number", "product_name", "temperature_reading"],
+                )
+                assert len(resources) == 20
+                serial_numbers = []
+                for resource in resources:
+                    serial_numbers.append(resource.serial_number)
+                    assert list(resource.temperature_reading) == [30.0, 31.0]
+                    with pytest.raises(nisyscfg.errors.LibraryError):
+                        resource.product_name
+            assert serial_numbers == ["S{}".format(i) for i in range(1, 21)]
+            assert counter.counts["NextResource"] == 21
+            prefetched_reads = counter.counts["GetResourceProperty"]
+            assert resource.serial_number == "S20"
+        assert library.open_handles == 0
+    # Reading again after the prefetched value was used queries the resource.
+    assert prefetched_reads == 20 * 3
+
+
+def test_prefetch_overlaps_enumeration_latency():
+    latency = {"NextResource": 0.01, "GetResourceProperty": 0.01, "default": 0.0}
+    with nisyscfg.simulation.simulate(TOPOLOGY, latency=latency):
+        with nisyscfg.Session() as session:
+            start = time.perf_counter()
+            for resource in session.find_hardware(prefetch=8, prefetch_properties=["serial_number"]):
+                resource.serial_number
+                time.sleep(0.02)
+            elapsed = time.perf_counter() - start
+    # Serially this takes 20 * (0.01 + 0.01 + 0.02) = 0.8 seconds.
+    assert elapsed < 0.7
+
+
+def test_prefetch_reset_and_close_mid_iteration():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        with nisyscfg.Session() as session:
+            resources = session.find_hardware(prefetch=2)
+            assert next(resources).serial_number == "S1"
+            resources.reset()
+            assert [r.serial_number for r in resources][:2] == ["S1", "S2"]
+            resources = session.find_hardware(prefetch=2)
+            next(resources)
+            resources.close()
+        assert library.open_handles == 0
+
+
+def test_prefetch_propagates_enumeration_errors():
+    faults = [{"function": "NextResource", "status": "FAIL", "after": 3}]
+    with nisyscfg.simulation.simulate(TOPOLOGY, faults=faults):
+        with nisyscfg.Session() as session:
+            resources = session.find_hardware(prefetch=4)
+            with pytest.raises(nisyscfg.errors.LibraryError):
+                list(resources)
@@ -0,0 +1,158 @@
+import pathlib
+
+import nisyscfg
+import nisyscfg.instrumentation
+import nisyscfg.properties
+import nisyscfg.query
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+from nisyscfg.query import P
+
+
+TOPOLOGY = pathlib.Path(__file__).parent.parent / "examples" / "simulated_pxi_system.json"
+
+
+@pytest.fixture(scope="function")
+def simulation():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        yield library
+
+
+def test_predicates_evaluate_against_values():
+    predicate = (P.slot_number.between(2, 4) | (P.slot_number == 9)) & ~P.expert_user_alias.matches(
+        "^Dev1_"
+    )
+    test = predicate.compile()
+    assert test({"slot_number": 3, "expert_user_alias": ["", "Dev2_3"]})
+    assert test({"slot_number": 9, "expert_user_alias": ["", "Dev2_9"]})
+    assert not test({"slot_number": 3, "expert_user_alias": ["", "Dev1_3"]})
+    assert not test({"slot_number": 5, "expert_user_alias": ["", "Dev2_5"]})
+    assert not test({"slot_number": None, "expert_user_alias": []})
+    assert predicate.fields() == {"slot_number", "expert_user_alias"}
+
+
+def test_predicates_handle_missing_and_mismatched_values():
+    assert nisyscfg.query.field("xnet.port_number").exists().compile()({"xnet.port_number": 1})
+    assert not P.xnet.port_number.exists().compile()({"xnet.port_number": None})
+    assert not (P.serial_number > 5).compile()({"serial_number": "63630101"})
+    assert P.product_name.isin(["PXIe-6363", "PXIe-1085"]).compile()({"product_name": "PXIe-1085"})
+
+
+def test_inventory_evaluates_queries_without_enumerating_again(simulation):
+    with nisyscfg.Session() as session:
+        inventory = nisyscfg.query.Inventory(session, ["slot_number", "expert_user_alias"])
+        assert len(inventory) == 18 * 17 + 18
+        with nisyscfg.testing.call_budget({"*": 0}):
+            resources = inventory.select(
+                P.slot_number.between(1, 2) & P.expert_user_alias.matches(r"^Dev1[0-2]_")
+            )
+        assert sorted(resource.serial_number for resource in resources) == [
+            "63631001",
+            "63631002",
+            "63631101",
+            "63631102",
+            "63631201",
+            "63631202",
+        ]
+        records = inventory.where(P.is_chassis == True)  # noqa: E712
+        assert len(records) == 18
+        assert records[0].values["is_chassis"]
+
+
+def test_select_pushes_equality_down_to_filter(simulation):
+    with nisyscfg.Session() as session:
+        with nisyscfg.testing.call_budget({"NextResource": 18 + 1}) as counter:
+            resources = list(
+                nisyscfg.query.select(
+                    session, (P.is_chassis == True) & P.serial_number.matches("000[1-3]$")  # noqa: E712
+                )
+            )
+        assert [resource.serial_number for resource in resources] == [
+            "10850001",
+            "10850002",
+            "10850003",
+        ]
+        assert counter.counts["SetFilterPropertyWithType"] == 1
+
+
+def test_select_keeps_mistyped_equality_in_python(simulation):
+    with nisyscfg.Session() as session:
+        inventory = nisyscfg.query.Inventory(session, ["slot_number"])
+        for predicate in [P.slot_number == "3", P.vendor_id == -1, P.slot_number == 3.5]:
+            with nisyscfg.testing.call_budget({"SetFilterPropertyWithType": 0}):
+                assert list(nisyscfg.query.select(session, predicate)) == []
+            assert inventory.where(predicate) == []
+
+
+def test_select_evaluates_disjunctions_in_python(simulation):
+    with nisyscfg.Session() as session:
+        predicate = (P.expert_user_alias == "Dev3_4") | (P.expert_user_alias == "Dev4_3")
+        with nisyscfg.testing.call_budget({"SetFilterPropertyWithType": 0}):
+            resources = list(nisyscfg.query.select(session, predicate, prefetch=4))
+        assert sorted(resource.serial_number for resource in resources) == [
+            "63630304",
+            "63630403",
+        ]
+
+
+def test_inventory_lookups_are_index_hits(simulation):
+    with nisyscfg.Session() as session:
+        inventory = nisyscfg.query.Inventory(session)
+        with nisyscfg.testing.call_budget({"*": 0}):
+            by_serial = inventory.find_by_serial_number("63630304")
+            assert inventory.find_by_alias("Dev3_4") is by_serial
+            assert inventory.find_by_resource_name("PXI3Slot4") is by_serial
+            assert inventory.find_by_product_id(0) == []
+            assert inventory.find_by_serial_number("missing") is None
+            assert inventory.find_by_mac_address("00-80-2f-00-00-02") is None
+        assert by_serial.serial_number == "63630304"
+        assert len(inventory.lookup("expert_name", "nidaqmx")) == 18 * 17
+
+
+def test_inventory_refresh_rereads_only_changed_resources(simulation):
+    with nisyscfg.Session() as session:
+        inventory = nisyscfg.query.Inventory(session, indexes=["serial_number", "expert_user_alias"])
+        inventory.find_by_alias("Dev3_4").rename("Renamed")
+        with nisyscfg.instrumentation.collect() as collector:
+            inventory.refresh()
+        assert len(inventory) == 18 * 17 + 18
+        renamed = inventory.lookup("expert_user_alias", "Renamed")
+        assert [record.values["serial_number"] for record in renamed] == ["63630304"]
+        assert inventory.find_by_serial_number("63630304") is renamed[0].resource
+        # Only the renamed resource has its serial number read again.
+        serial_number = nisyscfg.properties.Resource.SERIAL_NUMBER._id
+        assert collector.snapshot().properties[serial_number].calls == 1
+
+
+def test_inventory_refresh_closes_previous_enumeration(simulation):
+    with nisyscfg.Session() as session:
+        inventory = nisyscfg.query.Inventory(session, ["serial_number"])
+        open_handles = simulation.open_handles
+        for _ in range(3):
+            inventory.refresh()
+        assert simulation.open_handles == open_handles
+        assert inventory.find_by_serial_number("63630304").serial_number == "63630304"
+    assert simulation.open_handles == 0
+
+
+def test_inventory_refresh_bypasses_hardware_cache():
+    topology = {
+        "resources": [
+            {"count": 3, "expert": "nidaqmx", "name": "Dev{i}", "alias": "Dev{i}"},
+        ]
+    }
+    with nisyscfg.simulation.simulate(topology) as library:
+        for resource in library._resources:
+            resource.properties[nisyscfg.properties.Resource.IS_SIMULATED._id] = True
+        with nisyscfg.Session(hardware_cache_ttl=60) as session:
+            inventory = nisyscfg.query.Inventory(session, indexes=["expert_user_alias"])
+            with nisyscfg.Session() as other:
+                next(iter(other.find_hardware())).delete()
+            inventory.refresh()
+            assert [record.values["expert_user_alias"] for record in inventory] == [
+                ["Dev2"],
+                ["Dev3"],
+            ]
+        assert library.open_handles == 0
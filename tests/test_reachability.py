@@ -0,0 +1,64 @@
+import socket
+import time
+
+import nisyscfg
+import nisyscfg.errors
+import nisyscfg.reachability
+import nisyscfg.simulation
+import pytest
+
+
+@pytest.fixture(scope="function")
+def listener():
+    # 127.0.0.1 is a local target, which is never probed.
+    server = socket.socket()
+    try:
+        server.bind(("127.0.0.2", 0))
+    except OSError:
+        server.close()
+        pytest.skip("127.0.0.2 is not a loopback address on this platform")
+    server.listen(8)
+    nisyscfg.reachability.clear_cache()
+    yield server.getsockname()[1]
+    server.close()
+    nisyscfg.reachability.clear_cache()
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.2", 0))
+        return sock.getsockname()[1]
+
+
+def test_probe_detects_open_and_closed_ports(listener):
+    assert nisyscfg.reachability.probe("127.0.0.2", listener)
+    nisyscfg.reachability.clear_cache()
+    port = closed_port()
+    assert not nisyscfg.reachability.probe("127.0.0.2", port, timeout=0.2)
+    assert nisyscfg.reachability.probe("localhost", port)
+    assert nisyscfg.reachability.probe("00:80:2F:00:00:02", port)
+    assert nisyscfg.reachability.probe_many(["127.0.0.2", "127.0.0.2"], port) == {"127.0.0.2": False}
+
+
+def test_probe_results_are_cached(listener):
+    assert nisyscfg.reachability.probe("127.0.0.2", listener, cache_ttl=60)
+    assert not nisyscfg.reachability.probe("127.0.0.2", closed_port(), cache_ttl=60)
+    start = time.perf_counter()
+    for _ in range(1000):
+        assert nisyscfg.reachability.probe("127.0.0.2", listener, cache_ttl=60)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_session_fails_fast_on_unreachable_target(monkeypatch, listener):
+    monkeypatch.setattr(nisyscfg.reachability, "DEFAULT_PORT", closed_port())
+    with nisyscfg.simulation.simulate() as library:
+        with pytest.raises(nisyscfg.errors.TargetUnreachableError):
+            nisyscfg.Session("127.0.0.2", probe_timeout=0.2)
+        session = nisyscfg.Session("127.0.0.2", lazy=True, probe_timeout=0.2)
+        with pytest.raises(nisyscfg.errors.TargetUnreachableError):
+            session.connect()
+        session.close()
+        monkeypatch.setattr(nisyscfg.reachability, "DEFAULT_PORT", listener)
+        with nisyscfg.Session("127.0.0.2", probe_timeout=0.2) as session:
+            assert session.connected
+        assert library.open_handles == 0
@@ -0,0 +1,69 @@
+import nisyscfg
+import nisyscfg._library_singleton
+import nisyscfg.errors
+import nisyscfg.recording
+import pytest
+
+from tests.test_session import config_next_resource_side_effect_mock  # noqa: F401
+from tests.test_session import lib_mock  # noqa: F401
+
+
+@pytest.fixture(scope="function")
+def recording(tmp_path, lib_mock, config_next_resource_side_effect_mock):  # noqa: F811
+    path = tmp_path / "session.rec.gz"
+    lib_mock.return_value.NISysCfgGetSystemProperty.side_effect = None
+    lib_mock.return_value.NISysCfgGetSystemProperty.return_value = (
+        nisyscfg.errors.Status.PROP_DOES_NOT_EXIST
+    )
+    with nisyscfg.recording.record(path):
+        with nisyscfg.Session() as session:
+            resources = list(session.find_hardware())
+            with pytest.raises(nisyscfg.errors.LibraryError):
+                session.hostname
+    nisyscfg._library_singleton.set_instance(None)
+    return path
+
+
+def test_record_captures_every_native_call(recording):
+    records = nisyscfg.recording.load(recording)
+    assert [record.function for record in records] == [
+        "InitializeSession",
+        "FindHardware",
+        "NextResource",
+        "NextResource",
+        "GetSystemProperty",
+        "GetStatusDescription",
+        "FreeDetailedString",
+        "CloseHandle",
+        "CloseHandle",
+        "CloseHandle",
+    ]
+    assert records[2].outputs == {"2": {"p": 10}}
+    assert records[3].status == nisyscfg.errors.Status.END_OF_ENUM
+    assert records[5].outputs == {"2": {"p": {"s": "description"}}}
+
+
+def test_replay_serves_recorded_outputs(recording):
+    with nisyscfg.recording.replay(recording) as library:
+        with nisyscfg.Session() as session:
+            resources = list(session.find_hardware())
+            assert len(resources) == 1
+            assert resources[0]._handle.value == 10
+            with pytest.raises(nisyscfg.errors.LibraryError) as excinfo:
+                session.hostname
+            assert excinfo.value.code == nisyscfg.errors.Status.PROP_DOES_NOT_EXIST
+            assert excinfo.value.description == "description"
+        assert library.remaining == 0
+
+
+def test_strict_replay_raises_replay_error_on_out_of_order_call(recording):
+    library = nisyscfg.recording.ReplayLibrary(recording)
+    with pytest.raises(nisyscfg.errors.ReplayError):
+        library.CloseHandle(None)
+
+
+def test_replay_raises_replay_error_on_unrecorded_call(recording):
+    with nisyscfg.recording.replay(recording, strict=False):
+        with nisyscfg.Session() as session:
+            with pytest.raises(nisyscfg.errors.ReplayError):
+                session.get_system_experts()
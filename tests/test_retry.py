@@ -0,0 +1,102 @@
+import nisyscfg
+import nisyscfg._library_singleton
+import nisyscfg.errors
+import nisyscfg.retry
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+def test_idempotent_calls_are_retried():
+    policy = nisyscfg.retry.RetryPolicy(base_delay=0.0)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("InitializeSession", "CONTACT_HOST_DISCONNECTED", count=1)
+        library.add_fault("FindHardware", "NET_SEND_FAILED", count=2)
+        with nisyscfg.testing.call_budget({"FindHardware": 3}):
+            with nisyscfg.Session("crio-1", retry_policy=policy) as session:
+                list(session.find_hardware())
+    stats = policy.stats()
+    assert stats["InitializeSession"] == (1, 1, 1, 0)
+    assert stats["FindHardware"] == (1, 2, 1, 0)
+
+
+def test_retries_stop_after_max_attempts():
+    policy = nisyscfg.retry.RetryPolicy(max_attempts=3, base_delay=0.0)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("GetInstalledSoftwareComponents", "TIMEOUT")
+        with nisyscfg.Session(retry_policy=policy) as session:
+            with nisyscfg.testing.call_budget({"GetInstalledSoftwareComponents": 3}):
+                with pytest.raises(nisyscfg.errors.LibraryError) as excinfo:
+                    session.get_installed_software_components()
+    assert excinfo.value.code == nisyscfg.errors.Status.TIMEOUT
+    assert policy.stats()["GetInstalledSoftwareComponents"] == (1, 2, 0, 1)
+
+
+def test_other_errors_and_writes_are_not_retried():
+    policy = nisyscfg.retry.RetryPolicy(base_delay=0.0)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("FindHardware", "FAIL", count=1)
+        library.add_fault("Restart", "NET_SEND_FAILED", count=1)
+        with nisyscfg.Session(retry_policy=policy) as session:
+            with nisyscfg.testing.call_budget({"FindHardware": 1, "Restart": 1}):
+                with pytest.raises(nisyscfg.errors.LibraryError):
+                    session.find_hardware()
+                with pytest.raises(nisyscfg.errors.LibraryError):
+                    session.restart()
+    assert policy.stats()["FindHardware"] == (1, 0, 0, 0)
+
+
+def test_backoff_is_jittered_and_bounded_by_deadline():
+    policy = nisyscfg.retry.RetryPolicy(
+        max_attempts=10, base_delay=1.0, max_delay=4.0, deadline=0.0
+    )
+    assert all(0.0 <= policy.backoff(retry) <= 4.0 for retry in range(1, 10))
+    calls = []
+
+    def func():
+        calls.append(None)
+        return nisyscfg.errors.Status.TIMEOUT
+
+    assert policy.call("Func", func) == nisyscfg.errors.Status.TIMEOUT
+    # Every retry would sleep past the deadline.
+    assert len(calls) == 1
+    assert policy.stats()["Func"] == (1, 0, 0, 1)
+
+
+def test_resource_and_enumeration_reads_are_retried():
+    policy = nisyscfg.retry.RetryPolicy(base_delay=0.0)
+    topology = {
+        "resources": [{"count": 3, "expert": "nidaqmx", "name": "Dev{i}", "alias": "Dev{i}"}]
+    }
+    with nisyscfg.simulation.simulate(topology) as library:
+        library.add_fault("NextResource", "TIMEOUT", after=1, count=1)
+        library.add_fault("GetResourceProperty", "NET_SEND_FAILED", count=1)
+        with nisyscfg.Session(retry_policy=policy) as session:
+            names = [resource.expert_user_alias[0] for resource in session.find_hardware()]
+            assert session.resource.is_device
+    assert names == ["Dev1", "Dev2", "Dev3"]
+    stats = policy.stats()
+    assert stats["NextResource"].recovered == 1
+    assert stats["GetResourceProperty"].recovered == 1
+
+
+def test_deadline_limits_native_timeouts():
+    timeouts = []
+
+    def interceptor(name, func, args):
+        if name == "InitializeSession":
+            timeouts.append(args[5])
+        return func(*args)
+
+    policy = nisyscfg.retry.RetryPolicy(base_delay=0.0, deadline=2.0)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("InitializeSession", "TIMEOUT", count=1)
+        nisyscfg._library_singleton.add_interceptor(interceptor)
+        try:
+            with nisyscfg.Session(timeout=60.0, retry_policy=policy):
+                pass
+        finally:
+            nisyscfg._library_singleton.remove_interceptor(interceptor)
+    assert len(timeouts) == 2
+    assert all(1 <= timeout <= 2000 for timeout in timeouts)
+    assert timeouts[1] <= timeouts[0]
@@ -0,0 +1,84 @@
+import pathlib
+
+import nisyscfg
+import nisyscfg._library_singleton
+import nisyscfg.errors
+import nisyscfg.simulation
+import pytest
+
+
+TOPOLOGY = pathlib.Path(__file__).parent.parent / "examples" / "simulated_pxi_system.json"
+
+
+@pytest.fixture(scope="function")
+def simulation():
+    with nisyscfg.simulation.simulate(TOPOLOGY) as library:
+        yield library
+
+
+def test_simulation_enumerates_topology(simulation):
+    with nisyscfg.Session() as session:
+        resources = list(session.find_hardware())
+        assert len(resources) == 18 * 17 + 18
+        chassis = resources[0]
+        assert chassis.is_chassis
+        assert chassis.expert_user_alias[0] == "Chassis 1"
+        assert list(chassis.temperature_reading) == [31.5, 38.25]
+        slot = resources[1]
+        assert slot.connects_to_link_name == "PXI1"
+        assert slot.slot_number == 1
+        assert slot.serial_number == "63630101"
+        assert list(slot.expert_name) == ["nipxi", "nidaqmx"]
+        assert [expert.expert_name for expert in session.get_system_experts()] == [
+            "nipxi",
+            "nidaqmx",
+            "xnet",
+        ]
+        assert session.hostname == "sim-pxi"
+    assert simulation.open_handles == 0
+
+
+def test_simulation_applies_filters(simulation):
+    with nisyscfg.Session() as session:
+        filter = session.create_filter()
+        filter.is_chassis = True
+        assert len(list(session.find_hardware(filter))) == 18
+
+        filter = session.create_filter()
+        filter.user_alias = "Dev3_4"
+        resources = list(session.find_hardware(filter, expert_names="nidaqmx"))
+        assert [resource.serial_number for resource in resources] == ["63630304"]
+
+
+def test_simulation_rename_updates_alias(simulation):
+    with nisyscfg.Session() as session:
+        resource = next(session.find_hardware(expert_names="nidaqmx"))
+        resource.rename("Renamed")
+        assert resource.expert_user_alias[0] == "Renamed"
+
+
+def test_simulation_injects_faults(simulation):
+    simulation.add_fault("GetResourceProperty", "PROP_DOES_NOT_EXIST", property="SERIAL_NUMBER", after=1, count=1)
+    with nisyscfg.Session() as session:
+        resources = list(session.find_hardware())
+        assert resources[0].serial_number == "10850001"
+        with pytest.raises(nisyscfg.errors.LibraryError) as excinfo:
+            resources[1].serial_number
+        assert excinfo.value.code == nisyscfg.errors.Status.PROP_DOES_NOT_EXIST
+        assert resources[2].serial_number == "63630102"
+
+
+def test_simulation_reports_unimplemented_functions(simulation):
+    status = simulation.ExportConfiguration(None, b"config.cfg", b"", False)
+    assert status == nisyscfg.errors.Status.NOT_IMPLEMENTED
+
+
+def test_simulation_selected_by_environment(monkeypatch):
+    monkeypatch.setenv("NISYSCFG_SIMULATION", str(TOPOLOGY))
+    previous = nisyscfg._library_singleton.set_instance(None)
+    try:
+        library = nisyscfg._library_singleton.get()
+        assert isinstance(library, nisyscfg.simulation.SimulatedLibrary)
+        assert library.resources == 18 * 17 + 18
+    finally:
+        nisyscfg._library_singleton.set_instance(previous)
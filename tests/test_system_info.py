@@ -0,0 +1,61 @@
+import nisyscfg
+import nisyscfg.enums
+import nisyscfg.simulation
+import nisyscfg.system_info
+import pytest
+
+from nisyscfg.enums import SystemNameFormat
+from nisyscfg.system_info import SystemRecord, parse_system_name
+
+
+def test_parse_system_name_validates_format():
+    assert parse_system_name("crio-1 (10.0.0.11)", SystemNameFormat.HOSTNAME_IP) == SystemRecord(
+        "crio-1", "10.0.0.11", ""
+    )
+    assert parse_system_name("fe80::1 (crio-1)", SystemNameFormat.IP_HOSTNAME).ip_address == "fe80::1"
+    # Unconfigured systems are returned as IP_MAC whatever the requested format.
+    assert parse_system_name("10.0.0.12 (00-80-2f-00-00-12)", SystemNameFormat.HOSTNAME_MAC) == (
+        "",
+        "10.0.0.12",
+        "00:80:2F:00:00:12",
+    )
+    # A hostname may look like an IP address.
+    assert parse_system_name("10.0.0.12", SystemNameFormat.HOSTNAME).hostname == "10.0.0.12"
+    with pytest.raises(ValueError):
+        parse_system_name("crio-1 (300.0.0.11)", SystemNameFormat.HOSTNAME_IP)
+    with pytest.raises(ValueError):
+        parse_system_name("crio-1 (00:80:2F:00:00)", SystemNameFormat.HOSTNAME_MAC)
+    with pytest.raises(ValueError):
+        parse_system_name("crio-1 (crio-2)")
+
+
+def test_system_index_lookups():
+    index = nisyscfg.system_info.SystemIndex(
+        [
+            SystemRecord("crio-1", "", "00:80:2F:00:00:11"),
+            SystemRecord("", "10.0.0.11", "00:80:2F:00:00:11"),
+            SystemRecord("pxi-1", "10.0.0.2", ""),
+        ]
+    )
+    assert len(index) == 2
+    crio = index.by_mac_address("00-80-2f-00-00-11")
+    assert crio == ("crio-1", "10.0.0.11", "00:80:2F:00:00:11")
+    assert index.by_hostname("CRIO-1") is crio
+    assert index.by_ip_address("10.0.0.11") is crio
+    assert index.find("pxi-1").ip_address == "10.0.0.2"
+    assert index.find("missing") is None
+
+
+def test_system_info_iterator_parses_records():
+    topology = {
+        "systems": [
+            {"hostname": "crio-1", "ip_address": "10.0.0.11", "mac_address": "00:80:2F:00:00:11"},
+            {"hostname": "", "ip_address": "10.0.0.12", "mac_address": "00:80:2F:00:00:12"},
+        ]
+    }
+    with nisyscfg.simulation.simulate(topology):
+        with nisyscfg.Session() as session:
+            records = list(session.find_systems(find_output_mode=SystemNameFormat.HOSTNAME_IP).records())
+            assert records == [("crio-1", "10.0.0.11", ""), ("", "10.0.0.12", "00:80:2F:00:00:12")]
+            index = session.find_systems(find_output_mode=SystemNameFormat.MAC_HOSTNAME).index()
+            assert index.by_hostname("crio-1").mac_address == "00:80:2F:00:00:11"
@@ -0,0 +1,27 @@
+import nisyscfg
+import nisyscfg.simulation
+import nisyscfg.testing
+import pytest
+
+
+TOPOLOGY = {"resources": [{"count": 3, "expert": "nidaqmx", "name": "Dev{i}"}]}
+
+
+def test_call_budget_passes_within_budget():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"NextResource": 4, "FindHardware": 1}) as counter:
+                assert len(list(session.find_hardware())) == 3
+    assert counter.counts == {"FindHardware": 1, "NextResource": 4}
+    assert counter.total == 5
+
+
+def test_call_budget_fails_when_exceeded():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            with pytest.raises(AssertionError) as excinfo:
+                with nisyscfg.testing.call_budget({"NextResource": 2, "*": 100}):
+                    list(session.find_hardware())
+    assert isinstance(excinfo.value, nisyscfg.testing.CallBudgetExceeded)
+    assert excinfo.value.exceeded == {"NextResource": 2}
+    assert "NextResource called 4 times (budget 2)" in str(excinfo.value)
@@ -0,0 +1,106 @@
+import pathlib
+
+import nisyscfg
+import nisyscfg._library_singleton
+import nisyscfg.simulation
+import nisyscfg.timeouts
+import pytest
+
+
+@pytest.fixture(scope="function")
+def calls():
+    calls = []
+
+    def interceptor(name, func, args):
+        if name in ("InitializeSession", "SetRemoteTimeout", "Restart", "InstallAll"):
+            calls.append((name, args))
+        return func(*args)
+
+    nisyscfg._library_singleton.add_interceptor(interceptor)
+    try:
+        yield calls
+    finally:
+        nisyscfg._library_singleton.remove_interceptor(interceptor)
+
+
+def test_timeout_is_derived_from_latency_within_bounds():
+    timeouts = nisyscfg.timeouts.AdaptiveTimeouts(
+        factor=2.0, minimum=1.0, maximum=10.0, min_samples=3
+    )
+    assert timeouts.timeout("crio-1", "remote", 30.0) == 30.0
+    for seconds in (0.2, 0.4, 0.8):
+        timeouts.record("CRIO-1", "remote", seconds)
+    assert timeouts.timeout("crio-1", "remote", 30.0) == 1.6
+    assert timeouts.timeout("crio-2", "remote", 30.0) == 30.0
+    timeouts.record("crio-1", "remote", 0.1)
+    timeouts.record("crio-1", "connect", 60.0)
+    assert timeouts.stats("crio-1")["remote"] == (4, 0.2, 0.8, 0.8)
+    timeouts.record("crio-1", "connect", 60.0)
+    timeouts.record("crio-1", "connect", 60.0)
+    assert timeouts.timeout("crio-1", "connect", 30.0) == 10.0
+    timeouts.record_timeout("crio-1", "connect")
+    assert timeouts.timeout("crio-1", "connect", 30.0) == 30.0
+    timeouts.reset("crio-1")
+    assert timeouts.stats("crio-1") == {}
+
+
+def test_session_applies_learned_timeouts(calls):
+    timeouts = nisyscfg.timeouts.AdaptiveTimeouts(factor=2.0, minimum=5.0, min_samples=2)
+    with nisyscfg.simulation.simulate(latency={"FindHardware": 0.01}):
+        for _ in range(2):
+            with nisyscfg.Session("crio-1", timeout=120.0, timeouts=timeouts) as session:
+                list(session.find_hardware())
+        assert [args[5] for name, args in calls if name == "InitializeSession"] == [120000, 120000]
+        assert not any(name == "SetRemoteTimeout" for name, _ in calls)
+
+        del calls[:]
+        with nisyscfg.Session("crio-1", timeout=120.0, timeouts=timeouts) as session:
+            session.find_hardware()
+            session.restart(sync_call=False)
+            session.install_all()
+        timeout_index = {"InitializeSession": 5, "SetRemoteTimeout": 1, "Restart": 4}
+        # The learned remote timeout applies only while the read runs.
+        assert [(name, args[timeout_index[name]]) for name, args in calls[:-1]] == [
+            ("InitializeSession", 5000),
+            ("SetRemoteTimeout", 5000),
+            ("SetRemoteTimeout", 300000),
+            ("Restart", 90000),
+        ]
+        assert calls[-1][0] == "InstallAll"
+        assert "restart" not in timeouts.stats("crio-1")
+
+
+def test_timed_out_connection_falls_back_to_default(calls):
+    timeouts = nisyscfg.timeouts.AdaptiveTimeouts(min_samples=1)
+    timeouts.record("crio-1", nisyscfg.timeouts.CONNECT, 1.0)
+    with nisyscfg.simulation.simulate() as library:
+        library.add_fault("InitializeSession", "OPERATION_TIMED_OUT", count=1)
+        with pytest.raises(nisyscfg.errors.LibraryError):
+            nisyscfg.Session("crio-1", timeout=60.0, timeouts=timeouts)
+        nisyscfg.Session("crio-1", timeout=60.0, timeouts=timeouts).close()
+    assert [args[5] for _, args in calls] == [3000, 60000]
+
+
+def test_remote_timeouts_are_learned_per_function(calls):
+    timeouts = nisyscfg.timeouts.AdaptiveTimeouts(factor=2.0, minimum=1.0, min_samples=2)
+    topology = pathlib.Path(__file__).parent.parent / "examples" / "simulated_pxi_system.json"
+    with nisyscfg.simulation.simulate(topology, latency={"FindHardware": 0.6}):
+        with nisyscfg.Session("crio-1", timeouts=timeouts) as session:
+            for _ in range(10):
+                session.hostname
+            session.find_hardware()
+            session.find_hardware()
+            session.find_hardware()
+            session.hostname
+            session.get_installed_software_components()
+    set_remote_timeout = [args[1] for name, args in calls if name == "SetRemoteTimeout"]
+    # Property reads learn a short timeout, which find_hardware() does not
+    # inherit, and repeated reads do not set the same timeout again.
+    assert set_remote_timeout[:2] == [1000, 300000]
+    assert 1200 <= set_remote_timeout[2] <= 2000
+    assert set_remote_timeout[3:] == [1000, 300000]
+    assert set(timeouts.stats("crio-1")) == {
+        "connect",
+        "remote.FindHardware",
+        "remote.GetSystemProperty",
+    }
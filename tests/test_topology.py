@@ -0,0 +1,68 @@
+import nisyscfg
+import nisyscfg.simulation
+import nisyscfg.testing
+
+
+TOPOLOGY = {
+    "resources": [
+        {
+            "count": 2,
+            "var": "chassis",
+            "expert": "nipxi",
+            "name": "PXI{chassis}",
+            "properties": {"IS_CHASSIS": True, "PROVIDES_LINK_NAME": "PXI{chassis}"},
+            "children": [
+                {
+                    "count": 3,
+                    "var": "slot",
+                    "expert": "nidaqmx",
+                    "name": "PXI{chassis}Slot{slot}",
+                    "properties": {"SLOT_NUMBER": "{slot}"},
+                }
+            ],
+        },
+        {
+            "expert": "xnet",
+            "name": "XNET0",
+            "properties": {"SERIAL_NUMBER": "1A2B", "PROVIDES_LINK_NAME": "XNET0"},
+            "children": [
+                {
+                    "count": 2,
+                    "var": "port",
+                    "expert": "xnet",
+                    "name": "CAN{port}",
+                    "properties": {"IS_DEVICE": False, "xnet.PORT_NUMBER": "{port}"},
+                }
+            ],
+        },
+    ]
+}
+
+
+def test_topology_links_resources_with_one_enumeration():
+    with nisyscfg.simulation.simulate(TOPOLOGY):
+        with nisyscfg.Session() as session:
+            with nisyscfg.testing.call_budget({"FindHardware": 1}):
+                topology = session.topology(prefetch=4)
+            assert len(topology) == 2 + 6 + 1 + 2
+            assert [node.resource.name for node in topology.roots] == ["PXI1", "PXI2", "XNET0"]
+            chassis = topology.chassis()
+            assert [node.provides_link_name for node in chassis] == ["PXI1", "PXI2"]
+            assert chassis[1].slot(2).resource.name == "PXI2Slot2"
+            assert topology.slot("PXI1", 3).resource.name == "PXI1Slot3"
+            assert topology.slot("PXI1", 4) is None
+            assert topology.find("XNET0").port(2).resource.name == "CAN2"
+            assert topology.port("XNET0", 1).parent is topology.find("XNET0")
+            assert [node.resource.name for node in topology.connected_to("")] == [
+                "PXI1",
+                "PXI2",
+                "XNET0",
+            ]
+            walk = [(node.resource.name, depth) for node, depth in topology.walk()]
+            assert walk[:5] == [
+                ("PXI1", 0),
+                ("PXI1Slot1", 1),
+                ("PXI1Slot2", 1),
+                ("PXI1Slot3", 1),
+                ("PXI2", 0),
+            ]